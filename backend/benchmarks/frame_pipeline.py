@@ -0,0 +1,350 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from backend.benchmarks.import_time import ROOT_DIR
+from backend.core.frame_sources import create_source
+from backend.core.metrics import AllocationTracker, Histogram
+from backend.core.roi_tracker import mirror_boxes, mirror_keypoints
+
+STAGES = ("predict", "extract", "mirror", "geometry", "decision", "pipeline")
+FRAME_SHAPE = (480, 640, 3)
+
+# used for the geometry and decision stages when the model finds nothing in a frame
+SYNTHETIC_KEYPOINTS = np.array([[320, 260, 1], [300, 240, 1], [340, 240, 1]] + [[0, 0, 0]] * 14, dtype=np.float32)
+SYNTHETIC_EYE_BOXES = np.array([[280, 230, 310, 245], [330, 230, 360, 245]], dtype=np.float32)
+
+
+class DiscardNotifier:
+    # stands in for the notification manager so decisions do not raise desktop alerts
+    def send(self, title: str, message: str) -> bool:
+        return True
+
+
+def synthetic_frames(count: int, shape=FRAME_SHAPE, seed: int = 0) -> List[np.ndarray]:
+    # textured frames with a moving bright blob, so the motion gate sees changes
+    rng = np.random.default_rng(seed)
+    height, width = shape[:2]
+    background = cv2.GaussianBlur(rng.integers(0, 255, shape, dtype=np.uint8), (0, 0), 3)
+
+    frames = []
+    for index in range(count):
+        frame = background.copy()
+        center = (width // 2 + int(80 * np.sin(index / 5)), height // 2)
+        cv2.ellipse(frame, center, (70, 90), 0, 0, 360, (190, 170, 160), -1)
+        frames.append(frame)
+    return frames
+
+
+def load_frames(source: Optional[str], count: int) -> List[np.ndarray]:
+    # frames from a recorded video, a directory of images, or synthetic ones
+    if source is None:
+        return synthetic_frames(count)
+
+    capture = create_source(source, realtime=False)
+    frames = []
+    while len(frames) < count:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames.append(frame)
+    capture.release()
+
+    if not frames:
+        raise ValueError(f"No frames could be read from {source}")
+    return frames
+
+
+def rss_mb() -> Optional[float]:
+    # current resident set size of the process
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1 << 20)
+
+
+class RssPeakSampler:
+    # highest resident set size seen while the with block runs, polled from a background thread
+    INTERVAL = 0.001  # seconds between samples, allocations freed within one interval can be missed
+
+    def __init__(self):
+        self.peak: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        rss = rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _poll(self):
+        while not self._stop.wait(self.INTERVAL):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        if self.peak is not None:
+            self._thread = threading.Thread(target=self._poll, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        return False
+
+
+def peak_rss_mb() -> Optional[float]:
+    # high-water mark of the process resident set size, only ever grows over a run
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def summarize(samples: List[float]) -> dict:
+    # latency percentiles in milliseconds and throughput for one stage
+    milliseconds = np.asarray(samples) * 1000
+    mean = float(milliseconds.mean())
+    return {
+        "p50_ms": round(float(np.percentile(milliseconds, 50)), 3),
+        "p95_ms": round(float(np.percentile(milliseconds, 95)), 3),
+        "p99_ms": round(float(np.percentile(milliseconds, 99)), 3),
+        "mean_ms": round(mean, 3),
+        "fps": round(1000 / mean, 1) if mean else None,
+        "samples": len(samples),
+    }
+
+
+def run_stage(inputs: list, step: Callable, warmup: int = 0) -> tuple:
+    # time step on every input, returns the outputs and the stage summary
+    rss_before = rss_mb()
+    with RssPeakSampler() as sampler:
+        for item in inputs[:warmup]:
+            step(item)
+
+        outputs = []
+        samples = []
+        for item in inputs:
+            started = time.perf_counter()
+            outputs.append(step(item))
+            samples.append(time.perf_counter() - started)
+
+    summary = summarize(samples)
+    if rss_before is None:
+        summary["rss_peak_growth_mb"] = summary["rss_growth_mb"] = None
+    else:
+        # the most memory the stage held at once, and what it kept, the outputs included
+        rss_after = rss_mb()
+        summary["rss_peak_growth_mb"] = round(max(sampler.peak, rss_after) - rss_before, 1)
+        summary["rss_growth_mb"] = round(rss_after - rss_before, 1)
+    return outputs, summary
+
+
+def bench_distance_check(feature, frames: List[np.ndarray], warmup: int = 0) -> Dict[str, dict]:
+    # the stages of DistanceCheck.monitor, one stage at a time over all frames
+    feature.notifier = DiscardNotifier()
+    feature.healthy_area = feature.face_area(SYNTHETIC_KEYPOINTS)
+    feature._reset_state()
+    report = {}
+
+    width = frames[0].shape[1]
+    detections, report["predict"] = run_stage(
+        frames, lambda frame: feature.model.predict(frame, conf=feature.DETECTION_CONFIDENCE), warmup)
+
+    def extract(result):
+        keypoints = result.keypoints
+        return keypoints[0] if keypoints is not None and len(keypoints) else SYNTHETIC_KEYPOINTS
+
+    faces, report["extract"] = run_stage(detections, extract, warmup)
+    _, report["mirror"] = run_stage(faces, lambda keypoints: mirror_keypoints(keypoints, width), warmup)
+    _, report["geometry"] = run_stage(faces, feature.face_area, warmup)
+
+    def decide(keypoints):
+        feature.distance_state, feature.last_alert_time = feature._check_distance(
+            keypoints, feature.healthy_area, feature.area_filter, feature.distance_state, feature.last_alert_time)
+
+    _, report["decision"] = run_stage(faces, decide, warmup)
+
+    feature._reset_state()
+    _, report["pipeline"] = run_stage(frames, feature.process_frame, warmup)
+    return report
+
+
+def bench_eye_strain_prevention(feature, frames: List[np.ndarray], warmup: int = 0) -> Dict[str, dict]:
+    # the stages of EyeStrainPrevention.monitor, one stage at a time over all frames
+    feature.notifier = DiscardNotifier()
+    feature.relaxed_ratios = [feature.eye_ratio(box) for box in SYNTHETIC_EYE_BOXES]
+    feature._reset_state()
+    report = {}
+
+    width = frames[0].shape[1]
+    detections, report["predict"] = run_stage(
+        frames, lambda frame: feature.model.predict(frame, conf=feature.DETECTION_CONFIDENCE), warmup)
+
+    def extract(result):
+        boxes = result.boxes
+        return boxes[:2] if len(boxes) >= 2 else SYNTHETIC_EYE_BOXES
+
+    eyes, report["extract"] = run_stage(detections, extract, warmup)
+    _, report["mirror"] = run_stage(eyes, lambda boxes: mirror_boxes(boxes, width), warmup)
+    _, report["geometry"] = run_stage(eyes, lambda boxes: [feature.eye_ratio(box) for box in boxes], warmup)
+
+    def decide(boxes):
+        feature.tension_state, feature.last_alert_time = feature._check_tension(
+            boxes, feature.relaxed_ratios, feature.ratio_filters, feature.tension_state, feature.last_alert_time)
+
+    _, report["decision"] = run_stage(eyes, decide, warmup)
+
+    feature._reset_state()
+    _, report["pipeline"] = run_stage(frames, feature.process_frame, warmup)
+    return report
+
+
+def allocations_per_frame(feature, frames: List[np.ndarray], warmup: int = 0) -> Dict[str, dict]:
+    # bytes allocated by process_frame per frame, peak and still held afterwards, traced with tracemalloc
+    peak, net = Histogram(), Histogram()
+    tracker = AllocationTracker(peak, net)
+    feature._reset_state()
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        for frame in frames[:warmup]:
+            feature.process_frame(frame)
+        for frame in frames:
+            with tracker:
+                feature.process_frame(frame)
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    return {"peak": peak.summary(), "net": net.summary()}
+
+
+BENCHMARKS = {
+    "distance_check": bench_distance_check,
+    "eye_strain_prevention": bench_eye_strain_prevention,
+}
+
+
+def create_feature(name: str, model=None):
+    # feature instance with its real model unless one is passed in
+    if name == "distance_check":
+        from backend.features.distance_check import DistanceCheck
+
+        return DistanceCheck(model=model)
+
+    from backend.features.eye_strain_prevention import EyeStrainPrevention
+
+    return EyeStrainPrevention(model=model)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_benchmarks(features: List[str], frames: List[np.ndarray], warmup: int = 3, models: Optional[dict] = None,
+                   allocations: bool = False) -> dict:
+    # full report for the given features, with the bytes allocated per frame if asked for
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "frames": len(frames),
+            "frame_shape": list(frames[0].shape),
+        },
+        "features": {},
+    }
+
+    for name in features:
+        feature = create_feature(name, (models or {}).get(name))
+        # the features print on every frame - keep the report readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            report["features"][name] = BENCHMARKS[name](feature, frames, warmup)
+            if allocations:
+                # traced separately, tracemalloc would slow down the timed stages
+                report.setdefault("allocations", {})[name] = allocations_per_frame(feature, frames, warmup)
+
+    report["meta"]["process_peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def compare(baseline: dict, current: dict) -> Dict[str, Dict[str, Optional[float]]]:
+    # relative change of the p50 latency per stage, in percent
+    changes = {}
+    for name, stages in current["features"].items():
+        for stage, summary in stages.items():
+            before = baseline.get("features", {}).get(name, {}).get(stage, {}).get("p50_ms")
+            change = round(100 * (summary["p50_ms"] - before) / before, 1) if before else None
+            changes.setdefault(name, {})[stage] = change
+    return changes
+
+
+def main():
+    # time every stage of the vision path on recorded or synthetic frames, CPU only and without a camera
+    parser = argparse.ArgumentParser(description="Per-stage latency of the vision features")
+    parser.add_argument("--source", help="video file or directory of images, synthetic frames if omitted")
+    parser.add_argument("--frames", type=int, default=200, help="frames to process")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed frames per stage")
+    parser.add_argument("--features", nargs="*", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="earlier JSON report to compare the p50 latencies against")
+    parser.add_argument("--allocations", action="store_true", help="also trace the bytes allocated per frame")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.features, load_frames(args.source, args.frames), args.warmup,
+                            allocations=args.allocations)
+
+    for name, stages in report["features"].items():
+        for stage in STAGES:
+            summary = stages[stage]
+            print(f"{name:>22} {stage:>9}: p50 {summary['p50_ms']:8.3f} ms  p95 {summary['p95_ms']:8.3f} ms  "
+                  f"p99 {summary['p99_ms']:8.3f} ms  {summary['fps']} fps  RSS peak growth {summary['rss_peak_growth_mb']} MB  "
+                  f"kept {summary['rss_growth_mb']} MB")
+    print(f"Process peak RSS: {report['meta']['process_peak_rss_mb']} MB")
+
+    for name, allocated in report.get("allocations", {}).items():
+        print(f"{name:>22} allocated per frame: peak p50 {allocated['peak']['p50'] / 1024:.1f} KiB  "
+              f"p95 {allocated['peak']['p95'] / 1024:.1f} KiB  net p50 {allocated['net']['p50'] / 1024:.1f} KiB")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            for name, stages in compare(json.load(f), report).items():
+                for stage, change in stages.items():
+                    print(f"{name:>22} {stage:>9}: {'n/a' if change is None else f'{change:+.1f}%'} p50")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Report saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import pkgutil
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+import backend.features
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+HEADROOM = 2.0  # recorded budgets allow this multiple of the measured time
+HEAVY_MODULES = ("torch", "ultralytics", "onnxruntime", "onnx")  # only needed once inference runs
+
+
+def feature_modules() -> List[str]:
+    # every entry point in backend.features
+    return sorted(f"backend.features.{module.name}" for module in pkgutil.iter_modules(backend.features.__path__))
+
+
+def parse_importtime(output: str) -> Dict[str, int]:
+    # cumulative microseconds per module from -X importtime output
+    cumulative = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        cumulative[fields[2].strip()] = int(fields[1])
+    return cumulative
+
+
+def measure_import(module: str, runs: int = 3) -> Tuple[float, Set[str]]:
+    # median cold-start import time in ms, and every module pulled in by the import
+    times = []
+    imported = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        )
+        cumulative = parse_importtime(result.stderr)
+        times.append(cumulative[module] / 1000)
+        imported.update(cumulative)
+    return statistics.median(times), imported
+
+
+def load_budget() -> Dict[str, float]:
+    with open(BUDGET_FILE, "r") as f:
+        return json.load(f)
+
+
+def check_module(module: str, budget: Dict[str, float], runs: int = 3) -> List[str]:
+    # problems with one module's cold-start import
+    elapsed, imported = measure_import(module, runs)
+    problems = [f"{module} imports {name} at module level" for name in HEAVY_MODULES if name in imported]
+
+    if module not in budget:
+        problems.append(f"{module} has no recorded import budget")
+    elif elapsed > budget[module]:
+        problems.append(f"{module} took {elapsed:.1f} ms to import, budget is {budget[module]:.1f} ms")
+
+    print(f"{module}: {elapsed:.1f} ms (budget {budget.get(module, 0):.1f} ms)")
+    return problems
+
+
+def main():
+    # measure cold-start import time of the feature entry points against the recorded budget
+    parser = argparse.ArgumentParser(description="Import-time budget for the backend.features entry points")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per module")
+    parser.add_argument("--record", action="store_true", help="record new budgets from this machine")
+    args = parser.parse_args()
+
+    if args.record:
+        budget = {}
+        for module in feature_modules():
+            elapsed, _ = measure_import(module, args.runs)
+            budget[module] = round(elapsed * HEADROOM, -1) + 10
+            print(f"{module}: {elapsed:.1f} ms, budget {budget[module]:.1f} ms")
+
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=4)
+        print(f"Budget saved: {BUDGET_FILE}")
+        return
+
+    budget = load_budget()
+    problems = []
+    for module in feature_modules():
+        problems.extend(check_module(module, budget, args.runs))
+
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import struct
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class ActivityHistory:
+    # one bit per minute of computer use, one 180 byte row per day, in a memory-mapped file
+    MINUTES_PER_DAY = 24 * 60
+    DAY_BYTES = MINUTES_PER_DAY // 8
+    HEADER = struct.Struct("<4sHxxi")  # magic, version, ordinal of the first day
+    HEADER_SIZE = 16
+    MAGIC = b"ACTV"
+    VERSION = 1
+    GROW_DAYS = 32  # days added to the file at once, so it is not remapped every midnight
+
+    # set bits in every byte value, to count minutes without unpacking
+    POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+
+    def __init__(self, path: str, first_day: Optional[date] = None):
+        self.path = path
+        self.days: Optional[np.memmap] = None
+
+        if os.path.exists(path) and os.path.getsize(path) >= self.HEADER_SIZE:
+            with open(path, "rb") as f:
+                magic, version, first_ordinal = self.HEADER.unpack(f.read(self.HEADER.size))
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError(f"Not an activity history file: {path}")
+            self.first_day = date.fromordinal(first_ordinal)
+        else:
+            self.first_day = first_day or date.today()
+            with open(path, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.first_day.toordinal()).ljust(self.HEADER_SIZE, b"\0"))
+
+        self._map()
+
+    def _map(self):
+        day_count = (os.path.getsize(self.path) - self.HEADER_SIZE) // self.DAY_BYTES
+        self.days = None
+        if day_count:
+            self.days = np.memmap(self.path, dtype=np.uint8, mode="r+", offset=self.HEADER_SIZE,
+                                  shape=(day_count, self.DAY_BYTES))
+
+    @property
+    def day_count(self) -> int:
+        return 0 if self.days is None else len(self.days)
+
+    def _grow(self, day_count: int):
+        # extend the file with empty days and map it again
+        day_count = -(-day_count // self.GROW_DAYS) * self.GROW_DAYS
+        self.flush()
+        self.days = None
+        os.truncate(self.path, self.HEADER_SIZE + day_count * self.DAY_BYTES)
+        self._map()
+
+    def _day_index(self, day: date) -> int:
+        return day.toordinal() - self.first_day.toordinal()
+
+    def mark(self, start: datetime, end: datetime):
+        # record the computer as used in every minute touched by [start, end)
+        if start.date() < self.first_day:
+            start = datetime.combine(self.first_day, datetime.min.time())
+        if end <= start:
+            return
+
+        first = self._day_index(start.date())
+        last = self._day_index((end - timedelta(microseconds=1)).date())
+        if last >= self.day_count:
+            self._grow(last + 1)
+
+        minutes = np.unpackbits(self.days[first:last + 1], axis=1)
+        start_minute = start.hour * 60 + start.minute
+        end_minute = (self._day_index(end.date()) - first) * self.MINUTES_PER_DAY + end.hour * 60 + end.minute
+        if end.second or end.microsecond:
+            end_minute += 1
+
+        minutes.reshape(-1)[start_minute:end_minute] = 1
+        self.days[first:last + 1] = np.packbits(minutes, axis=1)
+
+    def _rows(self, start: date, end: date) -> np.ndarray:
+        # packed rows for the days in [start, end), empty for days outside the file
+        rows = np.zeros((max(0, (end - start).days), self.DAY_BYTES), dtype=np.uint8)
+        first = self._day_index(start)
+        low, high = max(0, first), min(self.day_count, self._day_index(end))
+        if low < high:
+            rows[low - first:high - first] = self.days[low:high]
+        return rows
+
+    def daily_totals(self, start: date, end: date) -> np.ndarray:
+        # minutes used on each day in [start, end)
+        return self.POPCOUNT[self._rows(start, end)].sum(axis=1)
+
+    def total(self, start: date, end: date) -> int:
+        # minutes used over [start, end)
+        return int(self.POPCOUNT[self._rows(start, end)].sum())
+
+    def weekly_totals(self, start: date, end: date) -> Dict[date, int]:
+        # minutes used per week in [start, end), keyed by the Monday the week starts on
+        daily = self.daily_totals(start, end)
+        if not len(daily):
+            return {}
+
+        first_monday = start - timedelta(days=start.weekday())
+        weeks = (np.arange(len(daily)) + start.weekday()) // 7
+        totals = np.bincount(weeks, weights=daily)
+        return {first_monday + timedelta(weeks=int(week)): int(minutes) for week, minutes in enumerate(totals)}
+
+    def hour_of_day(self, start: date, end: date) -> np.ndarray:
+        # minutes used in each hour of the day, summed over [start, end)
+        minutes = np.unpackbits(self._rows(start, end), axis=1)
+        return minutes.reshape(-1, 24, 60).sum(axis=(0, 2))
+
+    def flush(self):
+        if self.days is not None:
+            self.days.flush()
+
+    def close(self):
+        self.flush()
+        self.days = None
@@ -0,0 +1,76 @@
+import json
+import os
+import struct
+import cv2
+from threading import Lock
+from typing import Any, Optional, Tuple
+
+from .inference_engine import file_hash
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def image_size(image_path: str) -> Optional[Tuple[int, int]]:
+    # (width, height) of an image, read from the PNG header without decoding the pixels
+    try:
+        with open(image_path, "rb") as f:
+            header = f.read(24)
+    except OSError:
+        return None
+
+    # signature, IHDR chunk length and type, then width and height as big-endian uint32
+    if header[:8] == PNG_SIGNATURE and header[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", header[16:24])
+        return width, height
+
+    # not a PNG - decode it to learn the size
+    image = cv2.imread(image_path)
+    if image is None:
+        return None
+    height, width = image.shape[:2]
+    return width, height
+
+
+class CalibrationCache:
+    # calibration results per feature, keyed by the content hash of the calibration image
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+        self._lock = Lock()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, feature: str, image_path: str, model_id: str) -> Optional[dict]:
+        # cached result for this exact image and model, or None
+        try:
+            image_hash = file_hash(image_path)
+        except OSError:
+            return None
+
+        entry = self._load().get(feature)
+        if entry is None or entry.get("image_hash") != image_hash or entry.get("model") != model_id:
+            return None
+        return entry
+
+    def put(self, feature: str, image_path: str, model_id: str, **results: Any) -> None:
+        # store a calibration result, replacing the previous one for the feature
+        size = image_size(image_path) or (0, 0)
+        entry = {
+            "image_hash": file_hash(image_path),
+            "model": model_id,
+            "width": size[0],
+            "height": size[1],
+        }
+        entry.update(results)
+
+        with self._lock:
+            cache = self._load()
+            cache[feature] = entry
+            temp_file = self.cache_file + ".tmp"
+            with open(temp_file, "w") as f:
+                json.dump(cache, f, indent=4)
+            os.replace(temp_file, self.cache_file)
@@ -1,26 +1,147 @@
 import cv2
-from typing import Optional, Tuple
+import time
+import threading
+from typing import List, Optional, Tuple
 from .notification_manager import NotificationManager
+from .calibration_cache import image_size
+from .camera_policy import CameraDutyCycle
+from .frame_sources import FrameSource, create_source
+from .settings_manager import SettingsManager
+from .frame_broker import CaptureControl, FrameBroker, SharedFrameReader, remove_shared_frames, shared_frames_name
+
+
+class FrameGrabber:
+    # keeps draining the device on a background thread and holds only the newest frame
+    # frames are read into preallocated buffers - a frame returned by read stays valid until the next read
+    FIRST_FRAME_TIMEOUT = 2.0  # seconds to wait for the device to deliver a frame
+    BUFFER_COUNT = 3  # the one being filled, the newest frame and the one handed to the reader
+
+    def __init__(self, cap: cv2.VideoCapture):
+        self.cap = cap
+        self.frame: Optional[cv2.Mat] = None
+        self.buffers: List[Optional[cv2.Mat]] = [None] * self.BUFFER_COUNT
+        self._newest: Optional[int] = None
+        self._reading: Optional[int] = None
+        self.frame_timestamp = 0.0
+        self.frames_grabbed = 0
+        self.dropped_frames = 0  # frames replaced before anyone read them
+
+        self._consumed = True
+        self._lock = threading.Lock()
+        self._has_frame = threading.Event()
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.control = CaptureControl()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running.is_set()
+
+    def start(self) -> None:
+        # start draining the device
+        self._running.set()
+        self._thread = threading.Thread(target=self._grab_loop, daemon=True)
+        self._thread.start()
+
+    def _grab_loop(self) -> None:
+        while self._running.is_set():
+            self.control.run_pending()
+            with self._lock:
+                back = next(index for index in range(self.BUFFER_COUNT) if index not in (self._newest, self._reading))
+
+            # the device writes into the buffer, a new one is only allocated for the first frame or a new size
+            ret, frame = self.cap.read(self.buffers[back])
+            timestamp = time.time()
+            if not ret or frame is None:
+                time.sleep(0.01)
+                continue
+
+            with self._lock:
+                if not self._consumed:
+                    self.dropped_frames += 1
+                self.buffers[back] = frame
+                self._newest = back
+                self.frame = frame
+                self.frame_timestamp = timestamp
+                self.frames_grabbed += 1
+                self._consumed = False
+            self._has_frame.set()
+
+    def read(self) -> Tuple[bool, Optional[cv2.Mat]]:
+        # hand over the newest frame
+        if not self._has_frame.is_set():
+            self._has_frame.wait(self.FIRST_FRAME_TIMEOUT)
+
+        with self._lock:
+            frame = self.frame
+            self._reading = self._newest
+            self._consumed = True
+        return frame is not None, frame
+
+    def stop(self) -> None:
+        # stop draining the device
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
 
 
 class CameraManager:
     # manages camera
-    def __init__(self):
+    FIRST_FRAME_TIMEOUT = 2.0  # seconds to wait for a newly opened device to deliver a frame
+    SETTLE_FRAMES = 5  # frames dropped after the first one while auto exposure settles
+
+    def __init__(self, shared: bool = False, background: bool = False, source=None, realtime: Optional[bool] = None):
         self.notifier = NotificationManager()
         self.cap: Optional[cv2.VideoCapture] = None
         self.is_open = False
 
+        # a video file, image directory or frame iterable replaces the live camera, e.g. for recorded sessions
+        settings = SettingsManager()
+        self.source = source if source is not None else settings.get("camera_source")
+        self.realtime = realtime if realtime is not None else settings.get("camera_realtime", True)
+
+        # drain the device on a background thread so reads return the newest frame
+        self.background = background
+        self.grabber: Optional[FrameGrabber] = None
+        self.frame_buffer: Optional[cv2.Mat] = None  # reused by synchronous reads
+
+        # share one capture between processes through a frame broker
+        self.shared = shared
+        self.broker: Optional[FrameBroker] = None
+        self.reader: Optional[SharedFrameReader] = None
+        self.camera_index = 0
+
+        # between samples the device is kept open, slowed down or released, see pause()
+        self.policy = CameraDutyCycle()
+        self.paused_mode: Optional[str] = None
+        self.image_path: Optional[str] = None
+        self.normal_fps = 0.0
+        self.device_opens = 0
+        self.held_seconds = 0.0  # time the device was held open
+        self.held_since: Optional[float] = None
+
     def open(self, image_path: str, camera_index: int = 0) -> bool:
         # open camera
         if self.is_open:
             return True
 
-        img = cv2.imread(image_path)
-        if img is None:
+        size = image_size(image_path)
+        if size is None:
             return False
 
-        height, width = img.shape[:2]
+        width, height = size
+        self.camera_index = camera_index
+        self.image_path = image_path
+
+        if self.source is not None:
+            return self._open_source()
 
+        if self.shared and self._attach_shared():
+            self.is_open = True
+            return True
+
+        started = time.monotonic()
         self.cap = cv2.VideoCapture(camera_index)
 
         if not self.cap.isOpened():
@@ -31,22 +152,251 @@ class CameraManager:
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
 
+        # the device is usable once it delivers exposed frames, most of the cost of reopening it
+        self._settle()
+        self.held_since = time.monotonic()
+        self.policy.record_open(self.held_since - started)
+        self.device_opens += 1
+
+        if self.shared:
+            self._publish_shared()
+
+        if self.reader is None and self.background:
+            self.grabber = FrameGrabber(self.cap)
+            self.grabber.start()
+
         self.is_open = True
         return True
 
+    def _open_source(self) -> bool:
+        # play a recording instead of the camera, read synchronously so no frame is skipped by a grabber
+        started = time.monotonic()
+        self.cap = create_source(self.source, self.realtime)
+
+        if not self.cap.isOpened():
+            self.notifier.send("Error: Camera Access", f"Could not open camera source {self.source}.")
+            self.cap = None
+            return False
+
+        self.held_since = time.monotonic()
+        self.policy.record_open(self.held_since - started)
+        self.device_opens += 1
+        self.is_open = True
+        return True
+
+    def _settle(self) -> bool:
+        # wait for the first frame of a newly opened device and drop a few more while the exposure adjusts
+        deadline = time.monotonic() + self.FIRST_FRAME_TIMEOUT
+        frames = 0
+        while frames <= self.SETTLE_FRAMES and time.monotonic() < deadline:
+            ret, frame = self.cap.read(self.frame_buffer)
+            if ret and frame is not None:
+                self.frame_buffer = frame
+                frames += 1
+            else:
+                time.sleep(0.01)
+        return frames > 0
+
+    @property
+    def is_recorded(self) -> bool:
+        return isinstance(self.cap, FrameSource)
+
+    def _attach_shared(self) -> bool:
+        # attach to frames published by another process
+        reader = SharedFrameReader(shared_frames_name(self.camera_index))
+        if not reader.open():
+            return False
+
+        if reader.is_stale():
+            # owner is gone - remove its block so this process can take over
+            reader.release()
+            remove_shared_frames(reader.name)
+            return False
+
+        self.reader = reader
+        return True
+
+    def _publish_shared(self) -> None:
+        # become the capture owner and publish frames for other processes
+        broker = FrameBroker(shared_frames_name(self.camera_index))
+        if not broker.start(self.cap):
+            # another process became the owner first - use its frames instead
+            if self._attach_shared():
+                self.cap.release()
+                self.cap = None
+            return
+
+        reader = SharedFrameReader(broker.name)
+        if not reader.open():
+            broker.stop()
+            return
+
+        self.broker = broker
+        self.reader = reader
+
+    def _take_over_capture(self) -> bool:
+        # reopen the camera when the owner of the shared frames went away
+        self.reader.release()
+        self.reader = None
+        self.is_open = False
+
+        if self._attach_shared():
+            self.is_open = True
+            return True
+
+        self.cap = cv2.VideoCapture(self.camera_index)
+        if not self.cap.isOpened():
+            return False
+
+        self._publish_shared()
+        self.is_open = True
+        return True
+
+    def pause(self, interval: float) -> str:
+        # nothing is read for interval seconds - hold, slow down or release the device, returns the mode
+        if not self.is_open or self.paused_mode is not None:
+            return self.paused_mode or CameraDutyCycle.HOLD
+        if self.cap is None or self.is_recorded:
+            # frames come from another process's capture or a recording, there is no device to manage
+            return CameraDutyCycle.HOLD
+
+        # releasing as the broker owner would remove the shared frames other processes are reading
+        mode = self.policy.decide(interval, can_release=self.broker is None)
+        if mode == CameraDutyCycle.RELEASE:
+            self.release()
+        elif mode == CameraDutyCycle.LOW_RATE:
+            self.normal_fps = self._capture_call(self.cap.get, cv2.CAP_PROP_FPS)
+            if not self._capture_call(self.cap.set, cv2.CAP_PROP_FPS, CameraDutyCycle.LOW_FPS):
+                # the device ignores frame rate requests - never ask again
+                self.policy.low_rate_supported = False
+                mode = CameraDutyCycle.HOLD
+
+        self.paused_mode = None if mode == CameraDutyCycle.HOLD else mode
+        return mode
+
+    def resume(self) -> bool:
+        # undo pause() before the next sample
+        mode, self.paused_mode = self.paused_mode, None
+
+        if mode == CameraDutyCycle.RELEASE:
+            return self.open(self.image_path, self.camera_index)
+        if mode == CameraDutyCycle.LOW_RATE and self.cap is not None and self.normal_fps:
+            self._capture_call(self.cap.set, cv2.CAP_PROP_FPS, self.normal_fps)
+        return self.is_open
+
+    def _capture_call(self, function, *args):
+        # while a grabber or broker thread reads the device, calls on it have to run on that thread
+        owner = self.broker or self.grabber
+        if owner is not None and owner.is_running:
+            return owner.control.call(function, *args)
+        return function(*args)
+
+    def wait(self, interval: float, wake: Optional[threading.Event] = None) -> None:
+        # wait until the next sample, ending early when wake is set
+        if self.is_recorded and not self.cap.realtime:
+            # fast playback - move on in recording time instead of sleeping
+            self.cap.skip(interval)
+            return
+
+        self.pause(interval)
+        if wake is None:
+            time.sleep(interval)
+        else:
+            wake.wait(interval)
+
     def read(self) -> Tuple[bool, Optional[cv2.Mat]]:
         # read a frame from the camera
+        if self.paused_mode is not None and not self.resume():
+            return False, None
+
+        if self.reader is not None:
+            if self.broker is None and self.reader.is_stale() and not self._take_over_capture():
+                return False, None
+            if self.reader is not None:
+                return self.reader.read()
+
         if not self.is_open or self.cap is None:
             return False, None
 
-        return self.cap.read()
+        if self.grabber is not None:
+            return self.grabber.read()
+
+        # reuse the previous frame's buffer, valid until the next read
+        ret, frame = self.cap.read(self.frame_buffer)
+        if ret and frame is not None:
+            self.frame_buffer = frame
+        return ret, frame
+
+    def read_burst(self, count: int, interval: float = 0.0) -> List[cv2.Mat]:
+        # copies of up to count frames taken interval seconds apart, reads reuse their buffers
+        frames = []
+        for index in range(count):
+            if index and interval:
+                self.wait(interval)
+            ret, frame = self.read()
+            if not ret:
+                break
+            frames.append(frame.copy())
+        return frames
+
+    @property
+    def frame_timestamp(self) -> float:
+        # capture time of the frame returned by the last read
+        if self.reader is not None:
+            return self.reader.last_timestamp
+        if self.grabber is not None:
+            return self.grabber.frame_timestamp
+        return 0.0
+
+    @property
+    def dropped_frames(self) -> int:
+        # frames captured but never returned by read
+        if self.reader is not None:
+            return self.reader.dropped_frames
+        if self.grabber is not None:
+            return self.grabber.dropped_frames
+        return 0
 
     def release(self) -> None:
         # release camera resources
+        self.paused_mode = None
+
+        if self.reader is not None:
+            self.reader.release()
+            self.reader = None
+            self.is_open = False
+
+        if self.broker is not None:
+            self.broker.stop()
+            self.broker = None
+
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
+
         if self.cap is not None:
+            started = time.monotonic()
             self.cap.release()
+            self.cap = None
             self.is_open = False
 
+            self.policy.record_close(time.monotonic() - started)
+            if self.held_since is not None:
+                self.held_seconds += started - self.held_since
+                self.held_since = None
+
+    def stats(self) -> dict:
+        # device open and close latency, time held and the duty cycle decisions
+        held_seconds = self.held_seconds
+        if self.held_since is not None:
+            held_seconds += time.monotonic() - self.held_since
+
+        return {
+            "device_opens": self.device_opens,
+            "held_seconds": held_seconds,
+            **self.policy.stats(),
+        }
+
     def __enter__(self):
         # context manager entry
         return self
@@ -0,0 +1,61 @@
+from collections import deque
+
+
+class CameraDutyCycle:
+    # decide per sampling interval whether to keep the camera open, slow it down or release it
+    HOLD = "hold"
+    LOW_RATE = "low_rate"
+    RELEASE = "release"
+
+    DEFAULT_REOPEN_COST = 1.0  # seconds to close and reopen a webcam, until one is measured
+    RELEASE_COST_RATIO = 0.2  # release when reopening takes at most this share of the interval
+    LOW_FPS = 1  # frame rate requested from the device between samples
+    MIN_LOW_RATE_INTERVAL = 2.0  # shorter intervals would spend most of the time switching rates
+    LATENCY_HISTORY = 20  # open and close measurements kept
+
+    def __init__(self):
+        self.open_latencies = deque(maxlen=self.LATENCY_HISTORY)
+        self.close_latencies = deque(maxlen=self.LATENCY_HISTORY)
+        self.low_rate_supported = True
+        self.decisions = {self.HOLD: 0, self.LOW_RATE: 0, self.RELEASE: 0}
+
+    def record_open(self, seconds: float) -> None:
+        self.open_latencies.append(seconds)
+
+    def record_close(self, seconds: float) -> None:
+        self.close_latencies.append(seconds)
+
+    def reopen_cost(self) -> float:
+        # measured seconds to close and open the device again
+        if not self.open_latencies:
+            return self.DEFAULT_REOPEN_COST
+
+        close = sum(self.close_latencies) / len(self.close_latencies) if self.close_latencies else 0.0
+        return sum(self.open_latencies) / len(self.open_latencies) + close
+
+    def decide(self, interval: float, can_release: bool = True) -> str:
+        # mode for the device until the next sample, interval seconds from now
+        # can_release is False while other processes read their frames from this device
+        if can_release and self.reopen_cost() <= interval * self.RELEASE_COST_RATIO:
+            mode = self.RELEASE
+        elif self.low_rate_supported and interval >= self.MIN_LOW_RATE_INTERVAL:
+            mode = self.LOW_RATE
+        else:
+            mode = self.HOLD
+
+        self.decisions[mode] += 1
+        return mode
+
+    def stats(self) -> dict:
+        # latencies in milliseconds and how often each mode was chosen
+        def milliseconds(values) -> dict:
+            if not values:
+                return {"mean": 0.0, "max": 0.0}
+            return {"mean": 1000 * sum(values) / len(values), "max": 1000 * max(values)}
+
+        return {
+            "open_ms": milliseconds(self.open_latencies),
+            "close_ms": milliseconds(self.close_latencies),
+            "reopen_cost_s": self.reopen_cost(),
+            "decisions": dict(self.decisions),
+        }
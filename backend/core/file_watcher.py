@@ -0,0 +1,104 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Optional
+
+
+class FileWatcher:
+    # block until a file may have changed - inotify on Linux, modification time polling elsewhere
+    POLL_INTERVAL = 1  # seconds between modification time checks without inotify
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+    def __init__(self, path: str, poll_interval: float = POLL_INTERVAL):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = self._open_inotify()
+        self._mtime = self._get_modification_time()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def _open_inotify(self) -> Optional[int]:
+        # watch the directory, so atomic replaces of the file are seen too
+        if not sys.platform.startswith("linux"):
+            return None
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+            if fd < 0:
+                return None
+
+            mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+            directory = os.path.dirname(os.path.abspath(self.path)).encode()
+            if libc.inotify_add_watch(fd, directory, mask) < 0:
+                os.close(fd)
+                return None
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable, polling {self.path}: {e}")
+            return None
+
+        return fd
+
+    def _get_modification_time(self) -> float:
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return 0
+
+    def _read_events(self) -> bool:
+        # drain pending events, returns True if any of them names the watched file
+        name = os.path.basename(self.path).encode()
+        changed = False
+
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return changed
+
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                event_name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                changed = changed or event_name == name
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        # returns True when the file may have changed, False when the timeout ran out first
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            if self._fd is not None:
+                readable, _, _ = select.select([self._fd], [], [], remaining)
+                if readable and self._read_events():
+                    return True
+            else:
+                time.sleep(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+                mtime = self._get_modification_time()
+                if mtime != self._mtime:
+                    self._mtime = mtime
+                    return True
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,349 @@
+import os
+import time
+import struct
+import threading
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+class SharedFrame(NamedTuple):
+    frame: np.ndarray
+    sequence: int
+    timestamp: float
+
+
+def shared_frames_name(camera_index: int = 0) -> str:
+    # name of the shared memory block for a camera
+    return f"sim_camera_{camera_index}"
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    # attach without letting the resource tracker unlink the owner's block on exit
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    shm = shared_memory.SharedMemory(name=name)
+    owner_pid = 0
+    if shm.size >= _RingLayout.HEADER_BYTES:
+        owner_pid = struct.unpack_from("q", shm.buf, _RingLayout.OWNER_PID_OFFSET)[0]
+
+    if owner_pid != os.getpid():
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+    return shm
+
+
+def remove_shared_frames(name: str) -> None:
+    # remove a block left behind by an owner that exited without cleaning up
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    _close_shared_memory(shm)
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _close_shared_memory(shm: shared_memory.SharedMemory) -> None:
+    # close the mapping, leaving it to the garbage collector while frame views are still held
+    try:
+        shm.close()
+    except BufferError:
+        pass
+
+
+class _RingLayout:
+    # shared memory layout: header | heartbeat | slot sequences | slot timestamps | frames
+    MAGIC = 0x53494D46
+    HEADER_FIELDS = 8  # magic, height, width, channels, slots, write_seq, owner_pid, reserved
+    HEADER_BYTES = 64
+    OWNER_PID_OFFSET = 48
+    HEARTBEAT_BYTES = 64
+    ALIGNMENT = 64
+
+    def __init__(self, buf, slots: int = 0, shape: Tuple[int, int, int] = (0, 0, 0)):
+        self.header = np.ndarray((self.HEADER_FIELDS,), dtype=np.int64, buffer=buf, offset=0)
+        self.heartbeat = np.ndarray((1,), dtype=np.float64, buffer=buf, offset=self.HEADER_BYTES)
+
+        if slots == 0:
+            slots = int(self.header[4])
+            shape = (int(self.header[1]), int(self.header[2]), int(self.header[3]))
+
+        offset = self.HEADER_BYTES + self.HEARTBEAT_BYTES
+        self.slot_sequences = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8 * slots
+        self.slot_timestamps = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=offset)
+        offset += 8 * slots
+        offset = self._align(offset)
+        self.frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=buf, offset=offset)
+        self.slots = slots
+        self.shape = shape
+
+    @classmethod
+    def _align(cls, offset: int) -> int:
+        return (offset + cls.ALIGNMENT - 1) // cls.ALIGNMENT * cls.ALIGNMENT
+
+    @classmethod
+    def size(cls, slots: int, shape: Tuple[int, int, int]) -> int:
+        # total bytes needed for a ring with the given slot count and frame shape
+        offset = cls._align(cls.HEADER_BYTES + cls.HEARTBEAT_BYTES + 16 * slots)
+        return offset + slots * int(np.prod(shape))
+
+
+class CaptureControl:
+    # runs calls on the device from the thread that reads it, VideoCapture is not thread-safe
+    TIMEOUT = 2.0  # seconds to wait for the capture thread, a read at a low frame rate can take one second
+
+    def __init__(self):
+        self._pending = deque()
+
+    def call(self, function: Callable, *args) -> Any:
+        # run function(*args) on the capture thread between two reads, None if it did not get to it in time
+        done = threading.Event()
+        result = []
+        self._pending.append((function, args, done, result))
+        done.wait(self.TIMEOUT)
+        return result[0] if result else None
+
+    def run_pending(self) -> None:
+        # called by the capture thread before each read
+        while self._pending:
+            function, args, done, result = self._pending.popleft()
+            try:
+                result.append(function(*args))
+            except Exception as e:
+                print(f"Camera call failed: {e}")
+            done.set()
+
+
+class FrameBroker:
+    # single capture owner publishing camera frames into a shared memory ring buffer
+    SLOT_COUNT = 4
+
+    def __init__(self, name: str, slots: int = SLOT_COUNT):
+        self.name = name
+        self.slots = slots
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.layout: Optional[_RingLayout] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+        self.control = CaptureControl()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running.is_set()
+
+    def create(self, shape: Tuple[int, ...]) -> bool:
+        # allocate the ring buffer for frames of the given shape
+        if len(shape) == 2:
+            shape = (shape[0], shape[1], 1)
+
+        try:
+            self.shm = shared_memory.SharedMemory(
+                name=self.name, create=True, size=_RingLayout.size(self.slots, shape))
+        except FileExistsError:
+            return False
+
+        self.layout = _RingLayout(self.shm.buf, self.slots, shape)
+        self.layout.header[:] = [_RingLayout.MAGIC, shape[0], shape[1], shape[2], self.slots, 0, os.getpid(), 0]
+        self.layout.slot_sequences[:] = 0
+        self.layout.heartbeat[0] = time.time()
+        return True
+
+    def _next_slot(self) -> Tuple[int, int]:
+        # sequence number and slot of the next frame, the slot is marked as being written
+        layout = self.layout
+        sequence = int(layout.header[5]) + 1
+        slot = sequence % layout.slots
+        layout.slot_sequences[slot] = -1
+        return sequence, slot
+
+    def _commit(self, sequence: int, slot: int, timestamp: Optional[float] = None) -> int:
+        # make a written slot the newest frame
+        layout = self.layout
+        layout.slot_timestamps[slot] = timestamp if timestamp is not None else time.time()
+        layout.slot_sequences[slot] = sequence
+        layout.header[5] = sequence
+        layout.heartbeat[0] = time.time()
+        return sequence
+
+    def publish(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        # copy a frame into the next slot and return its sequence number
+        sequence, slot = self._next_slot()
+        np.copyto(self.layout.frames[slot], frame.reshape(self.layout.shape))
+        return self._commit(sequence, slot, timestamp)
+
+    def capture(self, cap) -> int:
+        # read the next frame from the device straight into its slot, returns its sequence number or 0
+        sequence, slot = self._next_slot()
+        target = self.layout.frames[slot]
+        ret, frame = cap.read(target if target.shape[2] == 3 else None)
+        if not ret or frame is None:
+            return 0
+
+        # the device only writes in place when the frame matches the slot
+        if not np.may_share_memory(frame, target):
+            np.copyto(target, frame.reshape(self.layout.shape))
+        return self._commit(sequence, slot)
+
+    def start(self, cap) -> bool:
+        # read the first frame to size the ring, then publish from a background thread
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            return False
+
+        if not self.create(frame.shape):
+            return False
+
+        self.publish(frame)
+        self._running.set()
+        self._thread = threading.Thread(target=self._capture_loop, args=(cap,), daemon=True)
+        self._thread.start()
+        return True
+
+    def _capture_loop(self, cap) -> None:
+        # keep publishing frames until stopped
+        while self._running.is_set():
+            self.control.run_pending()
+            if not self.capture(cap):
+                time.sleep(0.01)
+
+    def stop(self) -> None:
+        # stop publishing and remove the shared memory block
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+        if self.shm is not None:
+            self.layout = None
+            _close_shared_memory(self.shm)
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = None
+
+
+class SharedFrameReader:
+    # consumer of a FrameBroker ring buffer with a CameraManager-compatible API
+    # read_frame returns zero-copy views, read copies the frame out because the writer reuses the slot
+    STALE_AFTER = 2.0  # seconds without a heartbeat before the owner is considered gone
+    READ_ATTEMPTS = 3  # copies retried when the writer overwrites the slot during the copy
+
+    def __init__(self, name: str):
+        self.name = name
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.layout: Optional[_RingLayout] = None
+        self.is_open = False
+        self.last_sequence = 0
+        self.last_timestamp = 0.0
+        self.dropped_frames = 0  # frames published between two reads
+        self.buffer: Optional[np.ndarray] = None  # reused by read
+
+    def open(self) -> bool:
+        # attach to an existing broker
+        if self.is_open:
+            return True
+
+        try:
+            self.shm = _attach_shared_memory(self.name)
+        except FileNotFoundError:
+            return False
+
+        if self.shm.size < _RingLayout.HEADER_BYTES + _RingLayout.HEARTBEAT_BYTES:
+            _close_shared_memory(self.shm)
+            self.shm = None
+            return False
+
+        header = np.ndarray((_RingLayout.HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        is_ready = int(header[0]) == _RingLayout.MAGIC
+        del header
+        if not is_ready:
+            _close_shared_memory(self.shm)
+            self.shm = None
+            return False
+
+        self.layout = _RingLayout(self.shm.buf)
+        self.is_open = True
+        return True
+
+    def is_stale(self) -> bool:
+        # check if the owner stopped publishing
+        if not self.is_open:
+            return True
+        return time.time() - float(self.layout.heartbeat[0]) > self.STALE_AFTER
+
+    def read_frame(self) -> Optional[SharedFrame]:
+        # return a view of the newest frame with its sequence number and capture time
+        if not self.is_open:
+            return None
+
+        layout = self.layout
+        for _ in range(layout.slots):
+            sequence = int(layout.header[5])
+            if sequence == 0:
+                return None
+
+            slot = sequence % layout.slots
+            timestamp = float(layout.slot_timestamps[slot])
+            if int(layout.slot_sequences[slot]) == sequence:
+                if self.last_sequence and sequence > self.last_sequence + 1:
+                    self.dropped_frames += sequence - self.last_sequence - 1
+                self.last_sequence = sequence
+                self.last_timestamp = timestamp
+                return SharedFrame(layout.frames[slot], sequence, timestamp)
+
+        return None
+
+    def is_new(self, sequence: int) -> bool:
+        # check if a sequence number is newer than the last one read
+        return sequence > self.last_sequence
+
+    def is_valid(self, shared_frame: SharedFrame) -> bool:
+        # check that a zero-copy view has not been overwritten by the writer
+        slot = shared_frame.sequence % self.layout.slots
+        return int(self.layout.slot_sequences[slot]) == shared_frame.sequence
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        # copy of the newest frame in this reader's buffer, valid until the next read
+        for _ in range(self.READ_ATTEMPTS):
+            shared_frame = self.read_frame()
+            if shared_frame is None:
+                return False, None
+
+            if self.buffer is None or self.buffer.shape != shared_frame.frame.shape:
+                self.buffer = np.empty_like(shared_frame.frame)
+            np.copyto(self.buffer, shared_frame.frame)
+
+            # the slot may have been rewritten while it was copied
+            if self.is_valid(shared_frame):
+                frame = self.buffer
+                if frame.shape[2] == 1:
+                    frame = frame[:, :, 0]
+                return True, frame
+
+        return False, None
+
+    def release(self) -> None:
+        # detach from the broker
+        if self.shm is not None:
+            self.layout = None
+            _close_shared_memory(self.shm)
+            self.shm = None
+        self.is_open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -0,0 +1,171 @@
+import os
+import time
+from typing import Iterable, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource:
+    # recorded frames behind the part of the cv2.VideoCapture interface that CameraManager uses
+    # realtime playback drops frames to keep up with the wall clock, otherwise frames come as fast as they are read
+    DEFAULT_FPS = 30.0
+
+    def __init__(self, fps: Optional[float] = None, realtime: bool = True, loop: bool = False):
+        self.fps = fps or self.DEFAULT_FPS
+        self.realtime = realtime
+        self.loop = loop
+        self.position = 0  # frames read or skipped so far
+        self.started_at: Optional[float] = None
+        self.opened = True
+
+    def _next(self) -> Optional[np.ndarray]:
+        # the next frame, None at the end
+        raise NotImplementedError
+
+    def _advance(self) -> bool:
+        # move past the next frame without using it, False at the end
+        return self._next() is not None
+
+    def _rewind(self) -> bool:
+        return False
+
+    def _close(self) -> None:
+        pass
+
+    def _at_end(self) -> bool:
+        # wrap around when looping, returns True if there is nothing left to play
+        return not (self.loop and self._rewind())
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def skip_frames(self, count: int) -> None:
+        for _ in range(max(0, count)):
+            if not self._advance():
+                if self._at_end() or not self._advance():
+                    return
+            self.position += 1
+
+    def skip(self, seconds: float) -> None:
+        # jump ahead in recording time, for fast playback of a sampling loop
+        self.skip_frames(int(round(seconds * self.fps)) - 1)
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        # image is accepted like cv2.VideoCapture.read, recorded frames are returned as they are
+        if not self.opened:
+            return False, None
+
+        if self.realtime:
+            now = time.monotonic()
+            if self.started_at is None:
+                self.started_at = now - self.position / self.fps
+            self.skip_frames(int((now - self.started_at) * self.fps) - self.position)
+
+        frame = self._next()
+        if frame is None and not self._at_end():
+            frame = self._next()
+        if frame is None:
+            return False, None
+
+        self.position += 1
+        return True, frame
+
+    def set(self, prop: int, value: float) -> bool:
+        # recordings keep their own frame size and rate
+        return False
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        return 0.0
+
+    def release(self) -> None:
+        if self.opened:
+            self.opened = False
+            self._close()
+
+
+class VideoFileSource(FrameSource):
+    # frames decoded from a recorded video file
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False):
+        self.capture = cv2.VideoCapture(path)
+        super().__init__(self.capture.get(cv2.CAP_PROP_FPS), realtime, loop)
+        self.opened = self.capture.isOpened()
+
+    def _next(self) -> Optional[np.ndarray]:
+        ret, frame = self.capture.read()
+        return frame if ret else None
+
+    def _advance(self) -> bool:
+        # grab without decoding into an image
+        return self.capture.grab()
+
+    def _rewind(self) -> bool:
+        return self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _close(self) -> None:
+        self.capture.release()
+
+
+class ImageDirectorySource(FrameSource):
+    # frames from the images in a directory, in file name order
+    def __init__(self, path: str, fps: Optional[float] = None, realtime: bool = True, loop: bool = False):
+        super().__init__(fps, realtime, loop)
+        self.files: List[str] = sorted(
+            os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.index = 0
+        self.opened = bool(self.files)
+
+    def _next(self) -> Optional[np.ndarray]:
+        while self.index < len(self.files):
+            frame = cv2.imread(self.files[self.index])
+            self.index += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def _advance(self) -> bool:
+        # skipped images are never decoded
+        if self.index >= len(self.files):
+            return False
+        self.index += 1
+        return True
+
+    def _rewind(self) -> bool:
+        self.index = 0
+        return True
+
+
+class GeneratorSource(FrameSource):
+    # frames from an in-memory sequence or generator, lists and tuples can loop
+    def __init__(self, frames: Iterable[np.ndarray], fps: Optional[float] = None, realtime: bool = True,
+                 loop: bool = False):
+        super().__init__(fps, realtime, loop)
+        self.frames = frames
+        self.iterator = iter(frames)
+
+    def _next(self) -> Optional[np.ndarray]:
+        return next(self.iterator, None)
+
+    def _rewind(self) -> bool:
+        if not isinstance(self.frames, (list, tuple)):
+            return False
+        self.iterator = iter(self.frames)
+        return True
+
+
+def create_source(source: Union[int, str, Iterable[np.ndarray]], realtime: bool = True, loop: bool = False):
+    # a live camera for an index, otherwise a recorded source for a directory, video file or frames
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return cv2.VideoCapture(int(source))
+    if isinstance(source, str) and os.path.isdir(source):
+        return ImageDirectorySource(source, realtime=realtime, loop=loop)
+    if isinstance(source, str):
+        return VideoFileSource(source, realtime=realtime, loop=loop)
+    return GeneratorSource(source, realtime=realtime, loop=loop)
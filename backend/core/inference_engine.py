@@ -0,0 +1,286 @@
+import ast
+import hashlib
+import os
+import cv2
+import numpy as np
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+
+class Detections(NamedTuple):
+    boxes: np.ndarray  # (N, 4) xyxy in image coordinates
+    confidences: np.ndarray  # (N,)
+    class_ids: np.ndarray  # (N,)
+    keypoints: Optional[np.ndarray] = None  # (N, K, 3) x, y, visibility for pose models
+
+
+def empty_detections(keypoint_shape: Optional[Tuple[int, int]] = None) -> Detections:
+    # detections for an image without any objects
+    keypoints = None
+    if keypoint_shape is not None:
+        keypoints = np.zeros((0,) + tuple(keypoint_shape), dtype=np.float32)
+    return Detections(np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32),
+                      np.zeros(0, dtype=np.int64), keypoints)
+
+
+# sha256 per (path, size, modification time), so unchanged weights are read and hashed once per process
+_file_hashes = {}
+
+
+def file_hash(path: str) -> str:
+    # sha256 of a file's content
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key in _file_hashes:
+        return _file_hashes[key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def onnx_path_for(weights_path: str) -> str:
+    # cached ONNX file for a weights file, keyed by the weights' content hash
+    stem, _ = os.path.splitext(weights_path)
+    return f"{stem}.{file_hash(weights_path)[:16]}.onnx"
+
+
+def export_onnx(weights_path: str, imgsz: int = 640) -> str:
+    # export weights to ONNX once and reuse the cached file afterwards
+    onnx_path = onnx_path_for(weights_path)
+    if os.path.exists(onnx_path):
+        return onnx_path
+
+    # only the one-time export needs torch
+    from ultralytics import YOLO
+
+    exported_path = YOLO(weights_path).export(format="onnx", imgsz=imgsz, dynamic=True)
+    os.replace(exported_path, onnx_path)
+    return onnx_path
+
+
+def letterbox(image: np.ndarray, imgsz: int, stride: int = 32) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    # resize keeping the aspect ratio and pad to a multiple of the stride, like ultralytics
+    height, width = image.shape[:2]
+    gain = min(imgsz / height, imgsz / width)
+    new_width, new_height = int(round(width * gain)), int(round(height * gain))
+
+    pad_width = (imgsz - new_width) % stride / 2
+    pad_height = (imgsz - new_height) % stride / 2
+
+    if (width, height) != (new_width, new_height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+
+    top, bottom = int(round(pad_height - 0.1)), int(round(pad_height + 0.1))
+    left, right = int(round(pad_width - 0.1)), int(round(pad_width + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return image, gain, (left, top)
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    # indices of the boxes kept by greedy NMS, highest score first
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size > 0:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+
+        inter_width = np.maximum(0.0, np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]))
+        inter_height = np.maximum(0.0, np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]))
+        intersection = inter_width * inter_height
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+
+        order = rest[iou <= iou_threshold]
+
+    return np.array(keep, dtype=np.int64)
+
+
+class OnnxModel:
+    # torch-free forward passes with onnxruntime and NumPy pre/post-processing
+    IOU_THRESHOLD = 0.7
+    MAX_DETECTIONS = 300
+    MAX_WH = 7680  # class offset so NMS never merges boxes of different classes
+    BUFFER_SHAPES = 8  # padded shapes with preallocated buffers, crops of varying size add more
+
+    def __init__(self, onnx_path: str):
+        import onnxruntime
+
+        self.path = onnx_path
+        self.session = onnxruntime.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.buffers = {}
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.imgsz = ast.literal_eval(metadata.get("imgsz", "[640, 640]"))[0]
+        self.stride = int(metadata.get("stride", 32))
+        self.keypoint_shape = None
+        if "kpt_shape" in metadata:
+            self.keypoint_shape = tuple(ast.literal_eval(metadata["kpt_shape"]))
+
+    def _buffers(self, shape: Tuple[int, int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        # letterbox canvas and input tensor for one padded shape, reused across frames
+        buffers = self.buffers.get(shape)
+        if buffers is None:
+            if len(self.buffers) >= self.BUFFER_SHAPES:
+                self.buffers.clear()
+            canvas = np.full(shape, 114, dtype=np.uint8)
+            tensor = np.empty((1, 3) + shape[:2], dtype=np.float32)
+            buffers = self.buffers[shape] = (canvas, tensor)
+        return buffers
+
+    def preprocess(self, image: np.ndarray, imgsz: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        # letterboxed BGR image to a normalized NCHW RGB tensor, valid until the next call
+        if image.ndim != 3 or image.shape[2] != 3:
+            padded, gain, pad = letterbox(image, imgsz, self.stride)
+            tensor = padded[:, :, ::-1].transpose(2, 0, 1)
+            return np.ascontiguousarray(tensor, dtype=np.float32)[None] / 255.0, gain, pad
+
+        # same geometry as letterbox(), resized straight into the padded canvas
+        height, width = image.shape[:2]
+        gain = min(imgsz / height, imgsz / width)
+        new_width, new_height = int(round(width * gain)), int(round(height * gain))
+        pad_width = (imgsz - new_width) % self.stride / 2
+        pad_height = (imgsz - new_height) % self.stride / 2
+        top, bottom = int(round(pad_height - 0.1)), int(round(pad_height + 0.1))
+        left, right = int(round(pad_width - 0.1)), int(round(pad_width + 0.1))
+
+        canvas, tensor = self._buffers((new_height + top + bottom, new_width + left + right, 3))
+        inner = canvas[top:top + new_height, left:left + new_width]
+        if (width, height) != (new_width, new_height):
+            cv2.resize(image, (new_width, new_height), dst=inner, interpolation=cv2.INTER_LINEAR)
+        else:
+            np.copyto(inner, image)
+
+        # BGR to RGB and HWC to CHW while normalizing, one channel at a time
+        for channel in range(3):
+            np.divide(canvas[:, :, 2 - channel], np.float32(255.0), out=tensor[0, channel])
+        return tensor, gain, (left, top)
+
+    def postprocess(self, output: np.ndarray, conf: float, gain: float, pad: Tuple[int, int],
+                    image_shape: Tuple[int, ...]) -> Detections:
+        # decode one image's raw output into detections in image coordinates
+        keypoint_values = int(np.prod(self.keypoint_shape)) if self.keypoint_shape else 0
+        class_count = output.shape[0] - 4 - keypoint_values
+
+        # reduce over the classes in the output's own layout (4 + classes + keypoints, anchors), a transposed
+        # argmax would copy every score first
+        class_scores = output[4:4 + class_count]
+        scores = class_scores.max(axis=0)
+
+        candidates = scores > conf
+        if not candidates.any():
+            return empty_detections(self.keypoint_shape)
+
+        predictions = output[:, candidates].T  # (candidates, 4 + classes + keypoints)
+        scores = scores[candidates]
+        class_ids = predictions[:, 4:4 + class_count].argmax(axis=1)
+
+        center_x, center_y, box_width, box_height = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+        boxes = np.stack([
+            center_x - box_width / 2,
+            center_y - box_height / 2,
+            center_x + box_width / 2,
+            center_y + box_height / 2,
+        ], axis=1)
+
+        keep = non_max_suppression(boxes + (class_ids * self.MAX_WH)[:, None], scores, self.IOU_THRESHOLD)
+        keep = keep[:self.MAX_DETECTIONS]
+
+        height, width = image_shape[:2]
+        pad_x, pad_y = pad
+
+        boxes = boxes[keep]
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_x) / gain).clip(0, width)
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_y) / gain).clip(0, height)
+
+        keypoints = None
+        if self.keypoint_shape is not None:
+            keypoints = predictions[keep, 4 + class_count:].reshape((-1,) + self.keypoint_shape).copy()
+            keypoints[..., 0] = ((keypoints[..., 0] - pad_x) / gain).clip(0, width)
+            keypoints[..., 1] = ((keypoints[..., 1] - pad_y) / gain).clip(0, height)
+
+        return Detections(boxes.astype(np.float32), scores[keep].astype(np.float32), class_ids[keep], keypoints)
+
+    def predict(self, image: np.ndarray, conf: float = 0.25, imgsz: Optional[int] = None) -> Detections:
+        # detections for one BGR image
+        tensor, gain, pad = self.preprocess(image, imgsz or self.imgsz)
+        output = self.session.run(None, {self.input_name: tensor})[0]
+        return self.postprocess(output[0], conf, gain, pad, image.shape)
+
+    def predict_batch(self, images: Sequence[np.ndarray], conf: float = 0.25,
+                      imgsz: Optional[int] = None) -> List[Detections]:
+        # detections for BGR images of one size in a single forward pass, e.g. a calibration burst
+        imgsz = imgsz or self.imgsz
+        batch = None
+        geometry = []
+        for index, image in enumerate(images):
+            tensor, gain, pad = self.preprocess(image, imgsz)
+            if batch is None:
+                batch = np.empty((len(images),) + tensor.shape[1:], dtype=np.float32)
+            elif tensor.shape[1:] != batch.shape[1:]:
+                raise ValueError("Images in one batch must have the same size")
+            # the preprocessed tensor is reused by the next call, so it is copied into the batch
+            batch[index] = tensor[0]
+            geometry.append((gain, pad, image.shape))
+
+        if batch is None:
+            return []
+
+        output = self.session.run(None, {self.input_name: batch})[0]
+        return [self.postprocess(output[index], conf, gain, pad, shape)
+                for index, (gain, pad, shape) in enumerate(geometry)]
+
+
+class UltralyticsModel:
+    # forward passes through ultralytics, used when the ONNX backend is not available
+    def __init__(self, weights_path: str):
+        from ultralytics import YOLO
+
+        self.path = weights_path
+        self.model = YOLO(weights_path)
+
+    @staticmethod
+    def _detections(result) -> Detections:
+        # ultralytics result to NumPy detections
+        keypoints = None
+        if result.keypoints is not None:
+            keypoints = result.keypoints.data.cpu().numpy()
+
+        boxes = result.boxes
+        return Detections(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(),
+                          boxes.cls.cpu().numpy().astype(np.int64), keypoints)
+
+    def predict(self, image: np.ndarray, conf: float = 0.25, imgsz: Optional[int] = None) -> Detections:
+        # detections for one BGR image
+        kwargs = {"imgsz": imgsz} if imgsz else {}
+        return self._detections(self.model.predict(image, conf=conf, verbose=False, **kwargs)[0])
+
+    def predict_batch(self, images: Sequence[np.ndarray], conf: float = 0.25,
+                      imgsz: Optional[int] = None) -> List[Detections]:
+        # detections for several BGR images in a single forward pass
+        if not len(images):
+            return []
+        kwargs = {"imgsz": imgsz} if imgsz else {}
+        results = self.model.predict(list(images), conf=conf, verbose=False, **kwargs)
+        return [self._detections(result) for result in results]
+
+
+def load_model(weights_path: str, backend: str = "onnx", variant: str = "fp32"):
+    # model for forward passes, preferring the torch-free ONNX backend
+    if backend == "onnx":
+        try:
+            onnx_path = export_onnx(weights_path)
+            if variant != "fp32":
+                from backend.core.model_variants import load_variant
+                return load_variant(onnx_path, variant)
+            return OnnxModel(onnx_path)
+        except Exception as e:
+            print(f"ONNX backend unavailable for {weights_path}, using ultralytics: {e}")
+
+    return UltralyticsModel(weights_path)
@@ -0,0 +1,256 @@
+import json
+import os
+import time
+import tracemalloc
+from collections import deque
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from .settings_manager import SettingsManager
+
+
+class Histogram:
+    # lifetime count and sum plus a rolling window of recent observations for the percentiles
+    WINDOW = 256
+
+    def __init__(self, window: int = WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def summary(self) -> dict:
+        # percentiles over the window, computed only when exported
+        samples = sorted(self.samples)
+        if not samples:
+            return {"count": self.count, "sum": self.total, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+        def percentile(fraction: float) -> float:
+            return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": samples[-1],
+        }
+
+
+class StageTimer:
+    # times a with block on the monotonic clock into a histogram, one instance per stage and reused
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class AllocationTracker:
+    # bytes allocated inside a with block, only measured while tracemalloc is tracing (python -X tracemalloc)
+    # resets the tracemalloc peak, so blocks must not be nested
+    def __init__(self, peak: Histogram, net: Histogram):
+        self.peak = peak
+        self.net = net
+        self.started: Optional[int] = None
+
+    def __enter__(self):
+        self.started = None
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self.started = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc):
+        if self.started is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak.observe(peak - self.started)
+            self.net.observe(current - self.started)
+        return False
+
+
+class Metrics:
+    # per-process timers, counters and resource usage, exported periodically to a file that can be scraped or tailed
+    _instance = None
+    _lock = Lock()
+
+    EXPORT_INTERVAL = 60  # seconds between exports
+    PREFIX = "healthy_computer"
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            # keyed by (feature, name)
+            self.counters: Dict[Tuple[str, str], int] = {}
+            self.histograms: Dict[Tuple[str, str], Histogram] = {}
+            self.timers: Dict[Tuple[str, str], StageTimer] = {}
+            # bytes allocated per frame, keyed by (feature, "peak" or "net")
+            self.allocated: Dict[Tuple[str, str], Histogram] = {}
+            self.allocation_trackers: Dict[str, AllocationTracker] = {}
+
+            self.process_name: Optional[str] = None
+            self.path: Optional[str] = None
+            self.last_export = time.monotonic()
+            self._process = None
+            self.initialized = True
+
+    def timer(self, feature: str, stage: str) -> StageTimer:
+        # with metrics.timer("distance_check", "predict"): ...
+        key = (feature, stage)
+        timer = self.timers.get(key)
+        if timer is None:
+            timer = self.timers[key] = StageTimer(self.histogram(feature, stage))
+        return timer
+
+    def histogram(self, feature: str, name: str) -> Histogram:
+        key = (feature, name)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        return histogram
+
+    def allocations(self, feature: str) -> AllocationTracker:
+        # with metrics.allocations("distance_check"): ... around one frame
+        tracker = self.allocation_trackers.get(feature)
+        if tracker is None:
+            peak = self.allocated[(feature, "peak")] = Histogram()
+            net = self.allocated[(feature, "net")] = Histogram()
+            tracker = self.allocation_trackers[feature] = AllocationTracker(peak, net)
+        return tracker
+
+    def count(self, feature: str, name: str, amount: int = 1) -> None:
+        key = (feature, name)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def export_as(self, process_name: str) -> str:
+        # start exporting for this process, the format follows the "metrics_format" setting
+        settings = SettingsManager()
+        extension = "json" if settings.get("metrics_format", "prometheus") == "json" else "prom"
+        self.process_name = process_name
+        self.path = f"{settings.path}/metrics_{process_name}.{extension}"
+        self.sample_process()  # the first CPU reading only sets the baseline
+        return self.path
+
+    def sample_process(self) -> dict:
+        # CPU since the previous sample and resident memory of this process
+        if self._process is None:
+            try:
+                import psutil
+            except ImportError:
+                return {}
+            self._process = psutil.Process()
+
+        with self._process.oneshot():
+            return {
+                "cpu_percent": self._process.cpu_percent(None),
+                "rss_bytes": self._process.memory_info().rss,
+                "threads": self._process.num_threads(),
+            }
+
+    def snapshot(self) -> dict:
+        return {
+            "process": self.process_name,
+            "pid": os.getpid(),
+            "timestamp": time.time(),
+            "resources": self.sample_process(),
+            "counters": [
+                {"feature": feature, "name": name, "value": value}
+                for (feature, name), value in sorted(self.counters.items())
+            ],
+            "seconds": [
+                {"feature": feature, "name": name, **histogram.summary()}
+                for (feature, name), histogram in sorted(self.histograms.items())
+            ],
+            "allocated_bytes": [
+                {"feature": feature, "name": name, **histogram.summary()}
+                for (feature, name), histogram in sorted(self.allocated.items()) if histogram.count
+            ],
+        }
+
+    def prometheus(self, snapshot: dict) -> str:
+        # Prometheus text exposition format, for the node exporter textfile collector
+        prefix = self.PREFIX
+        process = snapshot["process"]
+        lines = []
+
+        resources = snapshot["resources"]
+        if resources:
+            lines += [
+                f"# TYPE {prefix}_process_cpu_percent gauge",
+                f'{prefix}_process_cpu_percent{{process="{process}"}} {resources["cpu_percent"]}',
+                f"# TYPE {prefix}_process_rss_bytes gauge",
+                f'{prefix}_process_rss_bytes{{process="{process}"}} {resources["rss_bytes"]}',
+                f"# TYPE {prefix}_process_threads gauge",
+                f'{prefix}_process_threads{{process="{process}"}} {resources["threads"]}',
+            ]
+
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for counter in snapshot["counters"]:
+            labels = f'process="{process}",feature="{counter["feature"]}",event="{counter["name"]}"'
+            lines.append(f"{prefix}_events_total{{{labels}}} {counter['value']}")
+
+        lines.append(f"# TYPE {prefix}_stage_seconds summary")
+        for stage in snapshot["seconds"]:
+            labels = f'process="{process}",feature="{stage["feature"]}",stage="{stage["name"]}"'
+            for quantile in ("p50", "p95", "p99"):
+                lines.append(f'{prefix}_stage_seconds{{{labels},quantile="0.{quantile[1:]}"}} {stage[quantile]:.6f}')
+            lines.append(f"{prefix}_stage_seconds_sum{{{labels}}} {stage['sum']:.6f}")
+            lines.append(f"{prefix}_stage_seconds_count{{{labels}}} {stage['count']}")
+
+        if snapshot["allocated_bytes"]:
+            lines.append(f"# TYPE {prefix}_frame_allocated_bytes summary")
+        for allocation in snapshot["allocated_bytes"]:
+            labels = f'process="{process}",feature="{allocation["feature"]}",kind="{allocation["name"]}"'
+            for quantile in ("p50", "p95", "p99"):
+                lines.append(f'{prefix}_frame_allocated_bytes{{{labels},quantile="0.{quantile[1:]}"}} {allocation[quantile]}')
+            lines.append(f"{prefix}_frame_allocated_bytes_sum{{{labels}}} {allocation['sum']}")
+            lines.append(f"{prefix}_frame_allocated_bytes_count{{{labels}}} {allocation['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self) -> bool:
+        # write the current metrics, replacing the file atomically so readers never see half of it
+        self.last_export = time.monotonic()
+        if self.path is None:
+            return False
+
+        snapshot = self.snapshot()
+        if self.path.endswith(".json"):
+            content = json.dumps(snapshot, indent=4)
+        else:
+            content = self.prometheus(snapshot)
+
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.write(content)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not export metrics: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+        return True
+
+    def maybe_export(self) -> bool:
+        # export when the interval has passed, cheap enough to call on every frame
+        if time.monotonic() - self.last_export < self.EXPORT_INTERVAL:
+            return False
+        return self.export()
@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import time
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+
+from backend.core.inference_engine import OnnxModel, export_onnx
+
+VARIANTS = ("fp32", "int8_dynamic", "int8_static")
+
+
+def variant_path(onnx_path: str, variant: str) -> str:
+    # file of a reduced-precision variant, sharing the content key of the FP32 export
+    if variant == "fp32":
+        return onnx_path
+    stem, _ = os.path.splitext(onnx_path)
+    return f"{stem}.{variant}.onnx"
+
+
+def build_variant(onnx_path: str, variant: str, calibration_images: Optional[List[np.ndarray]] = None) -> str:
+    # quantize the FP32 model into the requested variant
+    output_path = variant_path(onnx_path, variant)
+    if os.path.exists(output_path):
+        return output_path
+
+    from onnxruntime import quantization
+
+    if variant == "int8_dynamic":
+        quantization.quantize_dynamic(onnx_path, output_path, weight_type=quantization.QuantType.QUInt8)
+    elif variant == "int8_static":
+        if not calibration_images:
+            raise ValueError("Static quantization needs at least one calibration image")
+
+        class ImageCalibrationReader(quantization.CalibrationDataReader):
+            # feeds preprocessed calibration images to the static quantizer
+            def __init__(self, model: OnnxModel, images: List[np.ndarray]):
+                self.tensors = iter([{model.input_name: model.preprocess(image, model.imgsz)[0].copy()} for image in images])
+
+            def get_next(self) -> Optional[dict]:
+                return next(self.tensors, None)
+
+        reader = ImageCalibrationReader(OnnxModel(onnx_path), calibration_images)
+        quantization.quantize_static(
+            onnx_path, output_path, reader,
+            quant_format=quantization.QuantFormat.QDQ,
+            activation_type=quantization.QuantType.QUInt8,
+            weight_type=quantization.QuantType.QInt8,
+        )
+    else:
+        raise ValueError(f"Unknown model variant: {variant}")
+
+    return output_path
+
+
+def load_variant(onnx_path: str, variant: str) -> OnnxModel:
+    # ONNX model for a variant, building dynamic INT8 on demand and falling back to FP32
+    path = variant_path(onnx_path, variant)
+
+    if not os.path.exists(path) and variant == "int8_dynamic":
+        path = build_variant(onnx_path, variant)
+
+    if not os.path.exists(path):
+        print(f"Model variant {variant} not built yet, using fp32. Run python -m backend.core.model_variants")
+        path = onnx_path
+
+    return OnnxModel(path)
+
+
+def _face_area(detections) -> Optional[float]:
+    from backend.features.distance_check import DistanceCheck
+
+    if detections.keypoints is None or len(detections.keypoints) != 1:
+        return None
+    return float(DistanceCheck.face_area(detections.keypoints[0]))
+
+
+def _eye_ratios(detections) -> Optional[List[float]]:
+    from backend.features.eye_strain_prevention import EyeStrainPrevention
+
+    if len(detections.boxes) != 2:
+        return None
+    # left to right, so a variant that detects the eyes in the other order is still compared eye by eye
+    return [float(EyeStrainPrevention.eye_ratio(box)) for box in sorted(detections.boxes.tolist())]
+
+
+def split_images(images: List[np.ndarray]) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    # calibration images and held-out images the variants are scored on, alternating
+    # static quantization scored on its own calibration images would look better than it is
+    if len(images) < 2:
+        return images, images
+    return images[::2], images[1::2]
+
+
+def _measure(model: OnnxModel, images: List[np.ndarray], conf: float, runs: int) -> tuple:
+    # median latency per frame and the detections for every image
+    detections = [model.predict(image, conf=conf) for image in images]
+
+    latencies = []
+    for _ in range(runs):
+        for image in images:
+            start = time.perf_counter()
+            model.predict(image, conf=conf)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    return float(np.median(latencies)), detections
+
+
+def _relative_error(value, reference) -> Optional[float]:
+    if value is None or reference is None:
+        return None
+    value = np.atleast_1d(value)
+    reference = np.atleast_1d(reference)
+    return float(np.mean(np.abs(value - reference) / np.abs(reference)))
+
+
+def compare_variants(weights_path: str, metric, images: List[np.ndarray], conf: float = 0.5, runs: int = 10) -> dict:
+    # latency and geometry error of every variant against the FP32 model
+    onnx_path = export_onnx(weights_path)
+    calibration_images, evaluation_images = split_images(images)
+    report = {}
+    reference = None
+
+    for variant in VARIANTS:
+        try:
+            model = OnnxModel(build_variant(onnx_path, variant, calibration_images))
+        except Exception as e:
+            report[variant] = {"error": str(e)}
+            continue
+
+        latency_ms, detections = _measure(model, evaluation_images, conf, runs)
+        values = [metric(result) for result in detections]
+        if variant == "fp32":
+            reference = values
+
+        errors = [_relative_error(value, ref) for value, ref in zip(values, reference or [])]
+        errors = [error for error in errors if error is not None]
+
+        report[variant] = {
+            "path": os.path.basename(model.path),
+            "size_mb": round(os.path.getsize(model.path) / 1e6, 2),
+            "latency_ms": round(latency_ms, 2),
+            "mean_relative_error": round(float(np.mean(errors)), 4) if errors else None,
+            "compared_images": len(errors),
+        }
+        if variant == "int8_static":
+            # False when a single image had to serve for both
+            report[variant]["held_out"] = evaluation_images is not calibration_images
+
+    return report
+
+
+def main():
+    # build quantized variants of both models and write an accuracy-vs-latency report
+    from backend.core.settings_manager import SettingsManager
+
+    settings = SettingsManager()
+    parser = argparse.ArgumentParser(description="Build reduced-precision model variants and compare them to FP32")
+    parser.add_argument("--images", nargs="*", default=[],
+                        help="extra images, split between static calibration and evaluation")
+    parser.add_argument("--runs", type=int, default=10, help="timed passes over the images per variant")
+    parser.add_argument("--output", default=settings.path + "/model_variants_report.json")
+    args = parser.parse_args()
+
+    models = {
+        "distance_check": (settings.path + "/yolo11n-pose.pt", settings.path + "/calibrate_distance.png", _face_area),
+        "eye_strain_prevention": (settings.path + "/best_model.pt", settings.path + "/relaxed_face.png", _eye_ratios),
+    }
+
+    report = {}
+    for name, (weights_path, calibration_image, metric) in models.items():
+        image_paths = [path for path in [calibration_image] + args.images if os.path.exists(path)]
+        images = [image for image in (cv2.imread(path) for path in image_paths) if image is not None]
+
+        if not images:
+            print(f"[{name}] no calibration images found, skipping")
+            continue
+
+        report[name] = compare_variants(weights_path, metric, images, runs=args.runs)
+        for variant, row in report[name].items():
+            print(f"[{name}] {variant}: {row}")
+        if report[name].get("int8_static", {}).get("held_out") is False:
+            print(f"[{name}] int8_static was scored on its calibration image, pass more with --images")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Report saved: {args.output}")
+    print('Select a variant with the "inference_variant" setting (fp32, int8_dynamic, int8_static)')
+
+
+if __name__ == "__main__":
+    main()
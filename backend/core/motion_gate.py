@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+from typing import Optional
+
+
+class MotionGate:
+    # skip inference while the scene has not changed since the last inferred frame
+    DEFAULT_THRESHOLD = 4.0  # mean absolute grayscale difference (0-255)
+    MAX_REUSE = 12  # re-run inference after this many reused frames anyway
+    DOWNSCALE_SIZE = (64, 48)
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, max_reuse: int = MAX_REUSE):
+        self.threshold = threshold
+        self.max_reuse = max_reuse
+        self.reference: Optional[np.ndarray] = None
+        self.reused = 0
+
+        self.hits = 0  # frames where inference was skipped
+        self.misses = 0  # frames where inference ran
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        # downscaled grayscale version of a frame
+        small = cv2.resize(frame, self.DOWNSCALE_SIZE, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def score(self, frame: np.ndarray) -> float:
+        # how much the frame differs from the last inferred frame
+        if self.reference is None:
+            return float("inf")
+        return float(cv2.absdiff(self._thumbnail(frame), self.reference).mean())
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        # decide whether the frame needs a new forward pass
+        thumbnail = self._thumbnail(frame)
+
+        if self.reference is not None and self.reused < self.max_reuse:
+            if float(cv2.absdiff(thumbnail, self.reference).mean()) <= self.threshold:
+                self.reused += 1
+                self.hits += 1
+                return False
+
+        self.reference = thumbnail
+        self.reused = 0
+        self.misses += 1
+        return True
+
+    def reset(self) -> None:
+        # forget the reference frame so the next frame is inferred
+        self.reference = None
+        self.reused = 0
+
+    def stats(self) -> dict:
+        # hit/miss counters for the current session
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
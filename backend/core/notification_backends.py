@@ -0,0 +1,76 @@
+import json
+import subprocess
+import sys
+import time
+from threading import Lock
+from typing import List, Tuple
+
+
+class OsascriptBackend:
+    # macOS notifications through AppleScript
+    def deliver(self, title: str, message: str) -> None:
+        script = f'display notification "{message}" with title "{title}"'
+        subprocess.run(["osascript", "-e", script])
+
+
+class NotifySendBackend:
+    # Linux desktop notifications through libnotify
+    def deliver(self, title: str, message: str) -> None:
+        subprocess.run(["notify-send", title, message])
+
+
+class DesktopNotifierBackend:
+    # native notifications through the desktop-notifier package, without spawning a process
+    def __init__(self, app_name: str = "Healthy Computer Usage"):
+        from desktop_notifier import DesktopNotifierSync
+
+        self.notifier = DesktopNotifierSync(app_name=app_name)
+
+    def deliver(self, title: str, message: str) -> None:
+        self.notifier.send(title=title, message=message)
+
+
+class MemoryBackend:
+    # keeps delivered notifications in a list, for tests
+    def __init__(self):
+        self.delivered: List[Tuple[str, str]] = []
+        self._lock = Lock()
+
+    def deliver(self, title: str, message: str) -> None:
+        with self._lock:
+            self.delivered.append((title, message))
+
+
+class FileBackend:
+    # appends delivered notifications to a JSON lines file
+    def __init__(self, path: str):
+        self.path = path
+
+    def deliver(self, title: str, message: str) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"time": time.time(), "title": title, "message": message}) + "\n")
+
+
+BACKENDS = {
+    "osascript": OsascriptBackend,
+    "notify-send": NotifySendBackend,
+    "desktop-notifier": DesktopNotifierBackend,
+    "memory": MemoryBackend,
+    "file": FileBackend,
+}
+
+
+def default_backend_name() -> str:
+    # backend that works without extra setup on this platform
+    if sys.platform == "darwin":
+        return "osascript"
+    if sys.platform.startswith("linux"):
+        return "notify-send"
+    return "desktop-notifier"  # Windows has no notification command
+
+
+def create_backend(name: str, **kwargs):
+    # backend instance by its settings name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown notification backend: {name}")
+    return BACKENDS[name](**kwargs)
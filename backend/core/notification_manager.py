@@ -1,13 +1,29 @@
-import subprocess
+import atexit
+import queue
+import sys
+import threading
 import time
-from typing import Dict, Tuple
+from collections import deque
+from typing import Dict, List, Tuple
 from threading import Lock
 
+from .notification_backends import NotifySendBackend, OsascriptBackend, create_backend, default_backend_name
+from .rate_limiter import TokenBucket, TtlCache
+from .settings_manager import SettingsManager
+
 
 class NotificationManager:
     _instance = None
     _lock = Lock()
 
+    LATENCY_HISTORY = 100  # deliveries kept for the latency metrics
+    CLOSE_TIMEOUT = 2.0  # seconds to deliver pending notifications on exit
+
+    COOLDOWN_SIZE = 256  # identical notifications remembered for the cooldown
+    BURST_SIZE = 3  # notifications per title delivered back to back
+    REFILL_SECONDS = 60  # after a burst, one more notification per title every this many seconds
+    COALESCE_WINDOW = 0.25  # seconds to wait for more notifications to deliver together
+
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
@@ -18,19 +34,141 @@ class NotificationManager:
     def __init__(self, default_cooldown: int = 5):
         if not hasattr(self, 'initialized'):
             self.default_cooldown = default_cooldown
-            self.last_notifications: Dict[Tuple[str, str], float] = {}
+            # admission control: identical notifications within the cooldown, then a rate limit per title
+            self.recent_notifications = TtlCache(default_cooldown, self.COOLDOWN_SIZE)
+            self.title_buckets: Dict[str, TokenBucket] = {}
+            self.rejected_duplicates = 0
+            self.rejected_rate_limited = 0
+            self._send_lock = Lock()
+
+            self.backend = self._create_backend()
+
+            # delivery runs on a worker thread so send never blocks the caller
+            self.queue: queue.Queue = queue.Queue()
+            self.delivered = 0
+            self.failed = 0
+            self.coalesced = 0
+            self.max_queue_depth = 0
+            self.latencies_ms = deque(maxlen=self.LATENCY_HISTORY)
+
+            self._worker = threading.Thread(target=self._deliver_loop, daemon=True)
+            self._worker.start()
+            atexit.register(self.close)
             self.initialized = True
 
+    def _create_backend(self):
+        # backend selected by the "notification_backend" setting
+        settings = SettingsManager()
+        name = settings.get("notification_backend") or default_backend_name()
+        kwargs = {"path": settings.path + "/notifications.jsonl"} if name == "file" else {}
+
+        try:
+            return create_backend(name, **kwargs)
+        except Exception as e:
+            fallback = NotifySendBackend if sys.platform.startswith("linux") else OsascriptBackend
+            print(f"Notification backend {name} unavailable, using {fallback.__name__}: {e}")
+            return fallback()
+
     def send(self, title: str, message: str) -> bool:
-        # send notification with cooldown
-        now = time.time()
-        key = (title, message)
+        # queue a notification unless it is a duplicate or over its title's rate, returns without waiting for delivery
+        now = time.monotonic()
 
-        if key in self.last_notifications:
-            if now - self.last_notifications[key] < self.default_cooldown:
+        with self._send_lock:
+            self.recent_notifications.expire(now)
+            if (title, message) in self.recent_notifications:
+                self.rejected_duplicates += 1
                 return False
 
-        self.last_notifications[key] = now
-        script = f'display notification "{message}" with title "{title}"'
-        subprocess.run(["osascript", "-e", script])
+            bucket = self.title_buckets.get(title)
+            if bucket is None:
+                bucket = self.title_buckets[title] = TokenBucket(self.BURST_SIZE, 1 / self.REFILL_SECONDS, now)
+            if not bucket.consume(now=now):
+                self.rejected_rate_limited += 1
+                return False
+
+            self.recent_notifications.add_if_absent((title, message), now)
+
+        self.queue.put((title, message, now))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
         return True
+
+    def _collect_burst(self, first) -> Tuple[List[tuple], bool]:
+        # notifications arriving shortly after the first one, and whether the worker should stop
+        burst = [first]
+        deadline = time.monotonic() + self.COALESCE_WINDOW
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return burst, False
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                return burst, False
+
+            if item is None:
+                self.queue.task_done()
+                return burst, True
+            burst.append(item)
+
+    @staticmethod
+    def _coalesce(burst: List[tuple]) -> Tuple[str, str]:
+        # one title and message for a burst of notifications
+        if len(burst) == 1:
+            title, message, _ = burst[0]
+            return title, message
+
+        titles = list(dict.fromkeys(title for title, _, _ in burst))
+        title = titles[0] if len(titles) == 1 else f"{len(burst)} alerts"
+        message = " | ".join(text if len(titles) == 1 else f"{item_title}: {text}"
+                             for item_title, text, _ in burst)
+        return title, message
+
+    def _deliver_loop(self) -> None:
+        stop = False
+        while not stop:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+
+            burst, stop = self._collect_burst(item)
+            title, message = self._coalesce(burst)
+            try:
+                self.backend.deliver(title, message)
+                self.delivered += 1
+                self.coalesced += len(burst) - 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Failed to deliver notification '{title}': {e}")
+            finally:
+                delivered_at = time.monotonic()
+                for _, _, queued_at in burst:
+                    self.latencies_ms.append((delivered_at - queued_at) * 1000)
+                    self.queue.task_done()
+
+    def flush(self) -> None:
+        # wait until every queued notification has been delivered
+        self.queue.join()
+
+    def close(self) -> None:
+        # deliver what is pending and stop the worker
+        if self._worker.is_alive():
+            self.queue.put(None)
+            self._worker.join(self.CLOSE_TIMEOUT)
+
+    def stats(self) -> dict:
+        # delivery counters, queue depth and latency in milliseconds
+        latencies = sorted(self.latencies_ms)
+        return {
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "rejected_duplicates": self.rejected_duplicates,
+            "rejected_rate_limited": self.rejected_rate_limited,
+            "cooldown_entries": len(self.recent_notifications),
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "latency_ms_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+            "latency_ms_max": latencies[-1] if latencies else 0.0,
+        }
@@ -0,0 +1,105 @@
+import mmap
+import os
+import struct
+import time
+from typing import NamedTuple, Optional
+
+
+class Presence(NamedTuple):
+    present: bool
+    present_since: float  # wall clock time the user came back, 0 while away
+    absent_total: float  # seconds counted as away since the channel was created
+    updated_at: float
+
+
+class PresenceChannel:
+    # whether someone is at the desk, shared between processes through a small memory-mapped file
+    # the vision host publishes, the timer features read - a sequence number guards against torn reads
+    RECORD = struct.Struct("<Idddd?")  # sequence, updated at, present since, absent total, last seen, present
+    SEQUENCE = struct.Struct("<I")  # odd while a write is in progress
+    ABSENT_AFTER = 20  # seconds without a face before the seat counts as empty
+    STALE_SECONDS = 60  # a publisher silent for longer is treated as gone
+    READ_RETRIES = 5
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+
+    def _open(self) -> bool:
+        if self._map is not None:
+            return True
+
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            print(f"Presence channel unavailable: {e}")
+            return False
+
+        try:
+            if os.fstat(fd).st_size < self.RECORD.size:
+                os.ftruncate(fd, self.RECORD.size)
+            self._map = mmap.mmap(fd, self.RECORD.size)
+        finally:
+            os.close(fd)
+        return True
+
+    def _load(self) -> Optional[tuple]:
+        # a consistent copy of the record, None if a write kept interfering
+        for _ in range(self.READ_RETRIES):
+            record = self.RECORD.unpack_from(self._map)
+            if record[0] % 2 == 0 and self.RECORD.unpack_from(self._map)[0] == record[0]:
+                return record
+        return None
+
+    def publish(self, seen: bool, now: Optional[float] = None) -> bool:
+        # record whether a face was seen in the latest frame, returns whether the seat counts as taken
+        now = time.time() if now is None else now
+        if not self._open():
+            return seen
+
+        # the only writer, so the record can be read directly - an odd sequence means a writer died mid-update
+        sequence, updated_at, present_since, absent_total, last_seen, was_present = self.RECORD.unpack_from(self._map)
+        sequence += sequence % 2
+
+        # time away only counts while the channel was live, not while the vision host was stopped
+        if not was_present and updated_at and now - updated_at <= self.STALE_SECONDS:
+            absent_total += max(0.0, now - updated_at)
+        if seen:
+            last_seen = now
+        present = now - last_seen < self.ABSENT_AFTER
+        if present and not was_present:
+            present_since = now
+        elif not present:
+            present_since = 0.0
+
+        self.SEQUENCE.pack_into(self._map, 0, sequence + 1)
+        self.RECORD.pack_into(self._map, 0, sequence + 2, now, present_since, absent_total, last_seen, present)
+        return present
+
+    def read(self, now: Optional[float] = None) -> Optional[Presence]:
+        # the latest published presence, None while nothing publishes (vision features disabled)
+        now = time.time() if now is None else now
+        if not os.path.exists(self.path) or not self._open():
+            return None
+
+        record = self._load()
+        if record is None:
+            return None
+
+        _, updated_at, present_since, absent_total, _, present = record
+        if not updated_at or now - updated_at > self.STALE_SECONDS:
+            return None
+        return Presence(present, present_since, absent_total, updated_at)
+
+    def absent_total(self) -> float:
+        # seconds counted as away so far, whether or not the publisher is still running
+        if not os.path.exists(self.path) or not self._open():
+            return 0.0
+
+        record = self._load()
+        return record[3] if record is not None else 0.0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
@@ -0,0 +1,59 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class TtlCache:
+    # bounded set of recently seen keys that forgets each key after ttl seconds
+    def __init__(self, ttl: float, max_size: int = 256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._seen: "OrderedDict[Hashable, float]" = OrderedDict()  # oldest first
+
+    def expire(self, now: Optional[float] = None) -> None:
+        # drop keys older than the ttl and the oldest keys beyond max_size
+        now = time.monotonic() if now is None else now
+        while self._seen:
+            key, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < self.ttl and len(self._seen) <= self.max_size:
+                break
+            self._seen.popitem(last=False)
+
+    def add_if_absent(self, key: Hashable, now: Optional[float] = None) -> bool:
+        # remember the key, returns False if it was already seen within the ttl
+        now = time.monotonic() if now is None else now
+        self.expire(now)
+
+        if key in self._seen:
+            return False
+
+        self._seen[key] = now
+        self.expire(now)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._seen
+
+
+class TokenBucket:
+    # allows bursts of up to capacity events, refilled at rate tokens per second
+    def __init__(self, capacity: float, rate: float, now: Optional[float] = None):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def consume(self, tokens: float = 1, now: Optional[float] = None) -> bool:
+        # take tokens if available
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens < tokens:
+            return False
+
+        self.tokens -= tokens
+        return True
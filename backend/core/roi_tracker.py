@@ -0,0 +1,94 @@
+import numpy as np
+from typing import Optional, Tuple
+
+
+class RoiTracker:
+    # keep a padded region of interest around the last detection so inference can run on a crop
+    PADDING = 0.6  # fraction of the detection size added on every side
+    MIN_SIZE = 128  # smallest crop side in pixels
+    CROP_IMGSZ = 320  # inference size for crops (full frames use the model default)
+    REDETECT_INTERVAL = 12  # full-frame detection after this many crop detections
+    MIN_CONFIDENCE = 0.4  # lose the track below this detection confidence
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.roi: Optional[Tuple[int, int, int, int]] = None
+        self.tracked_frames = 0
+
+        self.crop_detections = 0
+        self.full_detections = 0
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+        # region of the frame to run inference on and its offset in the full frame
+        if not self.enabled or self.roi is None or self.tracked_frames >= self.REDETECT_INTERVAL:
+            self.roi = None
+            self.tracked_frames = 0
+            self.full_detections += 1
+            return frame, (0, 0)
+
+        x1, y1, x2, y2 = self.roi
+        self.tracked_frames += 1
+        self.crop_detections += 1
+        return frame[y1:y2, x1:x2], (x1, y1)
+
+    def predict_kwargs(self) -> dict:
+        # extra predict arguments for the image returned by the last crop
+        if self.roi is None:
+            return {}
+        return {"imgsz": self.CROP_IMGSZ}
+
+    def update(self, boxes: np.ndarray, confidences: np.ndarray, frame_shape: Tuple[int, ...]) -> None:
+        # track the union of the detected boxes, given in full-frame coordinates
+        if not self.enabled or len(boxes) == 0 or float(np.min(confidences)) < self.MIN_CONFIDENCE:
+            self.lose()
+            return
+
+        x1, y1 = boxes[:, 0].min(), boxes[:, 1].min()
+        x2, y2 = boxes[:, 2].max(), boxes[:, 3].max()
+
+        pad_x = max((x2 - x1) * self.PADDING, (self.MIN_SIZE - (x2 - x1)) / 2)
+        pad_y = max((y2 - y1) * self.PADDING, (self.MIN_SIZE - (y2 - y1)) / 2)
+
+        height, width = frame_shape[:2]
+        self.roi = (
+            max(0, int(x1 - pad_x)),
+            max(0, int(y1 - pad_y)),
+            min(width, int(x2 + pad_x)),
+            min(height, int(y2 + pad_y)),
+        )
+
+    def lose(self) -> None:
+        # drop the track so the next detection uses the full frame
+        self.roi = None
+        self.tracked_frames = 0
+
+    @property
+    def is_tracking(self) -> bool:
+        return self.roi is not None
+
+
+def offset_boxes(boxes: np.ndarray, offset: Tuple[int, int]) -> np.ndarray:
+    # map xyxy boxes from crop to full-frame coordinates
+    offset_x, offset_y = offset
+    return boxes + np.array([offset_x, offset_y, offset_x, offset_y], dtype=boxes.dtype)
+
+
+def offset_keypoints(keypoints: np.ndarray, offset: Tuple[int, int]) -> np.ndarray:
+    # map (x, y, confidence) keypoints from crop to full-frame coordinates
+    offset_x, offset_y = offset
+    return keypoints + np.array([offset_x, offset_y, 0], dtype=keypoints.dtype)
+
+
+def mirror_boxes(boxes: np.ndarray, width: int) -> np.ndarray:
+    # map xyxy boxes to the horizontally mirrored frame, so the pixels never have to be flipped
+    mirrored = boxes.copy()
+    mirrored[:, 0] = width - boxes[:, 2]
+    mirrored[:, 2] = width - boxes[:, 0]
+    return mirrored
+
+
+def mirror_keypoints(keypoints: np.ndarray, width: int) -> np.ndarray:
+    # map (x, y, confidence) keypoints to the horizontally mirrored frame
+    mirrored = keypoints.copy()
+    mirrored[..., 0] = width - keypoints[..., 0]
+    return mirrored
@@ -0,0 +1,164 @@
+import asyncio
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from .notification_manager import NotificationManager
+from .settings_manager import SettingsManager
+
+
+class Scheduler:
+    # run timer features as asyncio tasks in one process, sharing the settings and notification managers
+    def __init__(self, features: Dict[str, Callable], config_keys: Optional[Dict[str, Iterable[str]]] = None):
+        # features maps a name to a factory for an object with start(), check() and stop()
+        # start() and check() return the seconds to wait before the next check
+        # features with config keys also need reconfigure(changes), returning the seconds to wait as well
+        self.settings = SettingsManager()
+        self.notifier = NotificationManager()
+
+        self.features = features
+        self.config_keys = config_keys or {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.wakeups: Dict[str, int] = {name: 0 for name in features}
+
+        # settings changes waiting to be applied by each feature's task
+        self.pending_changes: Dict[str, dict] = {}
+        self.change_events: Dict[str, asyncio.Event] = {}
+        self.settings_changed = asyncio.Event()
+
+    def is_running(self, name: str) -> bool:
+        return name in self.tasks and not self.tasks[name].done()
+
+    def start(self, name: str) -> bool:
+        # start a feature as a task on the running event loop
+        if self.is_running(name):
+            return False
+
+        feature = self.features[name]()
+        self.pending_changes.pop(name, None)
+        self.change_events[name] = asyncio.Event()
+        self.tasks[name] = asyncio.create_task(self._run(name, feature), name=name)
+        print(f"Timer feature started: {name}")
+        return True
+
+    async def stop(self, name: str):
+        # cancel a feature's task and wait for its cleanup
+        task = self.tasks.pop(name, None)
+        if task is None:
+            return
+
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        print(f"Timer feature stopped: {name}")
+
+    async def _sleep(self, name: str, delay: float) -> bool:
+        # wait for the next check, returns True if a settings change arrived first
+        changed = self.change_events[name]
+        try:
+            await asyncio.wait_for(changed.wait(), delay)
+        except asyncio.TimeoutError:
+            return False
+
+        changed.clear()
+        return True
+
+    async def _run(self, name: str, feature):
+        # blocking steps run in a worker thread so one feature never stalls the others
+        started = False
+        step = None
+        try:
+            # shielded, so cancelling the task never abandons a step that is still running in its thread
+            step = asyncio.ensure_future(asyncio.to_thread(feature.start))
+            delay = await asyncio.shield(step)
+            started = True
+
+            while True:
+                if await self._sleep(name, delay):
+                    # a new configuration is applied by the running feature, not by a new task
+                    changes = self.pending_changes.pop(name, {})
+                    step = asyncio.ensure_future(asyncio.to_thread(feature.reconfigure, changes))
+                    delay = await asyncio.shield(step)
+                    continue
+
+                self.wakeups[name] += 1
+                step = asyncio.ensure_future(asyncio.to_thread(feature.check))
+                delay = await asyncio.shield(step)
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            print(f"Timer feature {name} failed: {e}")
+            self.notifier.send(
+                "Error: Timer Features",
+                f"{name.replace('_', ' ').capitalize()} stopped unexpectedly."
+            )
+
+        finally:
+            if step is not None:
+                # the thread cannot be interrupted, stop() must not run while it still uses the feature
+                await asyncio.wait({step})
+                if not step.cancelled() and step.exception() is None:
+                    started = True
+
+            if started:
+                try:
+                    feature.stop()
+                except Exception as e:
+                    print(f"Timer feature {name} failed to stop cleanly: {e}")
+
+    def apply_changes(self, changes: dict):
+        # route changed settings to the features using them, on the event loop
+        for name, keys in self.config_keys.items():
+            feature_changes = {key: changes[key] for key in keys if key in changes}
+            if feature_changes and self.is_running(name):
+                self.pending_changes.setdefault(name, {}).update(feature_changes)
+                self.change_events[name].set()
+
+        if any(f"{name}_enable" in changes for name in self.features):
+            self.settings_changed.set()
+
+    def _watched_keys(self) -> Set[str]:
+        keys = {f"{name}_enable" for name in self.features}
+        for feature_keys in self.config_keys.values():
+            keys.update(feature_keys)
+        return keys
+
+    async def sync_with_settings(self):
+        # start or stop features from the current settings
+        for name in self.features:
+            enabled = self.settings.is_feature_enabled(name)
+            running = self.is_running(name)
+
+            if enabled and not running:
+                self.tasks.pop(name, None)
+                self.start(name)
+            elif not enabled and name in self.tasks:
+                await self.stop(name)
+
+    async def stop_all(self):
+        for name in list(self.tasks):
+            await self.stop(name)
+
+    async def run(self):
+        # follow the settings until cancelled
+        loop = asyncio.get_running_loop()
+        # subscribers are called from the settings watcher thread
+        token = self.settings.subscribe(
+            self._watched_keys(),
+            lambda changes: loop.call_soon_threadsafe(self.apply_changes, changes)
+        )
+        self.settings.watch()
+        await self.sync_with_settings()
+
+        try:
+            while True:
+                await self.settings_changed.wait()
+                self.settings_changed.clear()
+                await self.sync_with_settings()
+
+        finally:
+            self.settings.unsubscribe(token)
+            await self.stop_all()
+            print(f"Timer feature wakeups: {self.wakeups}")
@@ -1,14 +1,26 @@
 import json
 import os
-from typing import Any
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 from threading import Lock
 
+try:
+    import fcntl
+except ImportError:  # Windows - writes stay atomic, but are not serialized across processes
+    fcntl = None
+
+from .file_watcher import FileWatcher
+
 
 class SettingsManager:
     # singleton for managing application settings
     _instance = None
     _lock = Lock()
 
+    WATCH_TIMEOUT = 1  # seconds between checks whether watching was stopped
+
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
@@ -35,6 +47,13 @@ class SettingsManager:
                 "blue_light_filter_evening": 0,
                 "blue_light_filter_night": 0,
             }
+            # callbacks for changed keys, by subscription token
+            self._subscribers: Dict[int, Tuple[frozenset, Callable[[dict], None]]] = {}
+            self._next_token = 0
+            self._watcher = None
+            self._watch_stopped = threading.Event()
+
+            self._settings = {}
             self._settings = self.load()
             self._last_modification_time = self._get_modification_time()
             self.initialized = True
@@ -54,13 +73,144 @@ class SettingsManager:
         with open(self.settings_file, "r") as f:
             return json.load(f)
 
-    def save(self, settings: dict) -> None:
-        # save settings to file
+    @contextmanager
+    def _file_lock(self):
+        # advisory lock held by every process while it reads, changes and replaces settings.json
         with self._lock:
-            with open(self.settings_file, "w") as f:
+            with open(self.settings_file + ".lock", "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_current(self) -> Optional[dict]:
+        # settings as they are on disk, None if the file is missing or unreadable
+        try:
+            with open(self.settings_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, settings: dict) -> None:
+        # write a temporary file and rename it over settings.json, so readers never see a partial file
+        temp_file = f"{self.settings_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, "w") as f:
                 json.dump(settings, f, indent=4)
-            self._settings = settings.copy()
-            self._last_modification_time = self._get_modification_time()
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.settings_file)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+    def _commit(self, settings: dict, current: Optional[dict]) -> bool:
+        # write settings unless the file already holds them, returns True if it was written
+        written = settings != current
+        if written:
+            self._write(settings)
+
+        self._settings = settings.copy()
+        self._last_modification_time = self._get_modification_time()
+        return written
+
+    def save(self, settings: dict) -> bool:
+        # replace all settings, returns False if nothing changed
+        previous = self._settings
+        with self._file_lock():
+            written = self._commit(settings, self._read_current())
+
+        self._notify(previous, self._settings)
+        return written
+
+    def update(self, changes: dict) -> bool:
+        # apply several changes in one write, on top of the latest settings from any process
+        previous = self._settings
+        with self._file_lock():
+            current = self._read_current()
+            settings = dict(self._settings if current is None else current)
+            settings.update(changes)
+            written = self._commit(settings, current)
+
+        self._notify(previous, self._settings)
+        return written
+
+    def reload_if_changed(self) -> bool:
+        # reload settings when the file was modified by another process
+        modification_time = self._get_modification_time()
+        if modification_time == self._last_modification_time:
+            return False
+
+        try:
+            settings = self.load()
+        except ValueError:
+            # file is being rewritten - try again on the next call
+            return False
+
+        previous = self._settings
+        self._settings = settings
+        self._last_modification_time = modification_time
+        self._notify(previous, settings)
+        return True
+
+    def subscribe(self, keys: Iterable[str], callback: Callable[[dict], None]) -> int:
+        # call back with {key: new value} whenever any of the keys changes, returns a token for unsubscribe
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = (frozenset(keys), callback)
+        return token
+
+    def unsubscribe(self, token: int) -> None:
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def _notify(self, previous: dict, current: dict) -> None:
+        # call the subscribers of every changed key
+        changed = {key for key in previous.keys() | current.keys() if previous.get(key) != current.get(key)}
+        if not changed:
+            return
+
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+
+        for keys, callback in subscribers:
+            changes = {key: current.get(key) for key in keys & changed}
+            if not changes:
+                continue
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"Settings subscriber failed: {e}")
+
+    def watch(self) -> None:
+        # follow settings.json from a background thread, so subscribers see changes made by other processes
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+
+        # watch before returning, so no change made after this call is missed
+        watcher = FileWatcher(self.settings_file)
+        self._watch_stopped.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, args=(watcher,), daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watch_stopped.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch_loop(self, watcher: FileWatcher) -> None:
+        try:
+            while not self._watch_stopped.is_set():
+                if watcher.wait(self.WATCH_TIMEOUT):
+                    self.reload_if_changed()
+        finally:
+            watcher.close()
 
     def get(self, key: str, default: Any = None) -> Any:
         # get a specific setting
@@ -68,9 +218,21 @@ class SettingsManager:
 
     def set(self, key: str, value: Any) -> None:
         # set a specific setting and save
-        self._settings[key] = value
-        self.save(self._settings)
+        self.update({key: value})
 
     def is_feature_enabled(self, feature_name: str) -> bool:
         # check if a feature is enabled
         return self._settings.get(f"{feature_name}_enable", False)
+
+
+def main():
+    # apply the JSON object on stdin as one update, so the settings window saves under the features' lock
+    changes = json.load(sys.stdin)
+    if not isinstance(changes, dict):
+        print("Settings must be a JSON object", file=sys.stderr)
+        sys.exit(1)
+    SettingsManager().update(changes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class RollingWindow:
+    # the last size samples in a preallocated ring with running sums, so the mean and variance are O(1)
+    def __init__(self, size: int):
+        self.size = size
+        self.values = np.zeros(size, dtype=np.float64)
+        self.count = 0
+        self.index = 0  # slot the next sample goes to
+        self.total = 0.0
+        self.total_squares = 0.0
+
+    def append(self, value: float) -> None:
+        value = float(value)
+        if self.count == self.size:
+            oldest = self.values[self.index]
+            self.total -= oldest
+            self.total_squares -= oldest * oldest
+        else:
+            self.count += 1
+
+        self.values[self.index] = value
+        self.total += value
+        self.total_squares += value * value
+        self.index = (self.index + 1) % self.size
+
+        if self.index == 0:
+            # sum again once per lap so rounding errors never build up
+            self.total = float(self.values.sum())
+            self.total_squares = float(np.dot(self.values, self.values))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.size
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        if not self.count:
+            return 0.0
+        mean = self.total / self.count
+        return max(0.0, self.total_squares / self.count - mean * mean)
+
+    def median(self) -> float:
+        if not self.count:
+            return 0.0
+        return float(np.median(self.values[:self.count]))
+
+    def ordered(self) -> np.ndarray:
+        # samples from oldest to newest
+        if not self.full:
+            return self.values[:self.count].copy()
+        return np.roll(self.values, -self.index)
+
+    def clear(self) -> None:
+        self.count = 0
+        self.index = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+
+
+class Ewma:
+    # exponentially weighted moving average, starting at the first sample
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    @classmethod
+    def from_half_life(cls, samples: float) -> "Ewma":
+        # weight that halves every samples updates
+        return cls(1 - 0.5 ** (1 / samples))
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        self.value = value if self.value is None else self.value + self.alpha * (value - self.value)
+        return self.value
+
+    def reset(self) -> None:
+        self.value = None
+
+
+class MedianFilter:
+    # median of the last few samples, drops a single-frame outlier such as a blink or a missed keypoint
+    def __init__(self, size: int = 3):
+        self.window = RollingWindow(size)
+
+    def update(self, value: float) -> float:
+        self.window.append(value)
+        return self.window.median()
+
+    def reset(self) -> None:
+        self.window.clear()
+
+
+class Kalman1D:
+    # Kalman filter for a slowly drifting level measured with noise
+    def __init__(self, process_variance: float, measurement_variance: float):
+        self.process_variance = process_variance  # how far the true level drifts between samples
+        self.measurement_variance = measurement_variance
+        self.estimate: Optional[float] = None
+        self.variance = 0.0
+        self.gain = 1.0
+
+    def update(self, measurement: float) -> float:
+        measurement = float(measurement)
+        if self.estimate is None:
+            # nothing known yet - take the first measurement as it is
+            self.estimate = measurement
+            self.variance = self.measurement_variance
+            return self.estimate
+
+        predicted_variance = self.variance + self.process_variance
+        self.gain = predicted_variance / (predicted_variance + self.measurement_variance)
+        self.estimate += self.gain * (measurement - self.estimate)
+        self.variance = (1 - self.gain) * predicted_variance
+        return self.estimate
+
+    def reset(self) -> None:
+        self.estimate = None
+        self.variance = 0.0
+        self.gain = 1.0
+
+
+class SignalSmoother:
+    # median filter against outliers, then a Kalman filter against noise, for a signal divided by its baseline
+    # steadier than a 5 sample mean when detections have outliers, and a large posture change shows after 2 samples, not 3
+    MEDIAN_SIZE = 3
+    MEASUREMENT_VARIANCE = 0.05 ** 2  # 5% frame to frame noise in the area or ratio
+    PROCESS_VARIANCE = 0.4 * MEASUREMENT_VARIANCE  # posture drift between samples
+
+    def __init__(self, median_size: int = MEDIAN_SIZE, process_variance: float = PROCESS_VARIANCE,
+                 measurement_variance: float = MEASUREMENT_VARIANCE):
+        self.median = MedianFilter(median_size)
+        self.kalman = Kalman1D(process_variance, measurement_variance)
+
+    def update(self, value: float) -> float:
+        return self.kalman.update(self.median.update(value))
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.kalman.estimate
+
+    def __len__(self) -> int:
+        return len(self.median.window)
+
+    def reset(self) -> None:
+        self.median.reset()
+        self.kalman.reset()
+
+
+def robust_baseline(samples, trim: float = 0.2) -> Tuple[np.ndarray, np.ndarray]:
+    # median of the samples along the first axis and the variance of those left after dropping
+    # the trim fraction at both ends, so a blink or head turn in a few of them moves neither
+    values = np.sort(np.asarray(samples, dtype=np.float64), axis=0)
+    cut = int(len(values) * trim)
+    kept = values[cut:len(values) - cut]
+    return np.median(values, axis=0), kept.var(axis=0)
@@ -1,7 +1,38 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import List, NamedTuple
+
+
+class TimetableEvent(NamedTuple):
+    time: datetime
+    kind: str  # "warning" before the limit, "limit" at it, "over" after it
+    minutes: int  # minutes before or after the limit
+
+
 class TimeManager:
     def __init__(self):
         self.CHECK_INTERVAL = 60  # check every 60 seconds
         self.WARNING_MINUTES = [120, 60, 30, 15, 5, 1]
+        self.MAX_SLEEP = 15 * 60  # longest sleep between events, so wall clock changes are picked up
+        self.GRACE_SECONDS = 60  # events this late on start are still sent
+
+    def build_timetable(self, deadline: datetime) -> List[TimetableEvent]:
+        # every warning, limit and over-limit event around a deadline, sorted by time
+        events = [TimetableEvent(deadline, "limit", 0)]
+        for minutes in self.WARNING_MINUTES:
+            events.append(TimetableEvent(deadline - timedelta(minutes=minutes), "warning", minutes))
+            events.append(TimetableEvent(deadline + timedelta(minutes=minutes), "over", minutes))
+        return sorted(events)
+
+    def next_event_index(self, timetable: List[TimetableEvent], now: datetime) -> int:
+        # index of the first event after now
+        return bisect_right([event.time for event in timetable], now)
+
+    def seconds_until(self, timetable: List[TimetableEvent], index: int, now: datetime) -> float:
+        # sleep length until the event at index, capped at MAX_SLEEP
+        if index >= len(timetable):
+            return self.MAX_SLEEP
+        return min(self.MAX_SLEEP, max(0.0, (timetable[index].time - now).total_seconds()))
 
     def format_time(self, seconds: int, type: str) -> str:
         # format timedelta
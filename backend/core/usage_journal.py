@@ -0,0 +1,83 @@
+import os
+import struct
+import time
+from typing import BinaryIO, Optional
+
+
+class UsageJournal:
+    # append-only log of fixed-size usage increments, compacted into a snapshot by its owner
+    RECORD = struct.Struct("<dI")  # wall clock timestamp, seconds used since the previous record
+    FSYNC_RECORDS = 10  # records appended before they are forced to disk
+    FSYNC_INTERVAL = 300  # seconds an appended record may wait for its fsync
+    COMPACT_RECORDS = 1024  # journal length at which the owner should compact
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: Optional[BinaryIO] = None
+        self.records = self._count_records()
+
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.appended = 0
+        self.fsyncs = 0
+
+    def _count_records(self) -> int:
+        try:
+            return os.path.getsize(self.path) // self.RECORD.size
+        except OSError:
+            return 0
+
+    def replay(self, since: float = 0) -> int:
+        # seconds recorded after the since timestamp, ignoring a partly written last record
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return 0
+
+        usable = len(data) - len(data) % self.RECORD.size
+        return sum(seconds for timestamp, seconds in self.RECORD.iter_unpack(data[:usable]) if timestamp > since)
+
+    def append(self, seconds: int, timestamp: float) -> None:
+        # one record per call - the file grows by RECORD.size bytes, nothing is rewritten
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            # drop a partly written record left by a crash, so records stay aligned
+            self._file.truncate(self.records * self.RECORD.size)
+
+        self._file.write(self.RECORD.pack(timestamp, max(0, int(seconds))))
+        self.records += 1
+        self.appended += 1
+        self.unsynced += 1
+
+        if self.unsynced >= self.FSYNC_RECORDS or time.monotonic() - self.last_sync >= self.FSYNC_INTERVAL:
+            self.sync()
+
+    def sync(self) -> None:
+        # force appended records to disk
+        if self._file is not None and self.unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def needs_compaction(self) -> bool:
+        return self.records >= self.COMPACT_RECORDS
+
+    def truncate(self) -> None:
+        # empty the journal after its records were folded into the snapshot
+        self.close()
+        with open(self.path, "wb") as f:
+            os.fsync(f.fileno())
+        self.records = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> dict:
+        return {"records": self.records, "appended": self.appended, "fsyncs": self.fsyncs}
@@ -54,29 +54,48 @@ class BlueLightFilter:
             self.notifier.send("Blue Light Filter", messages[period])
             self.last_notification_period = period
 
-    def monitor(self):
-        # monitor time and adjust blue light filter
-
-        # apply initial filter
+    def start(self) -> float:
+        # apply the filter for the current period, returns seconds until the first check
         current_period = self.get_current_period()
         current_percentage = self.settings.get(f"blue_light_filter_{current_period}", 0)
         self.apply_filter(current_period, current_percentage)
         self.current_period = current_period
+        return self.CHECK_INTERVAL
+
+    def check(self) -> float:
+        # adjust the filter when the time period changed, returns seconds until the next check
+        new_period = self.get_current_period()
+        if new_period != self.current_period:
+            new_percentage = self.settings.get(f"blue_light_filter_{new_period}", "0")
+            self.apply_filter(new_period, new_percentage)
+            self.current_period = new_period
+
+        return self.CHECK_INTERVAL
+
+    def reconfigure(self, changes: dict) -> float:
+        # apply a new percentage for the current period in place, returns seconds until the next check
+        key = f"blue_light_filter_{self.current_period}"
+        if key in changes:
+            self.apply_filter(self.current_period, changes[key] or 0)
+
+        return self.CHECK_INTERVAL
+
+    def stop(self):
+        # turn the filter off
+        subprocess.run(["nightlight", "off"], check=True, capture_output=True)
+
+    def monitor(self):
+        # monitor time and adjust blue light filter
+        delay = self.start()
 
         try:
             while True:
-                # check if time period changed
-                new_period = self.get_current_period()
-                if new_period != self.current_period:
-                    new_percentage = self.settings.get(f"blue_light_filter_{new_period}", "0")
-                    self.apply_filter(new_period, new_percentage)
-                    self.current_period = new_period
-
-                time.sleep(self.CHECK_INTERVAL)
+                time.sleep(delay)
+                delay = self.check()
 
         except KeyboardInterrupt:
             print("\n\n Blue light filter monitor stopped")
-            subprocess.run(["nightlight", "off"], check=True, capture_output=True)
+            self.stop()
 
 
 def main():
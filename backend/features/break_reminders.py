@@ -1,24 +1,53 @@
 import time
 from backend.core.notification_manager import NotificationManager
+from backend.core.presence_channel import PresenceChannel
+from backend.core.settings_manager import SettingsManager
 
 
 class BreakReminders:
     # remind users to take regular breaks following the 20-20-20 rule and longer breaks
     BREAK_INTERVAL = 20 * 60  # 20 minutes - look away for 20 seconds
+    AWAY_CHECK_INTERVAL = 60  # seconds between checks while nobody is at the desk
 
     def __init__(self):
         self.notifier = NotificationManager()
+        # with the vision features on, breaks follow the time actually spent at the desk
+        self.presence = PresenceChannel(SettingsManager().path + "/presence.bin")
+
+    def start(self) -> float:
+        # the first reminder comes one interval after the start
+        return self.BREAK_INTERVAL
+
+    def check(self) -> float:
+        # send a break reminder, returns seconds until the next one
+        presence = self.presence.read()
+        if presence is not None:
+            if not presence.present:
+                # nobody to remind - wait for them to come back
+                return self.AWAY_CHECK_INTERVAL
+
+            # being away for a while was a break, the interval starts again from the return
+            at_desk = time.time() - presence.present_since
+            if at_desk < self.BREAK_INTERVAL:
+                return self.BREAK_INTERVAL - at_desk
+
+        message = "Time for a 20-second eye break!"
+        self.notifier.send("Look at something 20 feet away", message)
+
+        print("Notification was sent")
+        return self.BREAK_INTERVAL
+
+    def stop(self):
+        # nothing to clean up
+        pass
 
     def monitor(self):
         # monitor time and send break reminders
+        delay = self.start()
         try:
             while True:
-                time.sleep(self.BREAK_INTERVAL)
-
-                message = "Time for a 20-second eye break!"
-                self.notifier.send("Look at something 20 feet away", message)
-
-                print("Notification was sent")
+                time.sleep(delay)
+                delay = self.check()
 
         except KeyboardInterrupt:
             print("\n\nBreak reminders monitor stopped")
@@ -1,10 +1,13 @@
 import os
+import signal
 import time
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from backend.core.settings_manager import SettingsManager
 from backend.core.notification_manager import NotificationManager
 from backend.core.time_manager import TimeManager
+from backend.core.usage_journal import UsageJournal
+from backend.core.presence_channel import PresenceChannel
 
 
 class DailyLimit:
@@ -16,24 +19,39 @@ class DailyLimit:
         self.notifier = NotificationManager()
 
         self.USAGE_DATA_FILE = self.settings.path + '/daily_usage.json'
+        # usage is appended to the journal on every check and folded into the daily total on compaction
+        self.USAGE_JOURNAL_FILE = self.settings.path + '/daily_usage.journal'
+        self.journal = UsageJournal(self.USAGE_JOURNAL_FILE)
+        # minute by minute history kept across days, for usage reports
+        self.ACTIVITY_HISTORY_FILE = self.settings.path + '/activity_history.bin'
+        self._history = None
+        # time the vision features saw nobody at the desk is not counted as screen time
+        self.presence = PresenceChannel(self.settings.path + '/presence.bin')
+        self.absent_mark = 0.0
+
+        self.timetable = []
+        self.next_event = 0
+        self.wakeups = 0
 
     def load_usage_data(self) -> dict:
-        # load daily usage data from file
-        if not os.path.exists(self.USAGE_DATA_FILE):
-            return self.create_new_usage_data()
-
-        with open(self.USAGE_DATA_FILE, 'r') as f:
-            data = json.load(f)
-
-        # check if data is from today
-        data_date = datetime.fromisoformat(data.get('date', ''))
-        today = datetime.now().date()
-
-        if data_date.date() != today:
-            # new day - reset usage
-            print("New day detected - resetting usage counter")
-            return self.create_new_usage_data()
+        # load daily usage data from file, plus the usage journaled since the last compaction
+        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
+        if not os.path.exists(self.USAGE_DATA_FILE):
+            data = self.create_new_usage_data()
+        else:
+            with open(self.USAGE_DATA_FILE, 'r') as f:
+                data = json.load(f)
+
+            # check if data is from today
+            data_date = datetime.fromisoformat(data.get('date', ''))
+            if data_date.date() != today_start.date():
+                # new day - reset usage
+                print("New day detected - resetting usage counter")
+                data = self.create_new_usage_data()
+
+        since = max(data.get('compacted_at', 0), today_start.timestamp())
+        data['seconds_used'] += self.journal.replay(since)
         return data
 
     def create_new_usage_data(self) -> dict:
@@ -44,84 +62,162 @@ class DailyLimit:
             'session_start': datetime.now().isoformat()
         }
 
-    def monitor(self):
-        # monitor daily usage and enforce limits
-        daily_limit_str = self.settings.get("daily_limit_time", "04:00")
-
-        print(f"Daily limit set to: {daily_limit_str}")
-
-        print(f"Checking every {self.time_manager.CHECK_INTERVAL} seconds")
+    @property
+    def history(self):
+        # numpy is only imported once usage is first recorded, not when the timer host starts
+        if self._history is None:
+            from backend.core.activity_history import ActivityHistory
+
+            self._history = ActivityHistory(self.ACTIVITY_HISTORY_FILE)
+        return self._history
+
+    def _record_usage(self, now: datetime) -> int:
+        # add the time used since the last record to the total and the journal, returns the seconds credited as away
+        session_duration_seconds = int((now - self.session_start).total_seconds())
+
+        absent_total = self.presence.absent_total()
+        away_seconds = int(min(session_duration_seconds, max(0.0, absent_total - self.absent_mark)))
+        self.absent_mark = absent_total
+        used_seconds = session_duration_seconds - away_seconds
+
+        self.usage_data['seconds_used'] += used_seconds
+        for start, end in self._present_intervals(now, used_seconds):
+            self.history.mark(start, end)
+        self.session_start = now  # reset session start for next interval
+
+        self.journal.append(used_seconds, now.timestamp())
+        if self.journal.needs_compaction():
+            self.compact(now)
+        return away_seconds
+
+    def _present_intervals(self, now: datetime, used_seconds: int) -> list:
+        # the parts of [session_start, now) spent at the desk - the channel only keeps the away total,
+        # so the time away is placed right before the user came back, or at the end while still away
+        if used_seconds <= 0:
+            return []
+        duration = (now - self.session_start).total_seconds()
+        if used_seconds >= duration:
+            return [(self.session_start, now)]
+
+        presence = self.presence.read(now.timestamp())
+        if presence is None or not presence.present:
+            return [(self.session_start, self.session_start + timedelta(seconds=used_seconds))]
+
+        since_return = min(used_seconds, max(0.0, now.timestamp() - presence.present_since))
+        before_leaving = used_seconds - since_return
+        intervals = [(now - timedelta(seconds=since_return), now)]
+        if before_leaving > 0:
+            intervals.insert(0, (self.session_start, self.session_start + timedelta(seconds=before_leaving)))
+        return intervals
+
+    def compact(self, now: datetime):
+        # replace the daily total atomically, then empty the journal it now includes
+        self.usage_data['date'] = now.isoformat()
+        self.usage_data['compacted_at'] = now.timestamp()
+
+        temp_file = self.USAGE_DATA_FILE + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(self.usage_data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.USAGE_DATA_FILE)
+
+        self.journal.truncate()
+        self.history.flush()
+
+    def _limit_seconds(self) -> int:
+        hour, minute = map(int, self.daily_limit_str.split(':'))
+        return hour * 60 * 60 + minute * 60
+
+    def _plan(self, now: datetime, grace_seconds: float = 0):
+        # timetable of the alerts, assuming the computer stays in use from now on
+        remaining_seconds = self._limit_seconds() - self.usage_data['seconds_used']
+        self.timetable = self.time_manager.build_timetable(now + timedelta(seconds=remaining_seconds))
+        self.next_event = self.time_manager.next_event_index(self.timetable, now - timedelta(seconds=grace_seconds))
+
+    def _send(self, event):
+        if event.kind == "warning":
+            formatted_remaining_time = self.time_manager.format_time(event.minutes * 60, "daily")
+            message = f"You have {formatted_remaining_time} of screen time left today"
+            self.notifier.send("Screen Time Alert", message)
+        elif event.kind == "limit":
+            message = "You've reached your daily screen time limit! Time to take a break."
+            self.notifier.send("Daily Limit Reached", message)
+        else:
+            message = f"You're {event.minutes} minute(s) over your daily limit! Please shut down soon."
+            self.notifier.send("Over Daily Limit", message)
+
+    def start(self) -> float:
+        # start a usage session and plan its alerts, returns seconds until the first one
+        self.daily_limit_str = self.settings.get("daily_limit_time", "04:00")
+
+        print(f"Daily limit set to: {self.daily_limit_str}")
         print(f"Usage data file: {self.USAGE_DATA_FILE}")
         print("Press Ctrl+C to stop\n")
 
-        session_start = datetime.now()
-        usage_data = self.load_usage_data()
+        now = datetime.now()
+        self.session_start = now
+        self.absent_mark = self.presence.absent_total()
+        self.usage_data = self.load_usage_data()
+        self._plan(now, self.time_manager.GRACE_SECONDS)
+        return self.time_manager.seconds_until(self.timetable, self.next_event, now)
+
+    def check(self) -> float:
+        # add the time used since the last check and send the alert that is due, returns seconds until the next one
+        self.wakeups += 1
+        now = datetime.now()
+        if self._record_usage(now):
+            # time away pushes the limit back
+            self._plan(now)
+
+        due = self.time_manager.next_event_index(self.timetable, now)
+        if due > self.next_event:
+            # after a late wakeup only the most recent alert is still relevant
+            self._send(self.timetable[due - 1])
+            self.next_event = due
+
+        used_total_seconds = self.usage_data['seconds_used']
+        formatted_used_seconds = self.time_manager.format_time(int(used_total_seconds), "daily")
+        formatted_total_seconds = self.time_manager.format_time(self._limit_seconds(), "daily")
+        print(f"[{now.strftime('%H:%M:%S')}] Used: {formatted_used_seconds} / {formatted_total_seconds}")
+
+        return self.time_manager.seconds_until(self.timetable, self.next_event, now)
+
+    def reconfigure(self, changes: dict) -> float:
+        # plan the alerts for a new daily limit in place, returns seconds until the next one
+        now = datetime.now()
+        self._record_usage(now)
+
+        if "daily_limit_time" in changes:
+            self.daily_limit_str = changes["daily_limit_time"] or "04:00"
+            print(f"Daily limit changed to: {self.daily_limit_str}")
+
+        self._plan(now)
+        return self.time_manager.seconds_until(self.timetable, self.next_event, now)
+
+    def stop(self):
+        # save final usage of the session
+        now = datetime.now()
+        self._record_usage(now)
+        self.compact(now)
+        print(f"Usage journal: {self.journal.stats()}")
+
+    def monitor(self):
+        # monitor daily usage and enforce limits
+        delay = self.start()
         try:
             while True:
-                hour, minute = map(int, daily_limit_str.split(':'))
-                now = datetime.now()
-                daily_limit = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                session_duration_seconds = int((now - session_start).total_seconds())
-
-                # update total usage
-                usage_data['seconds_used'] += session_duration_seconds
-                session_start = now  # reset session start for next interval
-
-                # save usage data
-                usage_data['date'] = now.isoformat()
-                with open(self.USAGE_DATA_FILE, 'w') as f:
-                    json.dump(usage_data, f, indent=4)
-
-                used_total_seconds = usage_data['seconds_used']
-
-                used_hours = used_total_seconds // 3600
-                used_minutes = (used_total_seconds % 3600) // 60
-                used_seconds = used_total_seconds % 60
-
-                used_time = now.replace(hour=used_hours, minute=used_minutes, second=used_seconds, microsecond=0)
-
-                remaining_time = daily_limit - used_time
-                remaining_seconds = remaining_time.total_seconds()
-                remaining_minutes = remaining_seconds // 60
-                formatted_used_seconds = self.time_manager.format_time(int(used_total_seconds), "daily")
-                formatted_total_seconds = self.time_manager.format_time(int(hour * 60 * 60 + minute * 60), "daily")
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Used: {formatted_used_seconds} / {formatted_total_seconds}")
-
-                # before limit reached
-                formatted_remaining_time = self.time_manager.format_time(int(remaining_seconds), "daily")
-
-                if remaining_seconds > 0:
-                    # send warnings for time left
-                    for warning_min in self.time_manager.WARNING_MINUTES:
-                        if remaining_minutes == warning_min:
-                            message = f"You have {formatted_remaining_time} of screen time left today"
-                            self.notifier.send("Screen Time Alert", message)
-                            break
-
-                # at limit (within 1 minute)
-                elif remaining_seconds <= 0 and remaining_seconds > -60:
-                    message = "You've reached your daily screen time limit! Time to take a break."
-                    self.notifier.send("Daily Limit Reached", message)
-
-                # over limit
-                else:
-                    minutes_over = abs(int(remaining_minutes))
-                    for warning_minute in self.time_manager.WARNING_MINUTES:
-                        if minutes_over == warning_minute:
-                            message = f"You're {minutes_over} minute(s) over your daily limit! Please shut down soon."
-                            self.notifier.send("Over Daily Limit", message)
-
-                time.sleep(self.time_manager.CHECK_INTERVAL)
+                time.sleep(delay)
+                delay = self.check()
 
         except KeyboardInterrupt:
             # save final usage before exiting
-            session_duration = int((datetime.now() - session_start).total_seconds())
-            usage_data['seconds_used'] += session_duration
-            with open(self.USAGE_DATA_FILE, 'w') as f:
-                json.dump(usage_data, f, indent=4)
+            self.stop()
 
 
 def main():
+    # main.js stops features with SIGTERM - handle it like Ctrl+C so the final usage is saved
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
     daily_limit = DailyLimit()
     daily_limit.monitor()
 
@@ -2,28 +2,125 @@ import os
 import cv2
 import numpy as np
 import time
-from ultralytics import YOLO
 from collections import deque
 
 from backend.core.notification_manager import NotificationManager
 from backend.core.camera_manager import CameraManager
 from backend.core.settings_manager import SettingsManager
+from backend.core.inference_engine import file_hash, load_model
+from backend.core.calibration_cache import CalibrationCache
+from backend.core.metrics import Metrics
+from backend.core.motion_gate import MotionGate
+from backend.core.roi_tracker import RoiTracker, mirror_keypoints, offset_boxes, offset_keypoints
+from backend.core.streaming_stats import SignalSmoother, robust_baseline
 
 
 class DistanceCheck:
     # monitor user's distance from screen using face detection
+    NAME = "distance_check"  # feature label in the exported metrics
     ALERT_COOLDOWN = 5
     DETECTION_CONFIDENCE = 0.1
     DISTANCE_THRESHOLD = 1.2  # 20% closer than calibrated distance
     HISTORY_SIZE = 5
+    BURST_INTERVAL = 0.1  # seconds between calibration burst frames, so each one is a new camera frame
+    BURST_MIN_USABLE = 0.5  # fraction of the burst that must show exactly one face
+    # settings applied in place by reconfigure()
+    CONFIG_KEYS = ["distance_check_area", "motion_gate_threshold", "roi_tracking_enable"]
 
-    def __init__(self):
+    def __init__(self, model=None):
         self.settings = SettingsManager()
         self.notifier = NotificationManager()
-        self.camera = CameraManager()
+        self.camera = CameraManager(shared=True, background=True)
+        self.metrics = Metrics()
 
         self.CALIBRATION_IMAGE = self.settings.path + "/calibrate_distance.png"
-        self.model = YOLO(self.settings.path + "/yolo11n-pose.pt")
+        self.reference_image = self.CALIBRATION_IMAGE
+        self.WEIGHTS = self.settings.path + "/yolo11n-pose.pt"
+        # a host process can pass in an already loaded model, otherwise it is loaded on first use
+        self._model = model
+        # skip decoding and inference when the calibration image has not changed
+        self.calibration_cache = CalibrationCache(self.settings.path + "/calibration_cache.json")
+        self.calibration_report = None  # throughput and spread of the last burst calibration
+        self.model_id = None  # weights, backend and variant the calibration results belong to
+
+        # reuse the last detection while the scene is unchanged
+        self.motion_gate = MotionGate(self.settings.get("motion_gate_threshold", MotionGate.DEFAULT_THRESHOLD))
+        self.last_results = None
+        # run inference on a crop around the last detected face
+        self.roi_tracker = RoiTracker(self.settings.get("roi_tracking_enable", True))
+
+        self.healthy_area = 0
+        self._reset_state()
+
+    def _reset_state(self):
+        # per-session detection state
+        self.area_filter = SignalSmoother()  # face area relative to the healthy one
+        self.not_visible_face = deque(maxlen=self.HISTORY_SIZE)
+        self.too_many_faces = deque(maxlen=self.HISTORY_SIZE)
+        self.last_alert_time = 0
+        self.last_results = None
+        self.motion_gate.reset()
+        self.roi_tracker.lose()
+        self.distance_state = "Healthy distance"
+        self.face_visible = False  # published to the presence channel by the vision host
+
+    def ensure_calibrated(self) -> bool:
+        # calibrate from the calibration image if no healthy area is stored yet, or if the image or
+        # model changed since the stored one was computed - a cache entry for both means it is current
+        image_exists = os.path.exists(self.CALIBRATION_IMAGE)
+        if self.settings.get("distance_check_area", 0) != 0:
+            if (not image_exists or self.settings.get("calibration_burst_frames", 0)
+                    or self.calibration_cache.get("distance_check", self.CALIBRATION_IMAGE, self._model_id())):
+                return True
+            print("Calibration image or model changed - recalibrating")
+
+        if not image_exists:
+            print(f"Calibration image not found: {self.CALIBRATION_IMAGE}")
+            return False
+
+        if self.calibrate():
+            print("Calibration successful")
+            return True
+
+        print("Calibration failed")
+        return False
+
+    @staticmethod
+    def face_area(keypoints) -> float:
+        # area of the triangle formed by the nose and both eyes
+        nose = keypoints[0]
+        left_eye = keypoints[1]
+        right_eye = keypoints[2]
+
+        return abs(0.5 * (
+            nose[0] * (left_eye[1] - right_eye[1])
+            + left_eye[0] * (right_eye[1] - nose[1])
+            + right_eye[0] * (nose[1] - left_eye[1])))
+
+    @property
+    def model(self):
+        # load the inference runtime only when a forward pass is actually needed
+        if self._model is None:
+            self._model = load_model(self.WEIGHTS, self.settings.get("inference_backend", "onnx"),
+                                     self.settings.get("inference_variant", "fp32"))
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    def _model_id(self) -> str:
+        # calibration results are only valid for the weights, backend and variant that produced them
+        # the model is loaded once per instance, so its id is computed once too
+        if self.model_id is None:
+            try:
+                weights_hash = file_hash(self.WEIGHTS)[:16]
+            except OSError:
+                weights_hash = ""
+            self.model_id = (f"{os.path.basename(self.WEIGHTS)}.{weights_hash}."
+                             f"{self.settings.get('inference_backend', 'onnx')}."
+                             f"{self.settings.get('inference_variant', 'fp32')}")
+        return self.model_id
 
     def calibrate(self) -> bool:
         # Calibrate healthy distance by detecting face area in calibration image
@@ -35,20 +132,31 @@ class DistanceCheck:
             )
             return False
 
-        results = self.model.predict(source=self.CALIBRATION_IMAGE, conf=0.5)
+        # with "calibration_burst_frames" set, the baseline comes from that many live frames instead
+        burst_frames = self.settings.get("calibration_burst_frames", 0)
+        if burst_frames:
+            return self.calibrate_burst(burst_frames)
+
+        cached = self.calibration_cache.get("distance_check", self.CALIBRATION_IMAGE, self._model_id())
+        if cached is not None:
+            self.settings.set("distance_check_area", int(cached["area"]))
+            print(f'Healthy distance area reused from unchanged calibration image: {int(cached["area"])}')
+            return True
+
+        image = cv2.imread(self.CALIBRATION_IMAGE)
+        faces = self.model.predict(image, conf=0.5).keypoints if image is not None else []
 
-        if len(results) == 0:
+        if len(faces) == 0:
             self.notifier.send("Error: Face Detection", "No face detected in calibration image")
             return False
 
-        if len(results) > 1:
+        if len(faces) > 1:
             self.notifier.send("Error: Face Detection",
                                "Multiple faces detected. Please ensure only your face is visible")
             return False
 
         # Calculate face area
-        keypoints = results[0].keypoints.data
-        keypoints = keypoints[0].cpu().numpy()
+        keypoints = faces[0]
 
         nose = keypoints[0]
         left_eye = keypoints[1]
@@ -59,10 +167,9 @@ class DistanceCheck:
         print("Result for left eye: ", left_eye)
         print("Result for right eye: ", right_eye)
 
-        area = abs(0.5 * (
-            nose[0] * (left_eye[1] - right_eye[1])
-            + left_eye[0] * (right_eye[1] - nose[1])
-            + right_eye[0] * (nose[1] - left_eye[1])))
+        area = float(self.face_area(keypoints))
+        self.calibration_cache.put("distance_check", self.CALIBRATION_IMAGE, self._model_id(),
+                                   keypoints=np.asarray(keypoints).tolist(), area=area)
 
         print(f'Area: {area:.2f}')
 
@@ -71,9 +178,48 @@ class DistanceCheck:
 
         return True
 
-    def monitor(self):
-        # monitor distance in real-time and alert user if too close
+    def calibrate_burst(self, frame_count: int) -> bool:
+        # healthy area as the median over a burst of camera frames, so one blink or head tilt cannot set it
+        was_open = self.camera.is_open
+        if not self.camera.open(self.CALIBRATION_IMAGE):
+            return False
+        try:
+            frames = self.camera.read_burst(frame_count, self.BURST_INTERVAL)
+        finally:
+            if not was_open:
+                self.camera.release()
+
+        # one forward pass for the whole burst
+        started = time.perf_counter()
+        detections = self.model.predict_batch(frames, conf=0.5) if frames else []
+        elapsed = time.perf_counter() - started
+
+        areas = [float(self.face_area(faces.keypoints[0])) for faces in detections
+                 if faces.keypoints is not None and len(faces.keypoints) == 1]
+        if not areas or len(areas) < frame_count * self.BURST_MIN_USABLE:
+            self.notifier.send("Error: Face Detection",
+                               "Please keep only your face visible while calibrating")
+            return False
+
+        area, variance = robust_baseline(areas)
+        area, variance = float(area), float(variance)
+        self.settings.update({"distance_check_area": int(area), "distance_check_area_variance": variance})
+
+        self.calibration_report = {
+            "frames": len(frames),
+            "usable_frames": len(areas),
+            "frames_per_second": len(frames) / elapsed if elapsed else 0.0,
+            "baseline": area,
+            "variance": variance,
+            "relative_spread": variance ** 0.5 / area if area else 0.0,
+        }
+        print(f'Healthy distance area saved: {int(area)} from {len(areas)}/{len(frames)} frames, '
+              f'spread {self.calibration_report["relative_spread"]:.1%}, '
+              f'{self.calibration_report["frames_per_second"]:.1f} frames/s')
+        return True
 
+    def prepare(self) -> bool:
+        # load the healthy area and reset state before monitoring
         healthy_area = self.settings.get("distance_check_area", 0)
 
         if healthy_area == 0:
@@ -81,27 +227,108 @@ class DistanceCheck:
                 "Error: Distance Check",
                 "Please calibrate your healthy distance first"
             )
-            return
+            return False
 
         if not os.path.exists(self.CALIBRATION_IMAGE):
             self.notifier.send(
                 "Error: Distance Check",
                 "Calibration image not found. Please provide the image to continue."
             )
+            return False
+
+        self.healthy_area = healthy_area
+        self._reset_state()
+        return True
+
+    def reconfigure(self, changes: dict):
+        # apply changed settings without reloading the model or resetting the session
+        if changes.get("distance_check_area"):
+            self.healthy_area = changes["distance_check_area"]
+            self.area_filter.reset()
+
+        if "motion_gate_threshold" in changes:
+            threshold = changes["motion_gate_threshold"]
+            self.motion_gate.threshold = MotionGate.DEFAULT_THRESHOLD if threshold is None else threshold
+            self.motion_gate.reset()
+            self.last_results = None
+
+        if "roi_tracking_enable" in changes:
+            self.roi_tracker.enabled = changes["roi_tracking_enable"] is not False
+            self.roi_tracker.lose()
+
+    def _predict(self, image):
+        # keypoints (N, 17, 3), boxes (N, 4) and confidences (N,) for one image
+        # includes the engine's conversion of the outputs to NumPy arrays
+        with self.metrics.timer(self.NAME, "predict"):
+            detections = self.model.predict(image, conf=self.DETECTION_CONFIDENCE, **self.roi_tracker.predict_kwargs())
+        return detections.keypoints, detections.boxes, detections.confidences
+
+    def _detect(self, frame):
+        # detect faces on the tracked region, falling back to the full frame when the track is lost
+        image, offset = self.roi_tracker.crop(frame)
+        keypoints, boxes, confidences = self._predict(image)
+
+        if self.roi_tracker.is_tracking and len(keypoints) != 1:
+            self.roi_tracker.lose()
+            image, offset = self.roi_tracker.crop(frame)
+            keypoints, boxes, confidences = self._predict(image)
+
+        keypoints = offset_keypoints(keypoints, offset)
+        boxes = offset_boxes(boxes, offset)
+
+        if len(boxes) == 1:
+            self.roi_tracker.update(boxes, confidences, frame.shape)
+        else:
+            self.roi_tracker.lose()
+
+        # the region is tracked in camera coordinates, the keypoints are reported as in the mirrored view
+        return mirror_keypoints(keypoints, frame.shape[1])
+
+    def process_frame(self, frame):
+        # detect the face in a camera frame and update the distance state
+        with self.metrics.timer(self.NAME, "frame"):
+            with self.metrics.timer(self.NAME, "motion_gate"):
+                changed = self.motion_gate.should_infer(frame)
+            if changed or self.last_results is None:
+                self.metrics.count(self.NAME, "inferences")
+                self.last_results = self._detect(frame)
+            else:
+                self.metrics.count(self.NAME, "inferences_skipped")
+            faces = self.last_results
+            self.face_visible = len(faces) > 0
+
+            # handle different detection scenarios
+            if len(faces) < 1:
+                self._handle_no_face_detected(self.not_visible_face)
+            elif len(faces) > 1:
+                self._handle_multiple_faces(self.too_many_faces)
+            else:
+                keypoints = faces[0]
+                # single face detected - check distance
+                self.distance_state, self.last_alert_time = self._check_distance(
+                    keypoints,
+                    self.healthy_area,
+                    self.area_filter,
+                    self.distance_state,
+                    self.last_alert_time
+                )
+
+    def monitor(self):
+        # monitor distance in real-time and alert user if too close
+        if not self.prepare():
             return
 
         if not self.camera.open(self.CALIBRATION_IMAGE):
             return
 
-        area_history = deque(maxlen=self.HISTORY_SIZE)
-        not_visible_face = deque(maxlen=self.HISTORY_SIZE)
-        too_many_faces = deque(maxlen=self.HISTORY_SIZE)
-        last_alert_time = 0
-        distance_state = "Healthy distance"
-
         try:
             while True:
-                ret, frame = self.camera.read()
+                with self.metrics.allocations(self.NAME):
+                    with self.metrics.timer(self.NAME, "capture"):
+                        ret, frame = self.camera.read()
+                    if ret:
+                        # detections are mirrored arithmetically, the pixels are never flipped
+                        self.process_frame(frame)
                 if not ret:
                     print("Failed to receive frame.")
                     self.notifier.send(
@@ -110,33 +337,17 @@ class DistanceCheck:
                     )
                     break
 
-                frame = cv2.flip(frame, 1)  # Mirror the frame
-                results = self.model.predict(frame, conf=self.DETECTION_CONFIDENCE)
-                results = results[0]
-
-                # handle different detection scenarios
-                if len(results) < 1:
-                    self._handle_no_face_detected(not_visible_face)
-                elif len(results) > 1:
-                    self._handle_multiple_faces(too_many_faces)
-                else:
-                    data = results[0].keypoints.data
-                    keypoints = data[0].cpu().numpy()
-                    # single face detected - check distance
-                    distance_state, last_alert_time = self._check_distance(
-                        keypoints,
-                        healthy_area,
-                        area_history,
-                        distance_state,
-                        last_alert_time
-                    )
+                self.metrics.maybe_export()
 
                 # cv2.imshow('Distance Monitor - Press q to Quit', frame)
-                time.sleep(5)
+                self.camera.wait(5)
                 if cv2.waitKey(1) == ord('q'):
                     break
 
         finally:
+            print(f"Motion gate: {self.motion_gate.stats()}")
+            print(f"Camera: {self.camera.stats()}")
+            self.metrics.export()
             self.camera.release()
             cv2.destroyAllWindows()
 
@@ -164,24 +375,19 @@ class DistanceCheck:
                     "Please ensure only your face is visible in the camera."
                 )
 
-    def _check_distance(self, keypoints, healthy_area: float, area_history: deque, distance_state: str, last_alert_time: float) -> tuple[str, float]:
+    def _check_distance(self, keypoints, healthy_area: float, area_filter: SignalSmoother, distance_state: str, last_alert_time: float) -> tuple[str, float]:
         # check if user is at healthy distance
-        nose = keypoints[0]
-        left_eye = keypoints[1]
-        right_eye = keypoints[2]
-
-        current_area = abs(0.5 * (
-            nose[0] * (left_eye[1] - right_eye[1])
-            + left_eye[0] * (right_eye[1] - nose[1])
-            + right_eye[0] * (nose[1] - left_eye[1])))
+        with self.metrics.timer(self.NAME, "geometry"):
+            current_area = self.face_area(keypoints)
 
-        area_history.append(current_area)
-        avg_area = np.mean(area_history)
+            # smoothed relative to the healthy area, so one noise model fits every calibration
+            relative_area = area_filter.update(current_area / healthy_area)
+            avg_area = relative_area * healthy_area
 
         print(f'Current Area: {avg_area:.2f}, Healthy Area: {healthy_area:.2f}')
 
         # Determine new state
-        if avg_area > self.DISTANCE_THRESHOLD * healthy_area:
+        if relative_area > self.DISTANCE_THRESHOLD:
             new_state = "Too close"
         else:
             new_state = "Healthy distance"
@@ -190,9 +396,11 @@ class DistanceCheck:
 
         if new_state != distance_state or (now - last_alert_time > self.ALERT_COOLDOWN):
             if new_state == "Too close":
-                self.notifier.send(
-                    "Distance Alert",
-                    "You are too close! Move back a bit.")
+                self.metrics.count(self.NAME, "alerts")
+                with self.metrics.timer(self.NAME, "notify"):
+                    self.notifier.send(
+                        "Distance Alert",
+                        "You are too close! Move back a bit.")
                 last_alert_time = now
 
             distance_state = new_state
@@ -203,19 +411,11 @@ class DistanceCheck:
 def main():
     # entry point for distance check feature
     distance_check = DistanceCheck()
-    settings = SettingsManager()
+    distance_check.metrics.export_as(DistanceCheck.NAME)
 
     # Check if calibration is needed
-    if settings.get("distance_check_area", 0) == 0:
-        if os.path.exists(distance_check.CALIBRATION_IMAGE):
-            if distance_check.calibrate():
-                print("Calibration successful")
-            else:
-                print("Calibration failed")
-                return
-        else:
-            print(f"Calibration image not found: {distance_check.CALIBRATION_IMAGE}")
-            return
+    if not distance_check.ensure_calibrated():
+        return
     distance_check.monitor()
 
 
@@ -2,28 +2,120 @@ import os
 import cv2
 import numpy as np
 import time
-from ultralytics import YOLO
 from collections import deque
 
 from backend.core.notification_manager import NotificationManager
 from backend.core.camera_manager import CameraManager
 from backend.core.settings_manager import SettingsManager
+from backend.core.inference_engine import file_hash, load_model
+from backend.core.calibration_cache import CalibrationCache
+from backend.core.metrics import Metrics
+from backend.core.motion_gate import MotionGate
+from backend.core.roi_tracker import RoiTracker, mirror_boxes, offset_boxes
+from backend.core.streaming_stats import SignalSmoother, robust_baseline
 
 
 class EyeStrainPrevention:
     # monitor user's eye strain from screen using eyes detection
+    NAME = "eye_strain_prevention"  # feature label in the exported metrics
     ALERT_COOLDOWN = 5
     DETECTION_CONFIDENCE = 0.1
     TENSION_THRESHOLD = 1.2  # 20% strain than relaxed image
     HISTORY_SIZE = 5
+    BURST_INTERVAL = 0.1  # seconds between calibration burst frames, so each one is a new camera frame
+    BURST_MIN_USABLE = 0.5  # fraction of the burst that must show exactly two eyes
+    # settings applied in place by reconfigure()
+    CONFIG_KEYS = ["eye_strain_prevention_ratios", "motion_gate_threshold", "roi_tracking_enable"]
 
-    def __init__(self):
+    def __init__(self, model=None):
         self.settings = SettingsManager()
         self.notifier = NotificationManager()
-        self.camera = CameraManager()
+        self.camera = CameraManager(shared=True, background=True)
+        self.metrics = Metrics()
 
         self.RELAXED_IMAGE = self.settings.path + "/relaxed_face.png"
-        self.model = YOLO(self.settings.path + '/best_model.pt')
+        self.reference_image = self.RELAXED_IMAGE
+        self.WEIGHTS = self.settings.path + '/best_model.pt'
+        # a host process can pass in an already loaded model, otherwise it is loaded on first use
+        self._model = model
+        # skip decoding and inference when the relaxed image has not changed
+        self.calibration_cache = CalibrationCache(self.settings.path + "/calibration_cache.json")
+        self.calibration_report = None  # throughput and spread of the last burst calibration
+        self.model_id = None  # weights, backend and variant the calibration results belong to
+
+        # reuse the last detection while the scene is unchanged
+        self.motion_gate = MotionGate(self.settings.get("motion_gate_threshold", MotionGate.DEFAULT_THRESHOLD))
+        self.last_results = None
+        # run inference on a crop around the last detected pair of eyes
+        self.roi_tracker = RoiTracker(self.settings.get("roi_tracking_enable", True))
+        self.preview = None
+
+        self.relaxed_ratios = []
+        self._reset_state()
+
+    def _reset_state(self):
+        # per-session detection state
+        self.ratio_filters = [SignalSmoother(), SignalSmoother()]  # eye ratios relative to the relaxed ones
+        self.not_visible_eyes = deque(maxlen=self.HISTORY_SIZE)
+        self.too_many_eyes = deque(maxlen=self.HISTORY_SIZE)
+        self.last_alert_time = 0
+        self.last_results = None
+        self.motion_gate.reset()
+        self.roi_tracker.lose()
+        self.tension_state = "Relaxed face"
+        self.face_visible = False  # published to the presence channel by the vision host
+
+    def ensure_calibrated(self) -> bool:
+        # calibrate from the relaxed image if no ratios are stored yet, or if the image or
+        # model changed since the stored ones were computed - a cache entry for both means they are current
+        image_exists = os.path.exists(self.RELAXED_IMAGE)
+        if self.settings.get("eye_strain_prevention_ratios") is not None:
+            if (not image_exists or self.settings.get("calibration_burst_frames", 0)
+                    or self.calibration_cache.get("eye_strain_prevention", self.RELAXED_IMAGE, self._model_id())):
+                return True
+            print("Relaxed image or model changed - recalibrating")
+
+        if not image_exists:
+            return False
+
+        return self.calibrate()
+
+    @staticmethod
+    def left_to_right(boxes: np.ndarray) -> np.ndarray:
+        # eye boxes ordered by x1 in the mirrored view, so each index follows the same eye on every path
+        boxes = np.asarray(boxes)
+        return boxes[np.argsort(boxes[:, 0], kind="stable")] if len(boxes) else boxes
+
+    @staticmethod
+    def eye_ratio(box) -> float:
+        # width to height ratio of an eye bounding box
+        x1, y1, x2, y2 = box
+        return (x2 - x1) / (y2 - y1)
+
+    @property
+    def model(self):
+        # load the inference runtime only when a forward pass is actually needed
+        if self._model is None:
+            self._model = load_model(self.WEIGHTS, self.settings.get("inference_backend", "onnx"),
+                                     self.settings.get("inference_variant", "fp32"))
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    def _model_id(self) -> str:
+        # calibration results are only valid for the weights, backend and variant that produced them
+        # the model is loaded once per instance, so its id is computed once too
+        if self.model_id is None:
+            try:
+                weights_hash = file_hash(self.WEIGHTS)[:16]
+            except OSError:
+                weights_hash = ""
+            self.model_id = (f"{os.path.basename(self.WEIGHTS)}.{weights_hash}."
+                             f"{self.settings.get('inference_backend', 'onnx')}."
+                             f"{self.settings.get('inference_variant', 'fp32')}")
+        return self.model_id
 
     def calibrate(self) -> bool:
         # Get healthy ratio by detecting eyes in relaxed image
@@ -34,9 +126,18 @@ class EyeStrainPrevention:
             )
             return False
 
-        results = self.model.predict(source=self.RELAXED_IMAGE, conf=0.5)
+        # with "calibration_burst_frames" set, the ratios come from that many live frames instead
+        burst_frames = self.settings.get("calibration_burst_frames", 0)
+        if burst_frames:
+            return self.calibrate_burst(burst_frames)
 
-        boxes = results[0].boxes
+        cached = self.calibration_cache.get("eye_strain_prevention", self.RELAXED_IMAGE, self._model_id())
+        if cached is not None:
+            self.settings.set("eye_strain_prevention_ratios", cached["ratios"])
+            return True
+
+        image = cv2.imread(self.RELAXED_IMAGE)
+        boxes = self.model.predict(image, conf=0.5).boxes if image is not None else []
 
         if len(boxes) < 2:
             self.notifier.send("Error: Eyes Detection",
@@ -47,30 +148,166 @@ class EyeStrainPrevention:
                                "Please ensure only your eyes are visible")
             return False
 
+        # the relaxed image is saved already mirrored
+        boxes = self.left_to_right(boxes)
         ratios = []
         for box in boxes:
-            x1, y1, x2, y2 = box.xyxy[0].tolist()
-            ratio = (x2 - x1) / (y2 - y1)
+            ratio = float(self.eye_ratio(box.tolist()))
             ratios.append(ratio)
 
+        self.calibration_cache.put("eye_strain_prevention", self.RELAXED_IMAGE, self._model_id(),
+                                   boxes=np.asarray(boxes).tolist(), ratios=ratios)
+
         self.settings.set("eye_strain_prevention_ratios", ratios)
         return True
 
-    def monitor(self):
-        # monitor ratios in real-time and alert user has eye strain
+    def calibrate_burst(self, frame_count: int) -> bool:
+        # relaxed ratios as the median over a burst of camera frames, so one blink cannot set them
+        was_open = self.camera.is_open
+        if not self.camera.open(self.RELAXED_IMAGE):
+            return False
+        try:
+            frames = self.camera.read_burst(frame_count, self.BURST_INTERVAL)
+        finally:
+            if not was_open:
+                self.camera.release()
+
+        # one forward pass for the whole burst
+        started = time.perf_counter()
+        detections = self.model.predict_batch(frames, conf=0.5) if frames else []
+        elapsed = time.perf_counter() - started
+
+        samples = []
+        for frame, eyes in zip(frames, detections):
+            if len(eyes.boxes) == 2:
+                # ordered as in monitoring, so each column follows the same eye across frames
+                boxes = self.left_to_right(mirror_boxes(eyes.boxes, frame.shape[1]))
+                samples.append([float(self.eye_ratio(box)) for box in boxes])
+        if not samples or len(samples) < frame_count * self.BURST_MIN_USABLE:
+            self.notifier.send("Error: Eyes Detection",
+                               "Please keep both eyes visible while calibrating")
+            return False
+
+        ratios, variances = robust_baseline(samples)
+        ratios, variances = ratios.tolist(), variances.tolist()
+        self.settings.update({"eye_strain_prevention_ratios": ratios,
+                              "eye_strain_prevention_ratios_variance": variances})
+
+        self.calibration_report = {
+            "frames": len(frames),
+            "usable_frames": len(samples),
+            "frames_per_second": len(frames) / elapsed if elapsed else 0.0,
+            "baseline": ratios,
+            "variance": variances,
+            "relative_spread": [variance ** 0.5 / ratio for ratio, variance in zip(ratios, variances)],
+        }
+        spread = ", ".join(f"{value:.1%}" for value in self.calibration_report["relative_spread"])
+        print(f'Relaxed eye ratios saved: {[round(ratio, 3) for ratio in ratios]} from {len(samples)}/{len(frames)} '
+              f'frames, spread {spread}, {self.calibration_report["frames_per_second"]:.1f} frames/s')
+        return True
+
+    def prepare(self) -> bool:
+        # load the relaxed ratios and reset state before monitoring
         relaxed_ratios = self.settings.get("eye_strain_prevention_ratios", [])
         if relaxed_ratios is None:
             self.notifier.send(
                 "Error: Eye Strain Prevention",
                 "Please provide your relaxed image first"
             )
-            return
+            return False
 
         if not os.path.exists(self.RELAXED_IMAGE):
             self.notifier.send(
                 "Error: Eye Strain Prevention",
                 "Relaxed image not found. Please provide the image to continue."
             )
+            return False
+
+        self.relaxed_ratios = relaxed_ratios
+        self._reset_state()
+        return True
+
+    def reconfigure(self, changes: dict):
+        # apply changed settings without reloading the model or resetting the session
+        if changes.get("eye_strain_prevention_ratios") is not None:
+            self.relaxed_ratios = changes["eye_strain_prevention_ratios"]
+            for ratio_filter in self.ratio_filters:
+                ratio_filter.reset()
+
+        if "motion_gate_threshold" in changes:
+            threshold = changes["motion_gate_threshold"]
+            self.motion_gate.threshold = MotionGate.DEFAULT_THRESHOLD if threshold is None else threshold
+            self.motion_gate.reset()
+            self.last_results = None
+
+        if "roi_tracking_enable" in changes:
+            self.roi_tracker.enabled = changes["roi_tracking_enable"] is not False
+            self.roi_tracker.lose()
+
+    def _predict(self, image):
+        # boxes (N, 4) and confidences (N,) for one image
+        # includes the engine's conversion of the outputs to NumPy arrays
+        with self.metrics.timer(self.NAME, "predict"):
+            detections = self.model.predict(image, conf=self.DETECTION_CONFIDENCE, **self.roi_tracker.predict_kwargs())
+        return detections.boxes, detections.confidences
+
+    def _detect(self, frame):
+        # detect eyes on the tracked region, falling back to the full frame when the track is lost
+        image, offset = self.roi_tracker.crop(frame)
+        boxes, confidences = self._predict(image)
+
+        if self.roi_tracker.is_tracking and len(boxes) != 2:
+            self.roi_tracker.lose()
+            image, offset = self.roi_tracker.crop(frame)
+            boxes, confidences = self._predict(image)
+
+        boxes = offset_boxes(boxes, offset)
+
+        if len(boxes) == 2:
+            self.roi_tracker.update(boxes, confidences, frame.shape)
+        else:
+            self.roi_tracker.lose()
+
+        # the region is tracked in camera coordinates, the boxes are reported as in the mirrored view
+        return self.left_to_right(mirror_boxes(boxes, frame.shape[1]))
+
+    def process_frame(self, frame):
+        # detect the eyes in a camera frame and update the tension state
+        with self.metrics.timer(self.NAME, "frame"):
+            with self.metrics.timer(self.NAME, "motion_gate"):
+                changed = self.motion_gate.should_infer(frame)
+            if changed or self.last_results is None:
+                self.metrics.count(self.NAME, "inferences")
+                self.last_results = self._detect(frame)
+            else:
+                self.metrics.count(self.NAME, "inferences_skipped")
+            boxes = self.last_results
+            self.face_visible = len(boxes) > 0
+
+            # handle different detection scenarios
+            if len(boxes) < 2:
+                self._handle_no_eyes_detected(self.not_visible_eyes)
+            elif len(boxes) > 2:
+                self._handle_multiple_eyes(self.too_many_eyes)
+            else:
+                print("Boxes: ", boxes)
+                print("Relaxed ratios: ", self.relaxed_ratios)
+                print("Smoothed ratios: ", [ratio_filter.value for ratio_filter in self.ratio_filters])
+
+                # single pair of eyes detected - check ratios
+
+                boxes = boxes[:2]
+                self.tension_state, self.last_alert_time = self._check_tension(
+                    boxes,
+                    self.relaxed_ratios,
+                    self.ratio_filters,
+                    self.tension_state,
+                    self.last_alert_time
+                )
+
+    def monitor(self):
+        # monitor ratios in real-time and alert user has eye strain
+        if not self.prepare():
             return
 
         if not self.camera.open(self.RELAXED_IMAGE):
@@ -80,14 +317,14 @@ class EyeStrainPrevention:
             )
             return
 
-        ratios_history = [deque(maxlen=self.HISTORY_SIZE), deque(maxlen=self.HISTORY_SIZE)]
-        not_visible_eyes = deque(maxlen=self.HISTORY_SIZE)
-        too_many_eyes = deque(maxlen=self.HISTORY_SIZE)
-        last_alert_time = 0
-        tension_state = "Relaxed face"
         try:
             while True:
-                ret, frame = self.camera.read()
+                with self.metrics.allocations(self.NAME):
+                    with self.metrics.timer(self.NAME, "capture"):
+                        ret, frame = self.camera.read()
+                    if ret:
+                        # detections are mirrored arithmetically, the pixels are never flipped
+                        self.process_frame(frame)
                 if not ret:
                     print("Failed to receive frame.")
                     self.notifier.send(
@@ -96,37 +333,19 @@ class EyeStrainPrevention:
                     )
                     break
 
-                frame = cv2.flip(frame, 1)  # Mirror the frame
-                results = self.model.predict(frame, conf=self.DETECTION_CONFIDENCE)
-                boxes = results[0].boxes
-
-                # handle different detection scenarios
-                if len(boxes) < 2:
-                    self._handle_no_eyes_detected(not_visible_eyes)
-                elif len(boxes) > 2:
-                    self._handle_multiple_eyes(too_many_eyes)
-                else:
-                    print("Boxes: ", results[0].boxes)
-                    print("Relaxed ratios: ", relaxed_ratios)
-                    print("Ratios history: ", ratios_history)
-
-                    # single pair of eyes detected - check ratios
-
-                    boxes = [boxes[0].xyxy[0].tolist(), boxes[1].xyxy[0].tolist()]
-                    tension_state, last_alert_time = self._check_tension(
-                        boxes,
-                        relaxed_ratios,
-                        ratios_history,
-                        tension_state,
-                        last_alert_time
-                    )
+                self.metrics.maybe_export()
 
-                cv2.imshow('Eye Strain Prevention - Press q to Quit', frame)
-                time.sleep(5)
+                # the preview is mirrored into a reused buffer, off the detection path
+                self.preview = cv2.flip(frame, 1, self.preview)
+                cv2.imshow('Eye Strain Prevention - Press q to Quit', self.preview)
+                self.camera.wait(5)
                 if cv2.waitKey(1) == ord('q'):
                     break
 
         finally:
+            print(f"Motion gate: {self.motion_gate.stats()}")
+            print(f"Camera: {self.camera.stats()}")
+            self.metrics.export()
             self.camera.release()
             cv2.destroyAllWindows()
 
@@ -154,17 +373,17 @@ class EyeStrainPrevention:
                     "Please ensure only your eyes are visible in the camera."
                 )
 
-    def _check_tension(self, boxes, relaxed_ratios: list, ratios_history: list, tension_state: str, last_alert_time: float) -> tuple[str, float]:
+    def _check_tension(self, boxes, relaxed_ratios: list, ratio_filters: list, tension_state: str, last_alert_time: float) -> tuple[str, float]:
         # check if user has healthy ratio
         print("Boxes: ", boxes)
         for i in range(len(boxes)):
-            x1, y1, x2, y2 = boxes[i]
-            current_ratio = (x2 - x1) / (y2 - y1)
+            with self.metrics.timer(self.NAME, "geometry"):
+                current_ratio = self.eye_ratio(boxes[i])
 
-            ratios_history[i].append(current_ratio)
-            avg_ratio = np.mean(ratios_history[i])
+                # smoothed relative to the relaxed ratio, so one noise model fits every calibration
+                relative_ratio = ratio_filters[i].update(current_ratio / relaxed_ratios[i])
 
-            if avg_ratio > self.TENSION_THRESHOLD * relaxed_ratios[i]:
+            if relative_ratio > self.TENSION_THRESHOLD:
                 new_state = "Focused face"
             else:
                 new_state = "Relaxed face"
@@ -173,9 +392,11 @@ class EyeStrainPrevention:
 
             if new_state != tension_state or (now - last_alert_time > self.ALERT_COOLDOWN):
                 if new_state == "Focused face":
-                    self.notifier.send(
-                        "Tension Alert",
-                        "You are too focused! Relax your face first.")
+                    self.metrics.count(self.NAME, "alerts")
+                    with self.metrics.timer(self.NAME, "notify"):
+                        self.notifier.send(
+                            "Tension Alert",
+                            "You are too focused! Relax your face first.")
                     last_alert_time = now
 
             tension_state = new_state
@@ -186,14 +407,10 @@ class EyeStrainPrevention:
 def main():
     # entry point for eye strain prevention feature
     eye_strain_prevention = EyeStrainPrevention()
-    settings = SettingsManager()
+    eye_strain_prevention.metrics.export_as(EyeStrainPrevention.NAME)
     # Check if calibration is needed
-    if settings.get("eye_strain_prevention_ratios") is None:
-        if os.path.exists(eye_strain_prevention.RELAXED_IMAGE):
-            if not eye_strain_prevention.calibrate():
-                return
-        else:
-            return
+    if not eye_strain_prevention.ensure_calibrated():
+        return
     eye_strain_prevention.monitor()
 
 
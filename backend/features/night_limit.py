@@ -13,56 +13,87 @@ class NightLimit:
         self.settings = SettingsManager()
         self.notifier = NotificationManager()
 
+        self.timetable = []
+        self.next_event = 0
+        self.wakeups = 0
+
+    def _upcoming_bedtime(self, now: datetime) -> datetime:
+        # bedtime whose warnings are still ahead, today or tomorrow
+        hour, minute = map(int, self.bedtime_str.split(':'))
+        bedtime = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+        # if bedtime has passed today, it refers to tomorrow
+        if bedtime + timedelta(minutes=max(self.time_manager.WARNING_MINUTES)) < now:
+            bedtime += timedelta(days=1)
+        return bedtime
+
+    def _plan(self, now: datetime, grace_seconds: float = 0):
+        # timetable of the reminders for the upcoming bedtime
+        self.bedtime = self._upcoming_bedtime(now)
+        self.timetable = self.time_manager.build_timetable(self.bedtime)
+        self.next_event = self.time_manager.next_event_index(self.timetable, now - timedelta(seconds=grace_seconds))
+
+    def _send(self, event):
+        if event.kind == "warning":
+            message = f"It's {event.minutes} minute(s) until your bedtime. Start wrapping up!"
+            self.notifier.send("Bedtime Reminder", message)
+        elif event.kind == "limit":
+            message = f"It's {self.bedtime_str}! Time to get off the computer and rest."
+            self.notifier.send("Bedtime!", message)
+        else:
+            message = f"You're {event.minutes} minute(s) past bedtime! Please shut down soon."
+            self.notifier.send("Past Bedtime!", message)
+
+    def start(self) -> float:
+        # read the bedtime and plan its reminders, returns seconds until the first one
+        self.bedtime_str = self.settings.get("night_limit_time", "22:00")
+        print(f"Bedtime set to: {self.bedtime_str}")
+
+        now = datetime.now()
+        self._plan(now, self.time_manager.GRACE_SECONDS)
+        return self.time_manager.seconds_until(self.timetable, self.next_event, now)
+
+    def check(self) -> float:
+        # send the reminder that is due, returns seconds until the next one
+        self.wakeups += 1
+        now = datetime.now()
+
+        due = self.time_manager.next_event_index(self.timetable, now)
+        if due > self.next_event:
+            # after a late wakeup only the most recent reminder is still relevant
+            self._send(self.timetable[due - 1])
+            self.next_event = due
+
+        remaining_seconds = int((self.bedtime - now).total_seconds())
+        formatted_time = self.time_manager.format_time(remaining_seconds, "night")
+        print(f"[{now.strftime('%H:%M:%S')}] Time until bedtime: {formatted_time}")
+
+        if self.next_event >= len(self.timetable):
+            self._plan(now)
+
+        return self.time_manager.seconds_until(self.timetable, self.next_event, now)
+
+    def reconfigure(self, changes: dict) -> float:
+        # plan the reminders for a new bedtime in place, returns seconds until the next one
+        if "night_limit_time" in changes:
+            self.bedtime_str = changes["night_limit_time"] or "22:00"
+            print(f"Bedtime changed to: {self.bedtime_str}")
+
+        now = datetime.now()
+        self._plan(now)
+        return self.time_manager.seconds_until(self.timetable, self.next_event, now)
+
+    def stop(self):
+        # nothing to clean up
+        pass
+
     def monitor(self):
         # monitor time and enforce night limit
-        bedtime_str = self.settings.get("night_limit_time", "22:00")
-        print(f"Bedtime set to: {bedtime_str}")
+        delay = self.start()
 
         while True:
-            hour, minute = map(int, bedtime_str.split(':'))
-            now = datetime.now()
-            bedtime = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-
-            remaining_time = bedtime - now
-            print("Remaining time: ", remaining_time)
-            remaining_seconds = int(remaining_time.total_seconds())
-
-            if remaining_seconds + timedelta(minutes=max(self.time_manager.WARNING_MINUTES)).total_seconds() < 0:
-                remaining_time += timedelta(days=1)
-
-            remaining_minutes = remaining_seconds // 60
-
-            # display current status
-            formatted_time = self.time_manager.format_time(remaining_seconds, "night")
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] Time until bedtime: {formatted_time}")
-
-            # before bedtime - send warnings
-            if remaining_seconds > 0:
-                for warning_minute in self.time_manager.WARNING_MINUTES:
-                    if remaining_minutes == warning_minute:
-                        message = f"It's {warning_minute} minute(s) until your bedtime. Start wrapping up!"
-                        self.notifier.send("Bedtime Reminder", message)
-                        break
-
-            # at bedtime (within 1 minute)
-            elif remaining_seconds <= 0 and remaining_seconds > -60:
-                message = f"It's {bedtime_str}! Time to get off the computer and rest."
-                self.notifier.send("Bedtime!", message)
-            # past bedtime
-            else:
-                # if bedtime has passed today, it refers to tomorrow
-                if bedtime + timedelta(minutes=max(self.time_manager.WARNING_MINUTES)) < now:
-                    bedtime += timedelta(days=1)
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Time until bedtime: {formatted_time}")
-
-                else:
-                    minutes_over = abs(remaining_minutes)
-                    for warning_minute in self.time_manager.WARNING_MINUTES:
-                        if minutes_over == warning_minute:
-                            message = f"You're {minutes_over} minute(s) past bedtime! Please shut down soon."
-                            self.notifier.send("Past Bedtime!", message)
-
-            time.sleep(self.time_manager.CHECK_INTERVAL)
+            time.sleep(delay)
+            delay = self.check()
 
 
 def main():
@@ -0,0 +1,72 @@
+import asyncio
+import signal
+
+from backend.core.metrics import Metrics
+from backend.core.scheduler import Scheduler
+from backend.features.blue_light_filter import BlueLightFilter
+from backend.features.break_reminders import BreakReminders
+from backend.features.daily_limit import DailyLimit
+from backend.features.night_limit import NightLimit
+
+TIMER_FEATURES = {
+    "night_limit": NightLimit,
+    "daily_limit": DailyLimit,
+    "break_reminders": BreakReminders,
+    "blue_light_filter": BlueLightFilter,
+}
+
+# a change to any of these is applied by the running feature through reconfigure()
+CONFIG_KEYS = {
+    "night_limit": ["night_limit_time"],
+    "daily_limit": ["daily_limit_time"],
+    "blue_light_filter": [
+        "blue_light_filter_day",
+        "blue_light_filter_evening",
+        "blue_light_filter_night",
+    ],
+}
+
+
+async def export_metrics(metrics: Metrics):
+    # process CPU and memory of the host, exported on the same interval as the vision processes
+    while True:
+        await asyncio.sleep(metrics.EXPORT_INTERVAL)
+        metrics.export()
+
+
+async def run_timer_host():
+    # run the scheduler until cancelled or terminated
+    scheduler = Scheduler(TIMER_FEATURES, CONFIG_KEYS)
+    task = asyncio.current_task()
+
+    # main.js stops the host with SIGTERM - cancel so every feature cleans up
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)
+    except NotImplementedError:
+        # Windows event loops have no signal handlers, cancel from a plain one instead
+        signal.signal(signal.SIGTERM, lambda signum, frame: loop.call_soon_threadsafe(task.cancel))
+
+    metrics = Metrics()
+    metrics.export_as("timer_host")
+    exporter = asyncio.create_task(export_metrics(metrics))
+
+    try:
+        await scheduler.run()
+    except asyncio.CancelledError:
+        print("\n\nTimer host stopped")
+    finally:
+        exporter.cancel()
+        metrics.export()
+
+
+def main():
+    # entry point for the shared timer feature host
+    try:
+        asyncio.run(run_timer_host())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import signal
+import threading
+import numpy as np
+
+from backend.core.notification_manager import NotificationManager
+from backend.core.camera_manager import CameraManager
+from backend.core.metrics import Metrics
+from backend.core.presence_channel import PresenceChannel
+from backend.core.settings_manager import SettingsManager
+from backend.features.distance_check import DistanceCheck
+from backend.features.eye_strain_prevention import EyeStrainPrevention
+
+
+class VisionHost:
+    # run the vision features as plugins over one camera and one copy of each model
+    NAME = "vision_host"  # label for the shared capture stages in the exported metrics
+    SAMPLE_INTERVAL = 5  # seconds between processed frames
+    EMPTY_SEAT_INTERVAL = 15  # seconds between processed frames while nobody is at the desk
+    IDLE_INTERVAL = 1  # seconds between loop iterations while no plugin is enabled
+    WARM_UP_SHAPE = (480, 640, 3)
+
+    PLUGINS = {
+        "distance_check": DistanceCheck,
+        "eye_strain_prevention": EyeStrainPrevention,
+    }
+
+    def __init__(self):
+        self.settings = SettingsManager()
+        self.notifier = NotificationManager()
+        self.camera = CameraManager(shared=True, background=True)
+        self.metrics = Metrics()
+
+        # each plugin loads its model once, on first use, for the lifetime of the host
+        self.plugins = {name: plugin_class() for name, plugin_class in self.PLUGINS.items()}
+        self.enabled = set()
+
+        # tells the timer features whether anyone is at the desk
+        self.presence = PresenceChannel(self.settings.path + "/presence.bin")
+        self.present = False
+
+        # settings changes from the watcher thread, applied between frames
+        self.pending_changes = {}
+        self._changes_lock = threading.Lock()
+        self.settings_changed = threading.Event()
+
+    def warm_up(self):
+        # run one forward pass per model so the first real frame is not slow
+        frame = np.zeros(self.WARM_UP_SHAPE, dtype=np.uint8)
+        for plugin in self.plugins.values():
+            plugin.model.predict(frame, conf=plugin.DETECTION_CONFIDENCE)
+
+    def enable(self, name: str) -> bool:
+        # start running a plugin on the shared frames
+        plugin = self.plugins[name]
+
+        if not plugin.ensure_calibrated() or not plugin.prepare():
+            return False
+
+        if not self.camera.open(plugin.reference_image):
+            self.notifier.send(
+                "Error: Camera Error",
+                "Couldn't open the camera."
+            )
+            return False
+
+        self.enabled.add(name)
+        print(f"Vision plugin enabled: {name}")
+        return True
+
+    def disable(self, name: str):
+        # stop running a plugin, releasing the camera if nothing else needs it
+        if name not in self.enabled:
+            return
+
+        self.enabled.discard(name)
+        print(f"Vision plugin disabled: {name}")
+
+        if not self.enabled:
+            self.camera.release()
+
+    def sync_with_settings(self):
+        # enable or disable plugins from the current settings
+        for name in self.plugins:
+            if self.settings.is_feature_enabled(name):
+                if name not in self.enabled:
+                    self.enable(name)
+            else:
+                self.disable(name)
+
+    def _watched_keys(self) -> set:
+        keys = {f"{name}_enable" for name in self.plugins}
+        for plugin in self.plugins.values():
+            keys.update(plugin.CONFIG_KEYS)
+        return keys
+
+    def on_settings_changed(self, changes: dict):
+        # called from the settings watcher thread - queue the changes for the capture loop
+        with self._changes_lock:
+            self.pending_changes.update(changes)
+        self.settings_changed.set()
+
+    def apply_changes(self):
+        # reconfigure running plugins in place and enable or disable plugins
+        self.settings_changed.clear()
+        with self._changes_lock:
+            changes, self.pending_changes = self.pending_changes, {}
+
+        for name in self.enabled:
+            plugin = self.plugins[name]
+            plugin_changes = {key: changes[key] for key in plugin.CONFIG_KEYS if key in changes}
+            if plugin_changes:
+                plugin.reconfigure(plugin_changes)
+
+        if any(f"{name}_enable" in changes for name in self.plugins):
+            self.sync_with_settings()
+
+    def process_frame(self, frame):
+        # run every enabled plugin on the same camera frame and publish whether a face was seen
+        for name in list(self.enabled):
+            self.plugins[name].process_frame(frame)
+
+        seen = any(self.plugins[name].face_visible for name in self.enabled)
+        self.present = self.presence.publish(seen)
+
+    def run(self):
+        # shared capture and inference loop
+        token = self.settings.subscribe(self._watched_keys(), self.on_settings_changed)
+        self.settings.watch()
+        self.sync_with_settings()
+
+        try:
+            while True:
+                self.apply_changes()
+
+                if not self.enabled:
+                    self.settings_changed.wait(self.IDLE_INTERVAL)
+                    continue
+
+                with self.metrics.allocations(self.NAME):
+                    with self.metrics.timer(self.NAME, "capture"):
+                        ret, frame = self.camera.read()
+                    if ret:
+                        # detections are mirrored arithmetically, the pixels are never flipped
+                        self.process_frame(frame)
+                if not ret:
+                    print("Failed to receive frame.")
+                    self.notifier.send(
+                        "Error: Vision Features",
+                        "Failed to receive frame."
+                    )
+                    break
+
+                self.metrics.maybe_export()
+
+                # sample less often while the seat is empty, a settings change ends the wait early
+                interval = self.SAMPLE_INTERVAL if self.present else self.EMPTY_SEAT_INTERVAL
+                self.camera.wait(interval, self.settings_changed)
+
+        except KeyboardInterrupt:
+            print("\n\nVision host stopped")
+
+        finally:
+            self.settings.unsubscribe(token)
+            self.presence.close()
+            for name, plugin in self.plugins.items():
+                print(f"Motion gate [{name}]: {plugin.motion_gate.stats()}")
+            print(f"Camera: {self.camera.stats()}")
+            self.metrics.export()
+            self.camera.release()
+
+
+def main():
+    # entry point for the shared vision host
+    # main.js stops hosts with SIGTERM - handle it like Ctrl+C so the presence record and camera are released
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    vision_host = VisionHost()
+    vision_host.metrics.export_as(VisionHost.NAME)
+    vision_host.warm_up()
+    vision_host.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from backend.core.activity_history import ActivityHistory
+
+
+class TestActivityHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, 'activity_history.bin')
+        self.first_day = date(2024, 1, 1)
+        self.history = ActivityHistory(self.path, first_day=self.first_day)
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_mark_minutes(self):
+        self.history.mark(datetime(2024, 1, 1, 9, 0), datetime(2024, 1, 1, 10, 30))
+
+        self.assertEqual(self.history.total(date(2024, 1, 1), date(2024, 1, 2)), 90)
+
+    def test_partial_minutes_counted_once(self):
+        self.history.mark(datetime(2024, 1, 1, 9, 0, 10), datetime(2024, 1, 1, 9, 0, 50))
+        self.history.mark(datetime(2024, 1, 1, 9, 0, 50), datetime(2024, 1, 1, 9, 1, 20))
+
+        self.assertEqual(self.history.total(date(2024, 1, 1), date(2024, 1, 2)), 2)
+
+    def test_mark_across_midnight(self):
+        self.history.mark(datetime(2024, 1, 1, 23, 30), datetime(2024, 1, 2, 0, 15))
+
+        totals = self.history.daily_totals(date(2024, 1, 1), date(2024, 1, 3))
+        self.assertEqual(totals.tolist(), [30, 15])
+
+    def test_weekly_totals(self):
+        # 2024-01-01 is a Monday
+        for day in range(14):
+            start = datetime(2024, 1, 1, 12, 0) + timedelta(days=day)
+            self.history.mark(start, start + timedelta(minutes=10))
+
+        weekly = self.history.weekly_totals(date(2024, 1, 3), date(2024, 1, 15))
+
+        self.assertEqual(weekly, {date(2024, 1, 1): 50, date(2024, 1, 8): 70})
+
+    def test_hour_of_day(self):
+        for day in range(3):
+            start = datetime(2024, 1, 1, 21, 45) + timedelta(days=day)
+            self.history.mark(start, start + timedelta(minutes=30))
+
+        hours = self.history.hour_of_day(date(2024, 1, 1), date(2024, 1, 4))
+
+        self.assertEqual(hours[21], 45)
+        self.assertEqual(hours[22], 45)
+        self.assertEqual(hours.sum(), 90)
+
+    def test_ranges_outside_file_are_empty(self):
+        self.history.mark(datetime(2024, 1, 1, 9, 0), datetime(2024, 1, 1, 10, 0))
+
+        self.assertEqual(self.history.total(date(2023, 12, 1), date(2024, 3, 1)), 60)
+        self.assertEqual(self.history.daily_totals(date(2030, 1, 1), date(2030, 1, 3)).tolist(), [0, 0])
+
+    def test_reopened_history(self):
+        self.history.mark(datetime(2024, 2, 1, 9, 0), datetime(2024, 2, 1, 9, 20))
+        self.history.close()
+
+        history = ActivityHistory(self.path)
+        self.assertEqual(history.first_day, self.first_day)
+        self.assertEqual(history.total(date(2024, 2, 1), date(2024, 2, 2)), 20)
+        history.close()
+
+    def test_year_is_small_and_fast(self):
+        rng = np.random.default_rng(0)
+        for day in range(366):
+            start = datetime(2024, 1, 1, 8, 0) + timedelta(days=day, minutes=int(rng.integers(0, 120)))
+            self.history.mark(start, start + timedelta(hours=4))
+
+        self.assertLess(os.path.getsize(self.path), 100 * 1024)
+
+        started = time.perf_counter()
+        self.history.daily_totals(date(2024, 1, 1), date(2025, 1, 1))
+        self.history.weekly_totals(date(2024, 1, 1), date(2025, 1, 1))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(self.history.total(date(2024, 1, 1), date(2025, 1, 1)), 366 * 4 * 60)
+        self.assertLess(elapsed, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
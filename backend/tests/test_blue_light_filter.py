@@ -101,11 +101,22 @@ class TestBlueLightFilter(unittest.TestCase):
         ]
 
         self.blue_light.apply_filter("evening", 50)
+        self.blue_light.notifier.flush()
 
         calls = [call[0][0] for call in mock_run.call_args_list]
         self.assertIn(["nightlight", "on"], calls)
         self.assertIn(["nightlight", "temp", "50"], calls)
 
+    def test_reconfigure_current_period_only(self):
+        self.blue_light.current_period = "evening"
+        self.blue_light.apply_filter = MagicMock()
+
+        self.assertEqual(self.blue_light.reconfigure({"blue_light_filter_night": 90}), self.blue_light.CHECK_INTERVAL)
+        self.blue_light.apply_filter.assert_not_called()
+
+        self.blue_light.reconfigure({"blue_light_filter_evening": 40})
+        self.blue_light.apply_filter.assert_called_once_with("evening", 40)
+
     def test_get_setting_for_day(self):
         with patch.object(self.blue_light.settings, 'get', return_value=20):
             value = self.blue_light.settings.get("blue_light_filter_day", 0)
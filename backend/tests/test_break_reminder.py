@@ -1,7 +1,12 @@
+import os
+import shutil
+import tempfile
+import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 from backend.features.break_reminders import BreakReminders
 from backend.core.notification_manager import NotificationManager
+from backend.core.presence_channel import PresenceChannel
 
 
 class TestBreakReminders(unittest.TestCase):
@@ -9,6 +14,12 @@ class TestBreakReminders(unittest.TestCase):
         NotificationManager._instance = None
         self.break_reminders = BreakReminders()
 
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        self.presence = PresenceChannel(os.path.join(self.test_dir, 'presence.bin'))
+        self.addCleanup(self.presence.close)
+        self.break_reminders.presence = self.presence
+
     def test_init(self):
         self.assertIsInstance(self.break_reminders.notifier, NotificationManager)
         self.assertEqual(self.break_reminders.BREAK_INTERVAL, 20 * 60)
@@ -28,8 +39,56 @@ class TestBreakReminders(unittest.TestCase):
 
         self.break_reminders.monitor()
 
+        self.break_reminders.notifier.flush()
         self.assertEqual(mock_subprocess.call_count, 1)
 
 
+class TestBreakRemindersPresence(unittest.TestCase):
+    def setUp(self):
+        NotificationManager._instance = None
+        self.break_reminders = BreakReminders()
+        self.break_reminders.notifier = MagicMock()
+
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        self.presence = PresenceChannel(os.path.join(self.test_dir, 'presence.bin'))
+        self.addCleanup(self.presence.close)
+        self.break_reminders.presence = self.presence
+
+    def tearDown(self):
+        NotificationManager._instance = None
+
+    def test_reminds_without_vision_features(self):
+        self.assertEqual(self.break_reminders.check(), BreakReminders.BREAK_INTERVAL)
+        self.break_reminders.notifier.send.assert_called_once()
+
+    def test_paused_while_away(self):
+        now = time.time()
+        self.presence.publish(False, now - PresenceChannel.ABSENT_AFTER - 1)
+        self.presence.publish(False, now)
+
+        self.assertEqual(self.break_reminders.check(), BreakReminders.AWAY_CHECK_INTERVAL)
+        self.break_reminders.notifier.send.assert_not_called()
+
+    def test_interval_restarts_after_a_break(self):
+        now = time.time()
+        self.presence.publish(True, now - 5 * 60)
+        self.presence.publish(True, now)
+
+        delay = self.break_reminders.check()
+
+        self.break_reminders.notifier.send.assert_not_called()
+        self.assertAlmostEqual(delay, BreakReminders.BREAK_INTERVAL - 5 * 60, delta=5)
+
+    def test_reminds_after_interval_at_desk(self):
+        now = time.time()
+        self.presence.publish(True, now - BreakReminders.BREAK_INTERVAL - 1)
+        for seconds_ago in range(BreakReminders.BREAK_INTERVAL, -1, -10):
+            self.presence.publish(True, now - seconds_ago)
+
+        self.assertEqual(self.break_reminders.check(), BreakReminders.BREAK_INTERVAL)
+        self.break_reminders.notifier.send.assert_called_once()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import os
+import tempfile
+import shutil
+import numpy as np
+import cv2
+
+from backend.core.calibration_cache import CalibrationCache, image_size
+
+
+class TestImageSize(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_png_size_from_header(self):
+        path = os.path.join(self.test_dir, 'image.png')
+        cv2.imwrite(path, np.zeros((480, 640, 3), dtype=np.uint8))
+
+        self.assertEqual(image_size(path), (640, 480))
+
+    def test_other_formats_decoded(self):
+        path = os.path.join(self.test_dir, 'image.jpg')
+        cv2.imwrite(path, np.zeros((120, 160, 3), dtype=np.uint8))
+
+        self.assertEqual(image_size(path), (160, 120))
+
+    def test_missing_or_invalid_image(self):
+        path = os.path.join(self.test_dir, 'broken.png')
+        with open(path, 'wb') as f:
+            f.write(b'not an image')
+
+        self.assertIsNone(image_size(path))
+        self.assertIsNone(image_size(os.path.join(self.test_dir, 'missing.png')))
+
+
+class TestCalibrationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.image_path = os.path.join(self.test_dir, 'calibrate.png')
+        cv2.imwrite(self.image_path, np.zeros((480, 640, 3), dtype=np.uint8))
+        self.cache = CalibrationCache(os.path.join(self.test_dir, 'calibration_cache.json'))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_empty_cache(self):
+        self.assertIsNone(self.cache.get('distance_check', self.image_path, 'model.onnx'))
+
+    def test_result_reused_for_same_image(self):
+        self.cache.put('distance_check', self.image_path, 'model.onnx', area=1234.5)
+
+        entry = self.cache.get('distance_check', self.image_path, 'model.onnx')
+
+        self.assertEqual(entry['area'], 1234.5)
+        self.assertEqual((entry['width'], entry['height']), (640, 480))
+
+    def test_changed_image_invalidates_result(self):
+        self.cache.put('distance_check', self.image_path, 'model.onnx', area=1234.5)
+        cv2.imwrite(self.image_path, np.full((480, 640, 3), 255, dtype=np.uint8))
+
+        self.assertIsNone(self.cache.get('distance_check', self.image_path, 'model.onnx'))
+
+    def test_other_model_invalidates_result(self):
+        self.cache.put('distance_check', self.image_path, 'model.onnx', area=1234.5)
+
+        self.assertIsNone(self.cache.get('distance_check', self.image_path, 'model.int8_static.onnx'))
+
+    def test_features_cached_separately(self):
+        self.cache.put('distance_check', self.image_path, 'pose.onnx', area=1234.5)
+        self.cache.put('eye_strain_prevention', self.image_path, 'eyes.onnx', ratios=[2.0, 2.1])
+
+        self.assertEqual(self.cache.get('distance_check', self.image_path, 'pose.onnx')['area'], 1234.5)
+        self.assertEqual(self.cache.get('eye_strain_prevention', self.image_path, 'eyes.onnx')['ratios'], [2.0, 2.1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,9 @@ import numpy as np
 import cv2
 from unittest.mock import patch, MagicMock
 import os
-from backend.core.camera_manager import CameraManager
+import threading
+import time
+from backend.core.camera_manager import CameraManager, FrameGrabber
 from backend.core.notification_manager import NotificationManager
 
 
@@ -36,6 +38,7 @@ class TestCameraManager(unittest.TestCase):
     def test_open_success(self, mock_video_capture):
         mock_cap = MagicMock()
         mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (True, np.zeros((480, 640, 3), dtype=np.uint8))
         mock_video_capture.return_value = mock_cap
 
         result = self.camera.open(self.test_image_path)
@@ -56,6 +59,7 @@ class TestCameraManager(unittest.TestCase):
 
         self.assertFalse(result)
         self.assertFalse(self.camera.is_open)
+        self.camera.notifier.flush()
         self.assertEqual(mock_subprocess.call_count, 1)
 
     def test_read_without_opening(self):
@@ -77,12 +81,14 @@ class TestCameraManager(unittest.TestCase):
 
         self.assertTrue(success)
         self.assertIsNotNone(frame)
-        mock_cap.read.assert_called_once()
+        # the first frame and the settling ones are read while opening
+        self.assertEqual(mock_cap.read.call_count, CameraManager.SETTLE_FRAMES + 2)
 
     @patch('cv2.VideoCapture')
     def test_release(self, mock_video_capture):
         mock_cap = MagicMock()
         mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (True, np.zeros((480, 640, 3), dtype=np.uint8))
         mock_video_capture.return_value = mock_cap
 
         self.camera.open(self.test_image_path)
@@ -94,6 +100,267 @@ class TestCameraManager(unittest.TestCase):
         mock_cap.release.assert_called_once()
 
 
+class TestCameraManagerDutyCycle(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        self.test_image_path = os.path.join(self.test_dir, 'test_image.png')
+        cv2.imwrite(self.test_image_path, np.zeros((480, 640, 3), dtype=np.uint8))
+
+        NotificationManager._instance = None
+        self.camera = CameraManager()
+
+    def _mock_capture(self, mock_video_capture, fps_supported=True):
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (True, np.zeros((480, 640, 3), dtype=np.uint8))
+        mock_cap.get.return_value = 30.0
+        mock_cap.set.side_effect = lambda prop, value: prop != cv2.CAP_PROP_FPS or fps_supported
+        mock_video_capture.return_value = mock_cap
+        return mock_cap
+
+    @patch('cv2.VideoCapture')
+    def test_released_and_reopened_when_cheap(self, mock_video_capture):
+        mock_cap = self._mock_capture(mock_video_capture)
+        self.camera.open(self.test_image_path)
+
+        self.assertEqual(self.camera.pause(60), "release")
+        self.assertFalse(self.camera.is_open)
+        mock_cap.release.assert_called_once()
+
+        ret, _ = self.camera.read()
+
+        self.assertTrue(ret)
+        self.assertEqual(mock_video_capture.call_count, 2)
+        self.assertEqual(self.camera.stats()["device_opens"], 2)
+
+    @patch('cv2.VideoCapture')
+    def test_low_rate_when_reopening_is_slow(self, mock_video_capture):
+        mock_cap = self._mock_capture(mock_video_capture)
+        self.camera.open(self.test_image_path)
+        self.camera.policy.open_latencies.append(3.0)
+
+        self.assertEqual(self.camera.pause(5), "low_rate")
+        mock_cap.set.assert_called_with(cv2.CAP_PROP_FPS, 1)
+
+        self.camera.read()
+
+        mock_cap.set.assert_called_with(cv2.CAP_PROP_FPS, 30.0)
+        mock_cap.release.assert_not_called()
+
+    @patch('cv2.VideoCapture')
+    def test_frame_rate_changed_on_grabber_thread(self, mock_video_capture):
+        mock_cap = self._mock_capture(mock_video_capture)
+        threads = []
+        mock_cap.set.side_effect = lambda prop, value: threads.append(threading.current_thread()) or True
+        camera = CameraManager(background=True)
+        camera.open(self.test_image_path)
+        camera.policy.open_latencies.append(3.0)
+        try:
+            self.assertEqual(camera.pause(5), "low_rate")
+            camera.read()
+        finally:
+            camera.release()
+
+        # the two size requests before the grabber started, then the rate changes from inside its loop
+        self.assertEqual(len(threads), 4)
+        self.assertNotIn(threading.current_thread(), threads[2:])
+
+    @patch('cv2.VideoCapture')
+    def test_open_latency_includes_first_frame(self, mock_video_capture):
+        mock_cap = self._mock_capture(mock_video_capture)
+        reads = [(False, None)] * 10 + [(True, np.zeros((480, 640, 3), dtype=np.uint8))] * 20
+        mock_cap.read.side_effect = lambda image=None: reads.pop(0)
+
+        self.camera.open(self.test_image_path)
+
+        # 10 empty reads with a short sleep each, then the first frame and the settling ones
+        self.assertGreaterEqual(self.camera.policy.open_latencies[0], 0.1)
+        self.assertEqual(len(reads), 20 - CameraManager.SETTLE_FRAMES - 1)
+
+    @patch('cv2.VideoCapture')
+    def test_hold_when_frame_rate_is_fixed(self, mock_video_capture):
+        self._mock_capture(mock_video_capture, fps_supported=False)
+        self.camera.open(self.test_image_path)
+        self.camera.policy.open_latencies.append(3.0)
+
+        self.assertEqual(self.camera.pause(5), "hold")
+        self.assertFalse(self.camera.policy.low_rate_supported)
+        self.assertIsNone(self.camera.paused_mode)
+
+    @patch('cv2.VideoCapture')
+    def test_release_while_paused_does_not_reopen(self, mock_video_capture):
+        self._mock_capture(mock_video_capture)
+        self.camera.open(self.test_image_path)
+        self.camera.pause(60)
+
+        self.camera.release()
+
+        self.assertEqual(self.camera.read(), (False, None))
+        self.assertEqual(mock_video_capture.call_count, 1)
+
+    @patch('cv2.VideoCapture')
+    def test_held_time_counted(self, mock_video_capture):
+        self._mock_capture(mock_video_capture)
+        self.camera.open(self.test_image_path)
+        time.sleep(0.05)
+        self.camera.release()
+        time.sleep(0.05)
+
+        self.assertAlmostEqual(self.camera.stats()["held_seconds"], 0.05, delta=0.04)
+
+
+class TestCameraManagerRecorded(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        self.test_image_path = os.path.join(self.test_dir, 'test_image.png')
+        cv2.imwrite(self.test_image_path, np.zeros((480, 640, 3), dtype=np.uint8))
+
+        NotificationManager._instance = None
+        self.frames = [np.full((48, 64, 3), value, dtype=np.uint8) for value in range(200)]
+
+    @patch('cv2.VideoCapture')
+    def test_reads_recorded_frames_without_camera(self, mock_video_capture):
+        camera = CameraManager(source=self.frames, realtime=False)
+
+        self.assertTrue(camera.open(self.test_image_path))
+        ret, frame = camera.read()
+
+        self.assertTrue(ret)
+        self.assertEqual(frame[0, 0, 0], 0)
+        mock_video_capture.assert_not_called()
+        self.assertEqual(camera.pause(60), "hold")
+
+    def test_fast_playback_wait_skips_instead_of_sleeping(self):
+        camera = CameraManager(source=self.frames, realtime=False)
+        camera.open(self.test_image_path)
+        camera.read()
+
+        with patch('backend.core.camera_manager.time.sleep') as mock_sleep:
+            camera.wait(5)
+
+        mock_sleep.assert_not_called()
+        # 5 seconds at the default 30 fps after the first frame
+        self.assertEqual(camera.read()[1][0, 0, 0], 150)
+
+    def test_realtime_wait_ends_on_wake(self):
+        camera = CameraManager(source=self.frames, realtime=True)
+        camera.open(self.test_image_path)
+        wake = threading.Event()
+        wake.set()
+
+        started = time.monotonic()
+        camera.wait(5, wake)
+
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_read_burst_copies_frames(self):
+        camera = CameraManager(source=self.frames, realtime=False)
+        camera.open(self.test_image_path)
+
+        # 0.1 seconds apart at the default 30 fps
+        frames = camera.read_burst(4, 0.1)
+
+        self.assertEqual([frame[0, 0, 0] for frame in frames], [0, 3, 6, 9])
+        self.assertEqual(len({id(frame) for frame in frames}), 4)
+
+    @patch('subprocess.run')
+    def test_open_fails_for_missing_recording(self, mock_subprocess):
+        camera = CameraManager(source=os.path.join(self.test_dir, 'missing.mp4'))
+
+        self.assertFalse(camera.open(self.test_image_path))
+        self.assertFalse(camera.is_open)
+        camera.notifier.flush()
+        self.assertEqual(mock_subprocess.call_count, 1)
+
+
+class TestCameraManagerBackground(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.test_image_path = os.path.join(self.test_dir, 'test_image.png')
+        cv2.imwrite(self.test_image_path, np.zeros((480, 640, 3), dtype=np.uint8))
+
+        NotificationManager._instance = None
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    @patch('cv2.VideoCapture')
+    def test_read_returns_newest_frame(self, mock_video_capture):
+        # frames read while the device settles, then 5 for the grabber
+        frames = [np.zeros((480, 640, 3), dtype=np.uint8)] * (CameraManager.SETTLE_FRAMES + 1)
+        frames += [np.full((480, 640, 3), value, dtype=np.uint8) for value in range(5)]
+        frames_read = threading.Event()
+
+        def read_frame(image=None):
+            if frames:
+                return True, frames.pop(0)
+            frames_read.set()
+            time.sleep(0.01)
+            return False, None
+
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.side_effect = read_frame
+        mock_video_capture.return_value = mock_cap
+
+        camera = CameraManager(background=True)
+        camera.open(self.test_image_path)
+        try:
+            self.assertTrue(frames_read.wait(2))
+
+            success, frame = camera.read()
+
+            self.assertTrue(success)
+            self.assertEqual(int(frame[0, 0, 0]), 4)
+            self.assertEqual(camera.dropped_frames, 4)
+            self.assertGreater(camera.frame_timestamp, 0)
+        finally:
+            camera.release()
+
+        self.assertIsNone(camera.grabber)
+        mock_cap.release.assert_called_once()
+
+    def test_grabber_read_without_frames(self):
+        mock_cap = MagicMock()
+        mock_cap.read.return_value = (False, None)
+
+        grabber = FrameGrabber(mock_cap)
+        grabber.FIRST_FRAME_TIMEOUT = 0.05
+
+        self.assertEqual(grabber.read(), (False, None))
+
+    def test_grabber_reuses_buffers_without_overwriting_read_frame(self):
+        count = [0]
+        allocated = []
+
+        def read_frame(image=None):
+            if image is None:
+                image = np.empty((48, 64, 3), dtype=np.uint8)
+                allocated.append(image)
+            count[0] += 1
+            image[:] = count[0] % 256
+            time.sleep(0.001)
+            return True, image
+
+        mock_cap = MagicMock()
+        mock_cap.read.side_effect = read_frame
+        grabber = FrameGrabber(mock_cap)
+        grabber.start()
+        try:
+            _, frame = grabber.read()
+            value = int(frame[0, 0, 0])
+            time.sleep(0.05)
+
+            # the grabber kept reading, but never into the frame handed out
+            self.assertGreater(count[0], 10)
+            self.assertTrue((frame == value).all())
+            self.assertLessEqual(len(allocated), FrameGrabber.BUFFER_COUNT)
+        finally:
+            grabber.stop()
+
+
 class TestCameraManagerIntegration(unittest.TestCase):
     def setUp(self):
         self.test_dir = tempfile.mkdtemp()
@@ -113,6 +380,7 @@ class TestCameraManagerIntegration(unittest.TestCase):
         with patch('cv2.VideoCapture') as mock_capture:
             mock_cap = MagicMock()
             mock_cap.isOpened.return_value = True
+            mock_cap.read.return_value = (True, img)
             mock_capture.return_value = mock_cap
 
             camera.open(test_image)
@@ -0,0 +1,56 @@
+import unittest
+
+from backend.core.camera_policy import CameraDutyCycle
+
+
+class TestCameraDutyCycle(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = CameraDutyCycle()
+
+    def test_default_cost_before_measurements(self):
+        self.assertEqual(self.policy.reopen_cost(), CameraDutyCycle.DEFAULT_REOPEN_COST)
+
+    def test_release_when_reopening_is_cheap(self):
+        self.policy.record_open(0.2)
+        self.policy.record_close(0.05)
+
+        self.assertEqual(self.policy.decide(5), CameraDutyCycle.RELEASE)
+
+    def test_never_release_when_not_allowed(self):
+        self.policy.record_open(0.2)
+
+        self.assertEqual(self.policy.decide(60, can_release=False), CameraDutyCycle.LOW_RATE)
+        self.assertEqual(self.policy.decide(1, can_release=False), CameraDutyCycle.HOLD)
+
+    def test_low_rate_when_reopening_is_slow(self):
+        self.policy.record_open(2.0)
+
+        self.assertEqual(self.policy.decide(5), CameraDutyCycle.LOW_RATE)
+
+    def test_hold_for_short_intervals(self):
+        self.policy.record_open(2.0)
+
+        self.assertEqual(self.policy.decide(1), CameraDutyCycle.HOLD)
+
+    def test_hold_without_low_rate_support(self):
+        self.policy.record_open(2.0)
+        self.policy.low_rate_supported = False
+
+        self.assertEqual(self.policy.decide(5), CameraDutyCycle.HOLD)
+
+    def test_stats(self):
+        self.policy.record_open(0.5)
+        self.policy.record_open(1.5)
+        self.policy.record_close(0.1)
+        self.policy.decide(60)
+
+        stats = self.policy.stats()
+        self.assertAlmostEqual(stats["open_ms"]["mean"], 1000)
+        self.assertAlmostEqual(stats["open_ms"]["max"], 1500)
+        self.assertAlmostEqual(stats["reopen_cost_s"], 1.1)
+        self.assertEqual(stats["decisions"][CameraDutyCycle.RELEASE], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
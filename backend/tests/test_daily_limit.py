@@ -3,12 +3,14 @@ import json
 import os
 import tempfile
 import shutil
+import time
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
 from backend.features.daily_limit import DailyLimit
 from backend.core.settings_manager import SettingsManager
 from backend.core.notification_manager import NotificationManager
+from backend.core.presence_channel import PresenceChannel
 
 
 class TestDailyLimit(unittest.TestCase):
@@ -88,6 +90,119 @@ class TestDailyLimit(unittest.TestCase):
             data = json.load(f)
             self.assertIn('seconds_used', data)
 
+    def test_alerts_follow_remaining_budget(self):
+        self.daily_limit.notifier = MagicMock()
+        now = [datetime(2024, 5, 1, 9, 0)]
+
+        with patch('backend.features.daily_limit.datetime') as mock_datetime:
+            mock_datetime.now.side_effect = lambda: now[0]
+            mock_datetime.fromisoformat = datetime.fromisoformat
+
+            delay = self.daily_limit.start()
+            while now[0] < datetime(2024, 5, 1, 16, 0):
+                now[0] += timedelta(seconds=delay)
+                delay = self.daily_limit.check()
+
+        titles = [call.args[0] for call in self.daily_limit.notifier.send.call_args_list]
+        self.assertEqual(titles.count("Screen Time Alert"), 6)
+        self.assertEqual(titles.count("Daily Limit Reached"), 1)
+        self.assertEqual(titles.count("Over Daily Limit"), 6)
+        self.daily_limit.notifier.send.assert_any_call(
+            "Screen Time Alert", "You have 2 hour(s) of screen time left today"
+        )
+        self.assertLess(self.daily_limit.wakeups, 7 * 60 // 10)
+
+    def test_check_appends_to_journal(self):
+        self.daily_limit.start()
+        self.daily_limit.session_start -= timedelta(seconds=120)
+
+        self.daily_limit.check()
+        self.daily_limit.check()
+
+        self.assertFalse(os.path.exists(self.daily_limit.USAGE_DATA_FILE))
+        self.assertEqual(self.daily_limit.journal.records, 2)
+
+    def test_usage_survives_unclean_stop(self):
+        self.daily_limit.start()
+        self.daily_limit.session_start -= timedelta(seconds=600)
+        self.daily_limit.check()
+        self.daily_limit.journal.close()
+
+        # a new process replays the journal on top of the last snapshot
+        with patch('backend.features.daily_limit.SettingsManager', return_value=self.mock_settings_instance):
+            restarted = DailyLimit()
+
+        self.assertGreaterEqual(restarted.load_usage_data()['seconds_used'], 600)
+
+    def test_stop_compacts_journal(self):
+        self.daily_limit.start()
+        self.daily_limit.session_start -= timedelta(seconds=300)
+        self.daily_limit.check()
+
+        self.daily_limit.stop()
+
+        self.assertEqual(self.daily_limit.journal.records, 0)
+        with open(self.daily_limit.USAGE_DATA_FILE, 'r') as f:
+            data = json.load(f)
+        self.assertGreaterEqual(data['seconds_used'], 300)
+        self.assertEqual(self.daily_limit.load_usage_data()['seconds_used'], data['seconds_used'])
+
+    def test_check_records_activity_history(self):
+        self.daily_limit.start()
+        self.daily_limit.session_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        self.daily_limit.check()
+
+        today = datetime.now().date()
+        minutes = self.daily_limit.history.total(today, today + timedelta(days=1))
+        self.assertGreaterEqual(minutes, datetime.now().hour * 60 + datetime.now().minute)
+
+    def test_time_away_not_counted(self):
+        self.daily_limit.start()
+        self.daily_limit.session_start -= timedelta(seconds=600)
+
+        publisher = PresenceChannel(self.daily_limit.presence.path)
+        self.addCleanup(publisher.close)
+        now = time.time()
+        for seconds_ago in range(240, -1, -30):
+            publisher.publish(False, now - seconds_ago)
+
+        self.daily_limit.check()
+
+        self.assertAlmostEqual(self.daily_limit.usage_data['seconds_used'], 600 - 240, delta=2)
+
+    def test_time_away_not_marked_in_history(self):
+        self.daily_limit.start()
+        self.daily_limit.session_start -= timedelta(seconds=600)
+
+        # present, away from 8 to 4 minutes ago, then back
+        publisher = PresenceChannel(self.daily_limit.presence.path)
+        self.addCleanup(publisher.close)
+        now = time.time()
+        publisher.publish(True, now - 600)
+        for seconds_ago in range(480, 239, -30):
+            publisher.publish(False, now - seconds_ago)
+        for seconds_ago in range(210, -1, -30):
+            publisher.publish(True, now - seconds_ago)
+
+        with patch.object(self.daily_limit.history, 'mark') as mark:
+            self.daily_limit.check()
+
+        marked = sum((end - start).total_seconds() for (start, end), _ in mark.call_args_list)
+        self.assertAlmostEqual(marked, self.daily_limit.usage_data['seconds_used'], delta=1)
+        (first_start, first_end), _ = mark.call_args_list[0]
+        (last_start, last_end), _ = mark.call_args_list[-1]
+        self.assertAlmostEqual((first_end - first_start).total_seconds(), 120, delta=2)
+        self.assertAlmostEqual(last_start.timestamp(), now - 210, delta=2)
+
+    def test_present_intervals_while_still_away(self):
+        now = datetime.now()
+        self.daily_limit.session_start = now - timedelta(seconds=600)
+
+        intervals = self.daily_limit._present_intervals(now, 200)
+
+        self.assertEqual(intervals, [(now - timedelta(seconds=600), now - timedelta(seconds=400))])
+
     def test_usage_file_path(self):
         expected_path = os.path.join(self.test_dir, 'daily_usage.json')
         self.assertEqual(self.daily_limit.USAGE_DATA_FILE, expected_path)
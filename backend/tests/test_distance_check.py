@@ -1,6 +1,16 @@
 import unittest
-from unittest.mock import patch
+import os
+import tempfile
+import shutil
+import numpy as np
+import cv2
+from unittest.mock import patch, MagicMock
 from backend.features.distance_check import DistanceCheck
+from backend.core.inference_engine import Detections, empty_detections
+from backend.core.calibration_cache import CalibrationCache
+from backend.core.camera_manager import CameraManager
+from backend.core.metrics import Metrics
+from backend.core.streaming_stats import SignalSmoother
 
 
 class TestDistanceCheck(unittest.TestCase):
@@ -12,18 +22,17 @@ class TestDistanceCheck(unittest.TestCase):
         self.assertEqual(self.distance_check.DISTANCE_THRESHOLD, 1.2)
 
     def test_check_distance_healthy(self):
-        from collections import deque
-
         healthy_area = 1000.0
         current_area = 900.0  # less than 1.2 * healthy_area
 
-        area_history = deque([current_area], maxlen=5)
+        area_filter = SignalSmoother()
+        area_filter.update(current_area / healthy_area)
         mock_keypoints = [[290, 330, 1.0], [320, 300, 1.0], [260, 300, 1.0]]
 
         new_state, last_alert = self.distance_check._check_distance(
             mock_keypoints,
             healthy_area,
-            area_history,
+            area_filter,
             "Healthy distance",
             0
         )
@@ -32,25 +41,170 @@ class TestDistanceCheck(unittest.TestCase):
 
     @patch('subprocess.run')
     def test_check_distance_too_close(self, mock_subprocess):
-        from collections import deque
-
         healthy_area = 1000.0
         current_area = 1300.0  # greater than 1.2 * healthy_area
 
-        area_history = deque([current_area], maxlen=5)
+        area_filter = SignalSmoother()
+        area_filter.update(current_area / healthy_area)
         mock_keypoints = [[290, 330, 1.0], [330, 290, 1.0], [250, 290, 1.0]]
 
         new_state, last_alert = self.distance_check._check_distance(
             mock_keypoints,
             healthy_area,
-            area_history,
+            area_filter,
             "Healthy distance",
             0
         )
 
         self.assertEqual(new_state, "Too close")
+        self.distance_check.notifier.flush()
+        self.assertEqual(mock_subprocess.call_count, 1)
+
+    def test_process_frame_reuses_detection_for_static_scene(self):
+        self.distance_check.model = MagicMock()
+        self.distance_check.model.predict.return_value = empty_detections((17, 3))
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        self.distance_check.process_frame(frame)
+        self.distance_check.process_frame(frame)
+
+        self.distance_check.model.predict.assert_called_once()
+        self.assertEqual(self.distance_check.motion_gate.hits, 1)
+
+    def test_process_frame_records_stage_metrics(self):
+        Metrics._instance = None
+        self.addCleanup(setattr, Metrics, "_instance", None)
+        self.distance_check.metrics = Metrics()
+        self.distance_check.model = MagicMock()
+        self.distance_check.model.predict.return_value = empty_detections((17, 3))
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        self.distance_check.process_frame(frame)
+        self.distance_check.process_frame(frame)
+
+        metrics = self.distance_check.metrics
+        self.assertEqual(metrics.counters[("distance_check", "inferences")], 1)
+        self.assertEqual(metrics.counters[("distance_check", "inferences_skipped")], 1)
+        self.assertEqual(metrics.histograms[("distance_check", "predict")].count, 1)
+        self.assertEqual(metrics.histograms[("distance_check", "frame")].count, 2)
+
+    @patch('backend.core.settings_manager.SettingsManager.set')
+    def test_calibration_reused_for_unchanged_image(self, mock_set):
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        image_path = os.path.join(test_dir, 'calibrate_distance.png')
+        cv2.imwrite(image_path, np.zeros((480, 640, 3), dtype=np.uint8))
+
+        keypoints = np.zeros((1, 17, 3), dtype=np.float32)
+        keypoints[0, :3, :2] = [[50, 80], [40, 60], [60, 60]]
+        self.distance_check.CALIBRATION_IMAGE = image_path
+        self.distance_check.calibration_cache = CalibrationCache(os.path.join(test_dir, 'calibration_cache.json'))
+        self.distance_check.model = MagicMock()
+        self.distance_check.model.predict.return_value = Detections(
+            np.zeros((1, 4), dtype=np.float32), np.ones(1, dtype=np.float32), np.zeros(1, dtype=np.int64), keypoints
+        )
+
+        self.assertTrue(self.distance_check.calibrate())
+        self.assertTrue(self.distance_check.calibrate())
+
+        self.distance_check.model.predict.assert_called_once()
+        mock_set.assert_called_with("distance_check_area", 200)
+
+    @patch('backend.core.settings_manager.SettingsManager.set')
+    def test_ensure_calibrated_recalibrates_after_image_changes(self, mock_set):
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        image_path = os.path.join(test_dir, 'calibrate_distance.png')
+        cv2.imwrite(image_path, np.zeros((480, 640, 3), dtype=np.uint8))
+
+        keypoints = np.zeros((1, 17, 3), dtype=np.float32)
+        keypoints[0, :3, :2] = [[50, 80], [40, 60], [60, 60]]
+        self.distance_check.CALIBRATION_IMAGE = image_path
+        self.distance_check.calibration_cache = CalibrationCache(os.path.join(test_dir, 'calibration_cache.json'))
+        self.distance_check.model = MagicMock()
+        self.distance_check.model.predict.return_value = Detections(
+            np.zeros((1, 4), dtype=np.float32), np.ones(1, dtype=np.float32), np.zeros(1, dtype=np.int64), keypoints
+        )
+        self.assertTrue(self.distance_check.calibrate())
+
+        stored = {"distance_check_area": 200}
+        with patch.object(self.distance_check.settings, 'get', side_effect=lambda key, default=None:
+                          stored.get(key, default)):
+            # unchanged image - the stored area is kept without inference
+            self.assertTrue(self.distance_check.ensure_calibrated())
+            self.distance_check.model.predict.assert_called_once()
+
+            # a recaptured image replaces the stored area
+            cv2.imwrite(image_path, np.full((480, 640, 3), 255, dtype=np.uint8))
+            self.assertTrue(self.distance_check.ensure_calibrated())
+            self.assertEqual(self.distance_check.model.predict.call_count, 2)
+
+
+class TestDistanceCheckBurstCalibration(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        image_path = os.path.join(self.test_dir, 'calibrate_distance.png')
+        cv2.imwrite(image_path, np.zeros((48, 64, 3), dtype=np.uint8))
+
+        self.distance_check = DistanceCheck()
+        self.distance_check.CALIBRATION_IMAGE = image_path
+        frames = [np.zeros((48, 64, 3), dtype=np.uint8) for _ in range(300)]
+        self.distance_check.camera = CameraManager(source=frames, realtime=False)
+        self.distance_check.model = MagicMock()
+
+    @staticmethod
+    def face(scale):
+        # a face whose nose and eyes span an area of 200 * scale ** 2
+        keypoints = np.zeros((1, 17, 3), dtype=np.float32)
+        keypoints[0, :3, :2] = np.array([[50, 80], [40, 60], [60, 60]]) * scale
+        return Detections(np.zeros((1, 4), dtype=np.float32), np.ones(1, dtype=np.float32),
+                          np.zeros(1, dtype=np.int64), keypoints)
+
+    @patch('backend.core.settings_manager.SettingsManager.update')
+    def test_median_of_burst_ignores_blink_and_head_tilt(self, mock_update):
+        scales = [1.0, 1.01, 0.99, 1.0, 1.02, 0.98, 1.0, 1.5]  # the last frame leans in
+        self.distance_check.model.predict_batch.return_value = (
+            [self.face(scale) for scale in scales] + [empty_detections((17, 3))] * 2  # a blink and a turn away
+        )
+
+        self.assertTrue(self.distance_check.calibrate_burst(10))
+
+        frames = self.distance_check.model.predict_batch.call_args[0][0]
+        self.assertEqual(len(frames), 10)
+        changes = mock_update.call_args[0][0]
+        self.assertEqual(changes["distance_check_area"], 200)
+        # the leaning frame alone would put the variance of all eight above 6000
+        self.assertLess(changes["distance_check_area_variance"], 20)
+        report = self.distance_check.calibration_report
+        self.assertEqual((report["frames"], report["usable_frames"]), (10, 8))
+        self.assertLess(report["relative_spread"], 0.03)
+        self.assertGreater(report["frames_per_second"], 0)
+        self.assertFalse(self.distance_check.camera.is_open)
+
+    @patch('subprocess.run')
+    @patch('backend.core.settings_manager.SettingsManager.update')
+    def test_fails_when_most_frames_have_no_single_face(self, mock_update, mock_subprocess):
+        self.distance_check.model.predict_batch.return_value = [self.face(1.0)] * 3 + [empty_detections((17, 3))] * 7
+
+        self.assertFalse(self.distance_check.calibrate_burst(10))
+
+        mock_update.assert_not_called()
+        self.distance_check.notifier.flush()
         self.assertEqual(mock_subprocess.call_count, 1)
 
+    @patch('backend.core.settings_manager.SettingsManager.update')
+    def test_calibrate_uses_burst_when_configured(self, mock_update):
+        self.distance_check.model.predict_batch.return_value = [self.face(1.0)] * 5
+        settings = self.distance_check.settings
+        with patch.object(settings, 'get', side_effect=lambda key, default=None:
+                          5 if key == 'calibration_burst_frames' else default):
+            self.assertTrue(self.distance_check.calibrate())
+
+        self.distance_check.model.predict.assert_not_called()
+        self.assertEqual(mock_update.call_args[0][0]["distance_check_area"], 200)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,16 @@
+import os
+import shutil
+import tempfile
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+import cv2
+import numpy as np
+
+from backend.core.calibration_cache import CalibrationCache
+from backend.core.camera_manager import CameraManager
+from backend.core.inference_engine import Detections
+from backend.core.streaming_stats import SignalSmoother
 from backend.features.eye_strain_prevention import EyeStrainPrevention
 
 
@@ -14,36 +24,37 @@ class TestDistanceCheck(unittest.TestCase):
 
     @patch('subprocess.run')
     def test_check_eye_strain(self, mock_subprocess):
-        from collections import deque
-
         relaxed_ratios = [1.8, 1.8]
 
-        ratio_history = [deque([2.1], maxlen=5), deque([2.1], maxlen=5)]
+        ratio_filters = [SignalSmoother(), SignalSmoother()]
+        for ratio_filter in ratio_filters:
+            ratio_filter.update(2.1 / 1.8)
 
         boxes = [[240, 285, 280, 300], [320, 285, 360, 300]]
         new_state, last_alert = self.eye_strain_prevention._check_tension(
             boxes,
             relaxed_ratios,
-            ratio_history,
+            ratio_filters,
             "Relaxed face",
             0
         )
 
         self.assertEqual(new_state, "Focused face")
+        self.eye_strain_prevention.notifier.flush()
         self.assertEqual(mock_subprocess.call_count, 1)
 
     def test_check_no_eye_strain(self):
-        from collections import deque
-
         relaxed_ratios = [1.8, 1.8]
 
-        ratio_history = [deque([1.8], maxlen=5), deque([1.8], maxlen=5)]
+        ratio_filters = [SignalSmoother(), SignalSmoother()]
+        for ratio_filter in ratio_filters:
+            ratio_filter.update(1.0)
 
         boxes = [[240, 275, 280, 305], [320, 275, 360, 305]]
         new_state, last_alert = self.eye_strain_prevention._check_tension(
             boxes,
             relaxed_ratios,
-            ratio_history,
+            ratio_filters,
             "Relaxed face",
             0
         )
@@ -51,5 +62,93 @@ class TestDistanceCheck(unittest.TestCase):
         self.assertEqual(new_state, "Relaxed face")
 
 
+class TestEyeStrainBurstCalibration(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        image_path = os.path.join(self.test_dir, 'relaxed_face.png')
+        cv2.imwrite(image_path, np.zeros((48, 64, 3), dtype=np.uint8))
+
+        self.eye_strain_prevention = EyeStrainPrevention()
+        self.eye_strain_prevention.RELAXED_IMAGE = image_path
+        frames = [np.zeros((48, 64, 3), dtype=np.uint8) for _ in range(300)]
+        self.eye_strain_prevention.camera = CameraManager(source=frames, realtime=False)
+        self.eye_strain_prevention.model = MagicMock()
+
+    @staticmethod
+    def eyes(*boxes):
+        return Detections(np.array(boxes, dtype=np.float32), np.ones(len(boxes), dtype=np.float32),
+                          np.zeros(len(boxes), dtype=np.int64))
+
+    @patch('backend.core.settings_manager.SettingsManager.set')
+    def test_ensure_calibrated_recalibrates_after_model_changes(self, mock_set):
+        self.eye_strain_prevention.calibration_cache = CalibrationCache(
+            os.path.join(self.test_dir, 'calibration_cache.json'))
+        self.eye_strain_prevention.model.predict.return_value = self.eyes([0, 0, 20, 10], [30, 0, 50, 10])
+        self.assertTrue(self.eye_strain_prevention.calibrate())
+
+        stored = {"eye_strain_prevention_ratios": [2.0, 2.0]}
+        with patch.object(self.eye_strain_prevention.settings, 'get', side_effect=lambda key, default=None:
+                          stored.get(key, default)):
+            # same image and model - the stored ratios are kept without inference
+            self.assertTrue(self.eye_strain_prevention.ensure_calibrated())
+            self.eye_strain_prevention.model.predict.assert_called_once()
+
+            # restarted on another backend, the stored ratios are stale
+            stored["inference_backend"] = "ultralytics"
+            restarted = EyeStrainPrevention()
+            restarted.RELAXED_IMAGE = self.eye_strain_prevention.RELAXED_IMAGE
+            restarted.calibration_cache = self.eye_strain_prevention.calibration_cache
+            restarted.model = self.eye_strain_prevention.model
+            self.assertTrue(restarted.ensure_calibrated())
+            self.assertEqual(self.eye_strain_prevention.model.predict.call_count, 2)
+
+    def test_model_id_computed_once_per_instance(self):
+        with patch('backend.features.eye_strain_prevention.file_hash', return_value="0" * 64) as mock_hash:
+            model_id = self.eye_strain_prevention._model_id()
+            self.assertEqual(self.eye_strain_prevention._model_id(), model_id)
+
+        mock_hash.assert_called_once()
+        backend = self.eye_strain_prevention.settings.get("inference_backend", "onnx")
+        variant = self.eye_strain_prevention.settings.get("inference_variant", "fp32")
+        self.assertTrue(model_id.endswith(f".{backend}.{variant}"))
+
+    @patch('backend.core.settings_manager.SettingsManager.update')
+    def test_per_eye_median_ignores_blink(self, mock_update):
+        left, right = [10, 20, 28, 30], [40, 20, 60, 30]  # ratios 1.8 and 2.0
+        detections = [self.eyes(left, right)] * 3 + [self.eyes(right, left)] * 3  # detection order varies
+        detections.append(self.eyes([10, 24, 28, 26], right))  # a blink squeezes the left eye
+        detections.append(self.eyes(left))
+        self.eye_strain_prevention.model.predict_batch.return_value = detections
+
+        self.assertTrue(self.eye_strain_prevention.calibrate_burst(8))
+
+        changes = mock_update.call_args[0][0]
+        # camera right eye first, as in the mirrored view
+        np.testing.assert_allclose(changes["eye_strain_prevention_ratios"], [2.0, 1.8], rtol=1e-6)
+        self.assertEqual(changes["eye_strain_prevention_ratios_variance"], [0.0, 0.0])
+        self.assertEqual(self.eye_strain_prevention.calibration_report["usable_frames"], 7)
+
+    @patch('backend.core.settings_manager.SettingsManager.update')
+    def test_burst_baseline_matches_eye_order_when_monitoring(self, mock_update):
+        left, right = [10, 20, 28, 30], [40, 20, 60, 30]  # ratios 1.8 and 2.0
+        self.eye_strain_prevention.model.predict_batch.return_value = [self.eyes(left, right)] * 5
+        self.assertTrue(self.eye_strain_prevention.calibrate_burst(5))
+        relaxed_ratios = mock_update.call_args[0][0]["eye_strain_prevention_ratios"]
+
+        # monitored frames report the same eyes in the opposite order
+        self.eye_strain_prevention.roi_tracker.enabled = False
+        self.eye_strain_prevention.model.predict.return_value = self.eyes(right, left)
+        ratio_filters = [SignalSmoother(), SignalSmoother()]
+        for _ in range(3):
+            boxes = self.eye_strain_prevention._detect(np.zeros((48, 64, 3), dtype=np.uint8))
+            state, _ = self.eye_strain_prevention._check_tension(boxes, relaxed_ratios, ratio_filters, "Relaxed face", 0)
+
+        self.assertEqual(state, "Relaxed face")
+        for ratio_filter in ratio_filters:
+            self.assertAlmostEqual(ratio_filter.value, 1.0, places=5)
+
+
 if __name__ == '__main__':
     unittest.main()
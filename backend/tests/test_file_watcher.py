@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from backend.core.file_watcher import FileWatcher
+
+
+class TestFileWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, 'settings.json')
+        with open(self.path, 'w') as f:
+            f.write('{}')
+
+    def _touch(self):
+        with open(self.path, 'w') as f:
+            f.write('{"night_limit_time": "23:00"}')
+        os.utime(self.path, (0, os.path.getmtime(self.path) + 1))
+
+    def test_times_out_without_changes(self):
+        watcher = FileWatcher(self.path, poll_interval=0.01)
+        self.addCleanup(watcher.close)
+
+        self.assertFalse(watcher.wait(0.05))
+
+    def test_sees_write(self):
+        watcher = FileWatcher(self.path, poll_interval=0.01)
+        self.addCleanup(watcher.close)
+
+        self._touch()
+
+        self.assertTrue(watcher.wait(1))
+
+    def test_ignores_other_files(self):
+        watcher = FileWatcher(self.path, poll_interval=0.01)
+        self.addCleanup(watcher.close)
+
+        with open(os.path.join(self.test_dir, 'daily_usage.json'), 'w') as f:
+            f.write('{}')
+
+        self.assertFalse(watcher.wait(0.05))
+
+    def test_polling_fallback(self):
+        watcher = FileWatcher(self.path, poll_interval=0.01)
+        watcher.close()
+        self.assertFalse(watcher.uses_inotify)
+
+        self.assertFalse(watcher.wait(0.05))
+        self._touch()
+        self.assertTrue(watcher.wait(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
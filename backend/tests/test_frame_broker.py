@@ -0,0 +1,250 @@
+import unittest
+import os
+import threading
+import time
+import numpy as np
+from unittest.mock import patch, MagicMock
+
+from backend.core.camera_manager import CameraManager
+from backend.core.frame_broker import CaptureControl, FrameBroker, SharedFrameReader, shared_frames_name
+from backend.core.notification_manager import NotificationManager
+
+
+class TestFrameBroker(unittest.TestCase):
+    def setUp(self):
+        self.name = f"sim_test_{os.getpid()}_{time.monotonic_ns()}"
+        self.broker = FrameBroker(self.name)
+        self.broker.create((48, 64, 3))
+
+    def tearDown(self):
+        self.broker.stop()
+
+    def test_shared_frames_name(self):
+        self.assertEqual(shared_frames_name(1), "sim_camera_1")
+
+    def test_reader_without_broker(self):
+        reader = SharedFrameReader(self.name + "_missing")
+
+        self.assertFalse(reader.open())
+        self.assertEqual(reader.read(), (False, None))
+
+    def test_read_before_first_frame(self):
+        with SharedFrameReader(self.name) as reader:
+            self.assertTrue(reader.open())
+            success, frame = reader.read()
+
+        self.assertFalse(success)
+        self.assertIsNone(frame)
+
+    def test_publish_and_read(self):
+        frame = np.full((48, 64, 3), 7, dtype=np.uint8)
+        sequence = self.broker.publish(frame, timestamp=123.0)
+
+        with SharedFrameReader(self.name) as reader:
+            reader.open()
+            shared_frame = reader.read_frame()
+
+            self.assertEqual(shared_frame.sequence, sequence)
+            self.assertEqual(shared_frame.timestamp, 123.0)
+            np.testing.assert_array_equal(shared_frame.frame, frame)
+            self.assertTrue(reader.is_valid(shared_frame))
+            del shared_frame
+
+    def test_capture_reads_into_slot(self):
+        targets = []
+
+        def read(image=None):
+            targets.append(image)
+            image[:] = 5
+            return True, image
+
+        mock_cap = MagicMock()
+        mock_cap.read.side_effect = read
+        sequence = self.broker.capture(mock_cap)
+
+        self.assertTrue(np.shares_memory(targets[0], self.broker.layout.frames[sequence % self.broker.slots]))
+        with SharedFrameReader(self.name) as reader:
+            reader.open()
+            shared_frame = reader.read_frame()
+            self.assertEqual(shared_frame.sequence, sequence)
+            self.assertEqual(int(shared_frame.frame.max()), 5)
+            del shared_frame
+
+    def test_capture_copies_mismatched_frame(self):
+        mock_cap = MagicMock()
+        mock_cap.read.return_value = (True, np.full((48, 64, 3), 3, dtype=np.uint8))
+        sequence = self.broker.capture(mock_cap)
+
+        self.assertEqual(int(self.broker.layout.frames[sequence % self.broker.slots].min()), 3)
+
+        mock_cap.read.return_value = (False, None)
+        self.assertEqual(self.broker.capture(mock_cap), 0)
+
+    def test_sequence_numbers_mark_new_frames(self):
+        with SharedFrameReader(self.name) as reader:
+            reader.open()
+
+            self.broker.publish(np.zeros((48, 64, 3), dtype=np.uint8))
+            first = reader.read_frame()
+            self.assertFalse(reader.is_new(first.sequence))
+
+            second_sequence = self.broker.publish(np.ones((48, 64, 3), dtype=np.uint8))
+            self.assertTrue(reader.is_new(second_sequence))
+
+            second = reader.read_frame()
+            self.assertEqual(second.sequence, first.sequence + 1)
+            del first, second
+
+    def test_view_invalidated_when_ring_wraps(self):
+        with SharedFrameReader(self.name) as reader:
+            reader.open()
+
+            self.broker.publish(np.zeros((48, 64, 3), dtype=np.uint8))
+            shared_frame = reader.read_frame()
+
+            for value in range(FrameBroker.SLOT_COUNT):
+                self.broker.publish(np.full((48, 64, 3), value, dtype=np.uint8))
+
+            self.assertFalse(reader.is_valid(shared_frame))
+            del shared_frame
+
+    def test_read_frame_survives_ring_wrap(self):
+        with SharedFrameReader(self.name) as reader:
+            reader.open()
+
+            self.broker.publish(np.full((48, 64, 3), 9, dtype=np.uint8))
+            success, frame = reader.read()
+
+            for value in range(FrameBroker.SLOT_COUNT + 1):
+                self.broker.publish(np.full((48, 64, 3), 17 + value, dtype=np.uint8))
+
+            self.assertTrue(success)
+            self.assertEqual(int(frame.min()), 9)
+            self.assertEqual(int(frame.max()), 9)
+            self.assertIs(reader.read()[1], frame)  # the buffer is reused by the next read
+
+    def test_read_retries_when_slot_overwritten_during_copy(self):
+        with SharedFrameReader(self.name) as reader:
+            reader.open()
+            self.broker.publish(np.zeros((48, 64, 3), dtype=np.uint8))
+
+            with patch.object(reader, 'is_valid', side_effect=[False, True]) as mock_is_valid:
+                success, _ = reader.read()
+
+            self.assertTrue(success)
+            self.assertEqual(mock_is_valid.call_count, 2)
+
+            with patch.object(reader, 'is_valid', return_value=False):
+                self.assertEqual(reader.read(), (False, None))
+
+    def test_multiple_readers_see_same_frame(self):
+        frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+        self.broker.publish(frame)
+
+        with SharedFrameReader(self.name) as reader1, SharedFrameReader(self.name) as reader2:
+            reader1.open()
+            reader2.open()
+
+            _, frame1 = reader1.read()
+            _, frame2 = reader2.read()
+
+            np.testing.assert_array_equal(frame1, frame2)
+            del frame1, frame2
+
+    def test_stale_owner(self):
+        with SharedFrameReader(self.name) as reader:
+            reader.open()
+            self.assertFalse(reader.is_stale())
+
+            self.broker.layout.heartbeat[0] = time.time() - SharedFrameReader.STALE_AFTER - 1
+            self.assertTrue(reader.is_stale())
+
+
+class TestCaptureControl(unittest.TestCase):
+    def test_call_runs_on_capture_thread(self):
+        control = CaptureControl()
+        running = threading.Event()
+        running.set()
+
+        def capture_loop():
+            while running.is_set():
+                control.run_pending()
+                time.sleep(0.001)
+
+        thread = threading.Thread(target=capture_loop)
+        thread.start()
+        try:
+            result = control.call(lambda value: (threading.current_thread(), value + 1), 1)
+        finally:
+            running.clear()
+            thread.join()
+
+        self.assertEqual(result, (thread, 2))
+
+    def test_call_without_capture_thread_times_out(self):
+        control = CaptureControl()
+        control.TIMEOUT = 0.01
+
+        self.assertIsNone(control.call(lambda: True))
+
+
+class TestCameraManagerShared(unittest.TestCase):
+    def setUp(self):
+        NotificationManager._instance = None
+
+    @patch('backend.core.camera_manager.shared_frames_name')
+    @patch('backend.core.camera_manager.image_size')
+    @patch('cv2.VideoCapture')
+    def test_second_manager_attaches_instead_of_opening_camera(self, mock_video_capture, mock_image_size,
+                                                                mock_shared_name):
+        mock_shared_name.return_value = f"sim_test_{os.getpid()}_{time.monotonic_ns()}"
+        mock_image_size.return_value = (64, 48)
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (True, np.full((48, 64, 3), 9, dtype=np.uint8))
+        mock_video_capture.return_value = mock_cap
+
+        owner = CameraManager(shared=True)
+        consumer = CameraManager(shared=True)
+        try:
+            self.assertTrue(owner.open("calibration.png"))
+            self.assertTrue(consumer.open("calibration.png"))
+
+            mock_video_capture.assert_called_once_with(0)
+            self.assertIsNotNone(owner.broker)
+            self.assertIsNone(consumer.broker)
+
+            success, frame = consumer.read()
+            self.assertTrue(success)
+            self.assertEqual(int(frame[0, 0, 0]), 9)
+            del frame
+        finally:
+            consumer.release()
+            owner.release()
+
+    @patch('backend.core.camera_manager.shared_frames_name')
+    @patch('backend.core.camera_manager.image_size')
+    @patch('cv2.VideoCapture')
+    def test_owner_keeps_publishing_while_paused(self, mock_video_capture, mock_image_size, mock_shared_name):
+        mock_shared_name.return_value = f"sim_test_{os.getpid()}_{time.monotonic_ns()}"
+        mock_image_size.return_value = (64, 48)
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (True, np.full((48, 64, 3), 9, dtype=np.uint8))
+        mock_cap.get.return_value = 30.0
+        mock_video_capture.return_value = mock_cap
+
+        owner = CameraManager(shared=True)
+        try:
+            owner.open("calibration.png")
+            owner.policy.open_latencies.append(0.01)
+
+            self.assertEqual(owner.pause(60), "low_rate")
+            self.assertIsNotNone(owner.broker)
+            mock_cap.release.assert_not_called()
+        finally:
+            owner.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import unittest
+from unittest.mock import MagicMock
+
+import cv2
+import numpy as np
+
+from backend.benchmarks.frame_pipeline import (
+    STAGES, SYNTHETIC_KEYPOINTS, compare, load_frames, run_benchmarks, run_stage, summarize, synthetic_frames
+)
+from backend.core.inference_engine import Detections, empty_detections
+from backend.core.notification_manager import NotificationManager
+from backend.core.settings_manager import SettingsManager
+
+
+class TestFramePipeline(unittest.TestCase):
+
+    def setUp(self):
+        SettingsManager._instance = None
+        NotificationManager._instance = None
+
+        pose_model = MagicMock()
+        pose_model.predict.return_value = Detections(
+            np.array([[260, 200, 380, 320]], dtype=np.float32), np.array([0.9], dtype=np.float32),
+            np.zeros(1, dtype=np.int64), SYNTHETIC_KEYPOINTS[None])
+        eye_model = MagicMock()
+        eye_model.predict.return_value = empty_detections()
+        self.models = {"distance_check": pose_model, "eye_strain_prevention": eye_model}
+
+    def tearDown(self):
+        SettingsManager._instance = None
+        NotificationManager._instance = None
+
+    def test_summarize(self):
+        summary = summarize([0.001] * 98 + [0.010, 0.020])
+
+        self.assertEqual(summary["p50_ms"], 1.0)
+        self.assertGreater(summary["p99_ms"], summary["p95_ms"])
+        self.assertEqual(summary["samples"], 100)
+        self.assertGreater(summary["fps"], 0)
+
+    def test_synthetic_frames_change(self):
+        frames = synthetic_frames(3)
+
+        self.assertEqual(frames[0].shape, (480, 640, 3))
+        self.assertFalse(np.array_equal(frames[0], frames[2]))
+
+    def test_load_frames_from_directory(self):
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        for index in range(3):
+            cv2.imwrite(os.path.join(test_dir, f"frame_{index}.png"), np.zeros((120, 160, 3), dtype=np.uint8))
+
+        frames = load_frames(test_dir, 2)
+
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0].shape, (120, 160, 3))
+
+    def test_report_covers_every_stage(self):
+        report = run_benchmarks(list(self.models), synthetic_frames(5), warmup=1, models=self.models)
+
+        self.assertEqual(report["meta"]["frames"], 5)
+        for name in self.models:
+            self.assertEqual(set(report["features"][name]), set(STAGES))
+            for summary in report["features"][name].values():
+                self.assertEqual(summary["samples"], 5)
+                self.assertLess(abs(summary["rss_growth_mb"]), 100)
+                self.assertGreaterEqual(summary["rss_peak_growth_mb"], summary["rss_growth_mb"])
+        self.assertGreater(report["meta"]["process_peak_rss_mb"], 0)
+        json.dumps(report)
+
+        self.models["distance_check"].predict.assert_called()
+
+    def test_stage_reports_its_own_memory(self):
+        kept = []
+        _, grows = run_stage(list(range(4)), lambda item: kept.append(np.ones(1 << 20)))
+        _, flat = run_stage(list(range(4)), lambda item: None)
+
+        self.assertGreater(grows["rss_growth_mb"], 20)
+        self.assertLess(flat["rss_growth_mb"], 5)
+
+    def test_stage_reports_peak_of_memory_it_frees(self):
+        def allocate_and_free(item):
+            block = np.ones(64 << 17)  # 64 MiB, freed when the step returns
+            time.sleep(0.01)
+            return float(block[0])
+
+        _, summary = run_stage(list(range(3)), allocate_and_free)
+
+        self.assertGreater(summary["rss_peak_growth_mb"], 40)
+        self.assertLess(summary["rss_growth_mb"], 20)
+
+    def test_allocations_traced_per_frame(self):
+        report = run_benchmarks(["distance_check"], synthetic_frames(5), warmup=1, models=self.models,
+                                allocations=True)
+
+        allocated = report["allocations"]["distance_check"]
+        self.assertEqual(allocated["peak"]["count"], 5)
+        # the frames are never copied, a frame would be 900 KiB
+        self.assertLess(allocated["peak"]["p95"], 640 * 480 * 3 / 4)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_compare(self):
+        baseline = {"features": {"distance_check": {"predict": {"p50_ms": 100.0}}}}
+        current = {"features": {"distance_check": {"predict": {"p50_ms": 80.0}, "mirror": {"p50_ms": 1.0}}}}
+
+        changes = compare(baseline, current)
+
+        self.assertEqual(changes["distance_check"]["predict"], -20.0)
+        self.assertIsNone(changes["distance_check"]["mirror"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+from backend.core.frame_sources import (
+    GeneratorSource, ImageDirectorySource, VideoFileSource, create_source
+)
+
+
+def numbered_frames(count):
+    return [np.full((48, 64, 3), value, dtype=np.uint8) for value in range(count)]
+
+
+class TestGeneratorSource(unittest.TestCase):
+    def test_reads_every_frame_without_realtime(self):
+        source = GeneratorSource(numbered_frames(5), realtime=False)
+
+        values = []
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            values.append(int(frame[0, 0, 0]))
+
+        self.assertEqual(values, [0, 1, 2, 3, 4])
+        self.assertEqual(source.get(cv2.CAP_PROP_POS_FRAMES), 5)
+
+    def test_loop_wraps_around(self):
+        source = GeneratorSource(numbered_frames(3), realtime=False, loop=True)
+
+        values = [int(source.read()[1][0, 0, 0]) for _ in range(7)]
+
+        self.assertEqual(values, [0, 1, 2, 0, 1, 2, 0])
+
+    def test_generator_cannot_loop(self):
+        source = GeneratorSource((frame for frame in numbered_frames(2)), realtime=False, loop=True)
+
+        self.assertTrue(source.read()[0])
+        self.assertTrue(source.read()[0])
+        self.assertEqual(source.read(), (False, None))
+
+    def test_skip_moves_on_in_recording_time(self):
+        source = GeneratorSource(numbered_frames(100), fps=10, realtime=False)
+        source.read()
+
+        source.skip(5)
+        ret, frame = source.read()
+
+        # one frame read, then 5 seconds at 10 fps later
+        self.assertTrue(ret)
+        self.assertEqual(int(frame[0, 0, 0]), 50)
+
+    def test_realtime_drops_frames_to_keep_up(self):
+        source = GeneratorSource(numbered_frames(100), fps=10, realtime=True)
+
+        with patch("backend.core.frame_sources.time.monotonic", side_effect=[100.0, 102.0]):
+            first = int(source.read()[1][0, 0, 0])
+            second = int(source.read()[1][0, 0, 0])
+
+        self.assertEqual(first, 0)
+        self.assertEqual(second, 20)
+
+    def test_realtime_plays_at_recorded_rate(self):
+        source = GeneratorSource(numbered_frames(100), fps=100, realtime=True)
+        source.read()
+        time.sleep(0.05)
+
+        ret, frame = source.read()
+
+        self.assertTrue(ret)
+        self.assertGreaterEqual(int(frame[0, 0, 0]), 4)
+
+    def test_closed_after_release(self):
+        source = GeneratorSource(numbered_frames(3), realtime=False)
+        source.release()
+
+        self.assertFalse(source.isOpened())
+        self.assertEqual(source.read(), (False, None))
+        self.assertFalse(source.set(cv2.CAP_PROP_FPS, 1))
+
+
+class TestFileSources(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+
+    def test_image_directory_in_name_order(self):
+        for value in (2, 0, 1):
+            cv2.imwrite(os.path.join(self.test_dir, f"frame_{value}.png"), np.full((48, 64, 3), value * 50, np.uint8))
+        with open(os.path.join(self.test_dir, "notes.txt"), "w") as f:
+            f.write("not a frame")
+
+        source = ImageDirectorySource(self.test_dir, realtime=False)
+
+        values = [int(source.read()[1][0, 0, 0]) for _ in range(3)]
+        self.assertEqual(values, [0, 50, 100])
+        self.assertEqual(source.read(), (False, None))
+
+    def test_empty_image_directory_is_not_opened(self):
+        self.assertFalse(ImageDirectorySource(self.test_dir).isOpened())
+
+    def test_video_file(self):
+        path = os.path.join(self.test_dir, "session.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 15, (64, 48))
+        if not writer.isOpened():
+            self.skipTest("no video encoder available")
+        for frame in numbered_frames(10):
+            writer.write(frame)
+        writer.release()
+
+        source = VideoFileSource(path, realtime=False)
+        frames = 0
+        while source.read()[0]:
+            frames += 1
+
+        self.assertEqual(source.get(cv2.CAP_PROP_FPS), 15)
+        self.assertEqual(frames, 10)
+
+    def test_create_source(self):
+        cv2.imwrite(os.path.join(self.test_dir, "frame.png"), np.zeros((48, 64, 3), np.uint8))
+
+        self.assertIsInstance(create_source(self.test_dir), ImageDirectorySource)
+        self.assertIsInstance(create_source(os.path.join(self.test_dir, "session.mp4")), VideoFileSource)
+        self.assertIsInstance(create_source(numbered_frames(1), realtime=False), GeneratorSource)
+        with patch("cv2.VideoCapture") as mock_video_capture:
+            create_source("1")
+        mock_video_capture.assert_called_once_with(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import unittest
+
+from backend.benchmarks.import_time import (
+    HEAVY_MODULES, check_module, feature_modules, load_budget, measure_import, parse_importtime
+)
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   numpy.version\n"
+            "import time:      3000 |      75000 | numpy\n"
+            "import time:       500 |      80000 | backend.features.distance_check\n"
+        )
+
+        cumulative = parse_importtime(output)
+
+        self.assertEqual(cumulative["numpy"], 75000)
+        self.assertEqual(cumulative["numpy.version"], 120)
+        self.assertEqual(cumulative["backend.features.distance_check"], 80000)
+        self.assertNotIn("imported package", cumulative)
+
+    def test_every_feature_has_a_budget(self):
+        budget = load_budget()
+
+        for module in feature_modules():
+            self.assertIn(module, budget)
+
+    def test_features_do_not_import_inference_runtimes(self):
+        for module in feature_modules():
+            with self.subTest(module=module):
+                _, imported = measure_import(module, runs=1)
+                self.assertEqual([name for name in HEAVY_MODULES if name in imported], [])
+
+    # wall-clock budgets fail on a loaded machine, python -m backend.benchmarks.import_time enforces them
+    @unittest.skipUnless(os.environ.get("IMPORT_BUDGET_TESTS"), "set IMPORT_BUDGET_TESTS=1 to time imports")
+    def test_feature_imports_within_budget(self):
+        budget = load_budget()
+
+        for module in feature_modules():
+            with self.subTest(module=module):
+                self.assertEqual(check_module(module, budget, runs=1), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+import unittest
+import os
+import tempfile
+import shutil
+import numpy as np
+from unittest.mock import MagicMock, patch
+
+from backend.core.inference_engine import (
+    OnnxModel, UltralyticsModel, Detections, empty_detections, letterbox, load_model, non_max_suppression,
+    onnx_path_for, export_onnx, file_hash
+)
+
+
+def make_model(keypoint_shape=None):
+    model = OnnxModel.__new__(OnnxModel)
+    model.imgsz = 640
+    model.stride = 32
+    model.keypoint_shape = keypoint_shape
+    model.buffers = {}
+    return model
+
+
+class TestLetterbox(unittest.TestCase):
+
+    def test_landscape_frame_padded_to_stride(self):
+        image = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        padded, gain, pad = letterbox(image, 640)
+
+        self.assertEqual(padded.shape, (480, 640, 3))
+        self.assertEqual(gain, 1.0)
+        self.assertEqual(pad, (0, 0))
+
+    def test_small_crop_scaled_up(self):
+        image = np.zeros((100, 150, 3), dtype=np.uint8)
+
+        padded, gain, pad = letterbox(image, 320)
+
+        self.assertAlmostEqual(gain, 320 / 150)
+        self.assertEqual(padded.shape[1], 320)
+        self.assertEqual(padded.shape[0] % 32, 0)
+        self.assertEqual(pad[0], 0)
+        self.assertGreater(pad[1], 0)
+
+
+class TestOnnxPreprocess(unittest.TestCase):
+
+    def test_matches_letterbox(self):
+        model = make_model()
+        image = np.random.default_rng(0).integers(0, 255, (100, 150, 3), dtype=np.uint8)
+
+        tensor, gain, pad = model.preprocess(image, 320)
+
+        padded, expected_gain, expected_pad = letterbox(image, 320)
+        expected = np.ascontiguousarray(padded[:, :, ::-1].transpose(2, 0, 1), dtype=np.float32)[None] / 255.0
+        np.testing.assert_array_equal(tensor, expected)
+        self.assertEqual((gain, pad), (expected_gain, expected_pad))
+
+    def test_buffers_reused_across_frames(self):
+        model = make_model()
+        first, _, _ = model.preprocess(np.zeros((480, 640, 3), dtype=np.uint8), 640)
+        second, _, _ = model.preprocess(np.full((480, 640, 3), 255, dtype=np.uint8), 640)
+
+        self.assertIs(first, second)
+        self.assertEqual(float(second.min()), 1.0)
+        self.assertEqual(len(model.buffers), 1)
+
+
+class TestNonMaxSuppression(unittest.TestCase):
+
+    def test_overlapping_boxes_suppressed(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], dtype=np.float32)
+        scores = np.array([0.8, 0.9, 0.7], dtype=np.float32)
+
+        keep = non_max_suppression(boxes, scores, 0.5)
+
+        np.testing.assert_array_equal(keep, [1, 2])
+
+    def test_no_boxes(self):
+        keep = non_max_suppression(np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32), 0.5)
+
+        self.assertEqual(len(keep), 0)
+
+
+class TestOnnxPostprocess(unittest.TestCase):
+
+    def test_detection_output(self):
+        model = make_model()
+        output = np.zeros((4 + 2, 3), dtype=np.float32)
+        output[:4, 0] = [100, 100, 40, 20]  # cx, cy, w, h
+        output[:4, 1] = [300, 200, 40, 20]
+        output[:4, 2] = [101, 101, 40, 20]  # overlaps the first box
+        output[4:, 0] = [0.9, 0.1]
+        output[4:, 1] = [0.2, 0.6]
+        output[4:, 2] = [0.5, 0.1]
+
+        detections = model.postprocess(output, 0.25, 2.0, (0, 40), (400, 400, 3))
+
+        self.assertEqual(len(detections.boxes), 2)
+        np.testing.assert_allclose(detections.boxes[0], [40, 25, 60, 35])
+        np.testing.assert_allclose(detections.confidences, [0.9, 0.6])
+        np.testing.assert_array_equal(detections.class_ids, [0, 1])
+        self.assertIsNone(detections.keypoints)
+
+    def test_pose_output(self):
+        model = make_model((2, 3))
+        output = np.zeros((4 + 1 + 6, 1), dtype=np.float32)
+        output[:, 0] = [100, 100, 40, 40, 0.8, 90, 100, 0.9, 110, 100, 0.7]
+
+        detections = model.postprocess(output, 0.25, 1.0, (0, 0), (480, 640, 3))
+
+        self.assertEqual(detections.keypoints.shape, (1, 2, 3))
+        np.testing.assert_allclose(detections.keypoints[0], [[90, 100, 0.9], [110, 100, 0.7]])
+
+    def test_nothing_above_threshold(self):
+        model = make_model((17, 3))
+        output = np.zeros((4 + 1 + 51, 10), dtype=np.float32)
+
+        detections = model.postprocess(output, 0.25, 1.0, (0, 0), (480, 640, 3))
+
+        self.assertEqual(detections.boxes.shape, (0, 4))
+        self.assertEqual(detections.keypoints.shape, (0, 17, 3))
+
+
+class TestOnnxPredictBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.model = make_model()
+        self.model.input_name = "images"
+        self.model.session = MagicMock()
+
+    def test_one_forward_pass_for_all_images(self):
+        images = [np.full((480, 640, 3), value, dtype=np.uint8) for value in (0, 128, 255)]
+        output = np.zeros((3, 4 + 1, 2), dtype=np.float32)
+        output[:, :4, 0] = [320, 320, 40, 20]
+        output[1, 4, 0] = 0.9  # only the second image has a detection
+        self.model.session.run.return_value = [output]
+
+        detections = self.model.predict_batch(images, conf=0.5)
+
+        self.model.session.run.assert_called_once()
+        batch = self.model.session.run.call_args[0][1]["images"]
+        self.assertEqual(batch.shape, (3, 3, 480, 640))
+        # every image kept its own pixels although preprocessing reuses one tensor
+        np.testing.assert_allclose(batch[:, 0, 240, 320], [0, 128 / 255, 1], rtol=1e-6)
+        self.assertEqual([len(faces.boxes) for faces in detections], [0, 1, 0])
+        np.testing.assert_allclose(detections[1].boxes[0], [300, 310, 340, 330])
+
+    def test_images_of_different_sizes_rejected(self):
+        images = [np.zeros((480, 640, 3), dtype=np.uint8), np.zeros((720, 640, 3), dtype=np.uint8)]
+
+        with self.assertRaises(ValueError):
+            self.model.predict_batch(images)
+        self.model.session.run.assert_not_called()
+
+    def test_empty_batch(self):
+        self.assertEqual(self.model.predict_batch([]), [])
+        self.model.session.run.assert_not_called()
+
+
+class TestUltralyticsModel(unittest.TestCase):
+
+    def setUp(self):
+        result = MagicMock()
+        result.keypoints = None
+        result.boxes.xyxy.cpu().numpy.return_value = np.array([[1, 2, 3, 4]], dtype=np.float32)
+        result.boxes.conf.cpu().numpy.return_value = np.array([0.9], dtype=np.float32)
+        result.boxes.cls.cpu().numpy.return_value = np.array([0.0], dtype=np.float32)
+
+        self.model = UltralyticsModel.__new__(UltralyticsModel)
+        self.model.model = MagicMock()
+        self.model.model.predict.side_effect = lambda source, **kwargs: [result] * (
+            len(source) if isinstance(source, list) else 1)
+
+    def test_predict_is_quiet(self):
+        detections = self.model.predict(np.zeros((8, 8, 3), dtype=np.uint8), conf=0.5)
+
+        self.assertEqual(self.model.model.predict.call_args[1]["verbose"], False)
+        np.testing.assert_array_equal(detections.class_ids, [0])
+
+    def test_predict_batch_is_quiet(self):
+        detections = self.model.predict_batch([np.zeros((8, 8, 3), dtype=np.uint8)] * 2, conf=0.5)
+
+        self.assertEqual(self.model.model.predict.call_args[1]["verbose"], False)
+        self.assertEqual(len(detections), 2)
+
+
+class TestModelLoading(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.weights_path = os.path.join(self.test_dir, 'model.pt')
+        with open(self.weights_path, 'wb') as f:
+            f.write(b'weights')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_onnx_path_keyed_by_content(self):
+        first = onnx_path_for(self.weights_path)
+
+        with open(self.weights_path, 'wb') as f:
+            f.write(b'other weights')
+
+        self.assertNotEqual(first, onnx_path_for(self.weights_path))
+        self.assertTrue(first.startswith(os.path.join(self.test_dir, 'model.')))
+        self.assertTrue(first.endswith('.onnx'))
+
+    def test_file_hash_read_once_while_unchanged(self):
+        first = file_hash(self.weights_path)
+
+        with patch('builtins.open', side_effect=AssertionError("hashed again")):
+            self.assertEqual(file_hash(self.weights_path), first)
+
+    def test_export_reuses_cached_file(self):
+        onnx_path = onnx_path_for(self.weights_path)
+        open(onnx_path, 'wb').close()
+
+        self.assertEqual(export_onnx(self.weights_path), onnx_path)
+
+    @patch('backend.core.inference_engine.UltralyticsModel')
+    @patch('backend.core.inference_engine.export_onnx', side_effect=ImportError("no onnx"))
+    def test_load_model_falls_back_to_ultralytics(self, mock_export, mock_ultralytics):
+        model = load_model(self.weights_path, "onnx")
+
+        self.assertIs(model, mock_ultralytics.return_value)
+        mock_ultralytics.assert_called_once_with(self.weights_path)
+
+    def test_empty_detections(self):
+        detections = empty_detections()
+
+        self.assertIsInstance(detections, Detections)
+        self.assertEqual(len(detections.boxes), 0)
+        self.assertIsNone(detections.keypoints)
+
+
+if __name__ == '__main__':
+    unittest.main()
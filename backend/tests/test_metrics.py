@@ -0,0 +1,149 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import unittest
+from unittest.mock import MagicMock, patch
+
+from backend.core.metrics import Histogram, Metrics
+
+
+class TestHistogram(unittest.TestCase):
+    def test_summary_over_window(self):
+        histogram = Histogram(window=100)
+        for value in range(1, 201):
+            histogram.observe(value)
+
+        summary = histogram.summary()
+
+        # lifetime count and sum, percentiles over the last 100 values
+        self.assertEqual(summary["count"], 200)
+        self.assertEqual(summary["sum"], sum(range(1, 201)))
+        self.assertEqual(summary["p50"], 151)
+        self.assertEqual(summary["p99"], 200)
+        self.assertEqual(summary["max"], 200)
+
+    def test_empty_summary(self):
+        self.assertEqual(Histogram().summary()["p95"], 0.0)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+
+        Metrics._instance = None
+        self.addCleanup(setattr, Metrics, "_instance", None)
+        self.metrics = Metrics()
+        self.metrics.process_name = "test"
+
+    def test_singleton(self):
+        self.assertIs(Metrics(), self.metrics)
+
+    def test_timer_records_elapsed_time(self):
+        for _ in range(3):
+            with self.metrics.timer("distance_check", "predict"):
+                time.sleep(0.01)
+
+        summary = self.metrics.histograms[("distance_check", "predict")].summary()
+        self.assertEqual(summary["count"], 3)
+        self.assertGreaterEqual(summary["p50"], 0.01)
+        self.assertIs(self.metrics.timer("distance_check", "predict"), self.metrics.timer("distance_check", "predict"))
+
+    def test_timer_records_on_exception(self):
+        with self.assertRaises(ValueError):
+            with self.metrics.timer("distance_check", "predict"):
+                raise ValueError
+
+        self.assertEqual(self.metrics.histograms[("distance_check", "predict")].count, 1)
+
+    def test_counters(self):
+        self.metrics.count("distance_check", "inferences")
+        self.metrics.count("distance_check", "inferences", 2)
+
+        self.assertEqual(self.metrics.counters[("distance_check", "inferences")], 3)
+
+    def test_process_resources(self):
+        resources = self.metrics.sample_process()
+
+        self.assertGreater(resources["rss_bytes"], 0)
+        self.assertGreaterEqual(resources["cpu_percent"], 0.0)
+        self.assertGreaterEqual(resources["threads"], 1)
+
+    def test_export_json(self):
+        self.metrics.path = os.path.join(self.test_dir, "metrics_test.json")
+        self.metrics.count("eye_strain_prevention", "alerts")
+        with self.metrics.timer("eye_strain_prevention", "geometry"):
+            pass
+
+        self.assertTrue(self.metrics.export())
+
+        with open(self.metrics.path) as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot["process"], "test")
+        self.assertEqual(snapshot["counters"], [{"feature": "eye_strain_prevention", "name": "alerts", "value": 1}])
+        self.assertEqual(snapshot["seconds"][0]["name"], "geometry")
+        self.assertIn("rss_bytes", snapshot["resources"])
+        self.assertEqual(os.listdir(self.test_dir), ["metrics_test.json"])
+
+    def test_export_prometheus(self):
+        self.metrics.path = os.path.join(self.test_dir, "metrics_test.prom")
+        self.metrics.count("distance_check", "inferences")
+        with self.metrics.timer("distance_check", "predict"):
+            pass
+
+        self.metrics.export()
+
+        with open(self.metrics.path) as f:
+            text = f.read()
+        self.assertIn('healthy_computer_events_total{process="test",feature="distance_check",event="inferences"} 1', text)
+        self.assertIn('healthy_computer_stage_seconds{process="test",feature="distance_check",stage="predict",quantile="0.95"}', text)
+        self.assertIn('healthy_computer_stage_seconds_count{process="test",feature="distance_check",stage="predict"} 1', text)
+        self.assertIn("healthy_computer_process_rss_bytes", text)
+
+    def test_allocations_only_traced_with_tracemalloc(self):
+        with self.metrics.allocations("distance_check"):
+            bytearray(1 << 20)
+        self.assertEqual(self.metrics.allocated[("distance_check", "peak")].count, 0)
+
+        tracemalloc.start()
+        try:
+            with self.metrics.allocations("distance_check"):
+                bytearray(1 << 20)
+        finally:
+            tracemalloc.stop()
+
+        self.assertGreater(self.metrics.allocated[("distance_check", "peak")].samples[0], 1 << 19)
+        self.assertLess(self.metrics.allocated[("distance_check", "net")].samples[0], 1 << 10)
+        self.assertEqual(self.metrics.snapshot()["allocated_bytes"][1]["name"], "peak")
+
+    def test_export_without_path(self):
+        self.assertFalse(self.metrics.export())
+
+    def test_maybe_export_waits_for_interval(self):
+        self.metrics.path = os.path.join(self.test_dir, "metrics_test.prom")
+        self.metrics.last_export = time.monotonic()
+
+        self.assertFalse(self.metrics.maybe_export())
+
+        self.metrics.last_export -= Metrics.EXPORT_INTERVAL
+        self.assertTrue(self.metrics.maybe_export())
+        self.assertFalse(self.metrics.maybe_export())
+
+    @patch("backend.core.metrics.SettingsManager")
+    def test_export_as_follows_format_setting(self, mock_settings_manager):
+        settings = MagicMock()
+        settings.path = self.test_dir
+        settings.get.side_effect = lambda key, default=None: "json" if key == "metrics_format" else default
+        mock_settings_manager.return_value = settings
+
+        path = self.metrics.export_as("vision_host")
+
+        self.assertEqual(path, os.path.join(self.test_dir, "metrics_vision_host.json"))
+        self.assertEqual(self.metrics.process_name, "vision_host")
+
+
+if __name__ == "__main__":
+    unittest.main()
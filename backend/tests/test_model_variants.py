@@ -0,0 +1,173 @@
+import unittest
+import os
+import tempfile
+import shutil
+import numpy as np
+from unittest.mock import patch, MagicMock
+
+from backend.core.inference_engine import Detections
+from backend.core.model_variants import (
+    VARIANTS, variant_path, build_variant, load_variant, compare_variants, split_images, _eye_ratios, _relative_error
+)
+
+
+def detections_with_area(side):
+    keypoints = np.zeros((1, 17, 3), dtype=np.float32)
+    keypoints[0, :5, :2] = [[0, 0], [side, 0], [0, side], [side, side], [side / 2, side / 2]]
+    return Detections(np.zeros((1, 4), dtype=np.float32), np.ones(1, dtype=np.float32),
+                      np.zeros(1, dtype=np.int64), keypoints)
+
+
+class TestModelVariants(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.onnx_path = os.path.join(self.test_dir, 'model.0123456789abcdef.onnx')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_matmul_model(self):
+        import onnx
+        from onnx import helper, TensorProto, numpy_helper
+
+        weights = numpy_helper.from_array(np.random.rand(8, 4).astype(np.float32), name='weights')
+        graph = helper.make_graph(
+            [helper.make_node('MatMul', ['input', 'weights'], ['output'])],
+            'matmul',
+            [helper.make_tensor_value_info('input', TensorProto.FLOAT, [1, 8])],
+            [helper.make_tensor_value_info('output', TensorProto.FLOAT, [1, 4])],
+            [weights],
+        )
+        onnx.save(helper.make_model(graph, opset_imports=[helper.make_opsetid('', 17)]), self.onnx_path)
+
+    def test_variant_path(self):
+        self.assertEqual(variant_path(self.onnx_path, 'fp32'), self.onnx_path)
+        self.assertEqual(
+            variant_path(self.onnx_path, 'int8_dynamic'),
+            os.path.join(self.test_dir, 'model.0123456789abcdef.int8_dynamic.onnx')
+        )
+
+    def test_build_dynamic_variant(self):
+        self.write_matmul_model()
+
+        path = build_variant(self.onnx_path, 'int8_dynamic')
+
+        self.assertEqual(path, variant_path(self.onnx_path, 'int8_dynamic'))
+        self.assertTrue(os.path.exists(path))
+
+    def test_static_variant_needs_calibration_images(self):
+        with self.assertRaises(ValueError):
+            build_variant(self.onnx_path, 'int8_static', [])
+
+    def test_unknown_variant(self):
+        with self.assertRaises(ValueError):
+            build_variant(self.onnx_path, 'fp16')
+
+    @patch('backend.core.model_variants.OnnxModel')
+    def test_missing_static_variant_falls_back_to_fp32(self, mock_model):
+        load_variant(self.onnx_path, 'int8_static')
+
+        mock_model.assert_called_once_with(self.onnx_path)
+
+    @patch('backend.core.model_variants.OnnxModel')
+    def test_built_variant_loaded(self, mock_model):
+        path = variant_path(self.onnx_path, 'int8_static')
+        open(path, 'wb').close()
+
+        load_variant(self.onnx_path, 'int8_static')
+
+        mock_model.assert_called_once_with(path)
+
+    def test_relative_error(self):
+        self.assertAlmostEqual(_relative_error(110.0, 100.0), 0.1)
+        self.assertAlmostEqual(_relative_error([0.5, 0.3], [0.5, 0.2]), 0.25)
+        self.assertIsNone(_relative_error(None, 100.0))
+
+    @patch('backend.core.model_variants.export_onnx')
+    @patch('backend.core.model_variants.build_variant')
+    @patch('backend.core.model_variants.OnnxModel')
+    def test_compare_variants_against_fp32(self, mock_model_class, mock_build, mock_export):
+        mock_export.return_value = self.onnx_path
+        mock_build.side_effect = lambda path, variant, images: variant_path(path, variant)
+        for variant in VARIANTS:
+            with open(variant_path(self.onnx_path, variant), 'wb') as f:
+                f.write(b'model')
+
+        sides = {'fp32': 10, 'int8_dynamic': 11, 'int8_static': 10}
+
+        def make_model(path):
+            variant = next((v for v in VARIANTS[1:] if path.endswith(v + '.onnx')), 'fp32')
+            model = MagicMock()
+            model.path = path
+            model.predict.return_value = detections_with_area(sides[variant])
+            return model
+
+        mock_model_class.side_effect = make_model
+        images = [np.zeros((480, 640, 3), dtype=np.uint8)]
+
+        report = compare_variants('model.pt', lambda d: float(d.keypoints[0, 1, 0] ** 2), images, runs=1)
+
+        self.assertEqual(set(report), set(VARIANTS))
+        self.assertEqual(report['fp32']['mean_relative_error'], 0.0)
+        self.assertAlmostEqual(report['int8_dynamic']['mean_relative_error'], 0.21)
+        self.assertEqual(report['int8_static']['compared_images'], 1)
+        self.assertFalse(report['int8_static']['held_out'])
+
+    @patch('backend.core.model_variants.export_onnx')
+    @patch('backend.core.model_variants.build_variant')
+    @patch('backend.core.model_variants.OnnxModel')
+    def test_static_variant_scored_on_held_out_images(self, mock_model_class, mock_build, mock_export):
+        mock_export.return_value = self.onnx_path
+        mock_build.side_effect = lambda path, variant, images: variant_path(path, variant)
+        for variant in VARIANTS:
+            with open(variant_path(self.onnx_path, variant), 'wb') as f:
+                f.write(b'model')
+        models = []
+
+        def make_model(path):
+            model = MagicMock()
+            model.path = path
+            model.predict.return_value = detections_with_area(10)
+            models.append(model)
+            return model
+
+        mock_model_class.side_effect = make_model
+        images = [np.full((8, 8, 3), value, dtype=np.uint8) for value in range(4)]
+
+        report = compare_variants('model.pt', lambda d: 1.0, images, runs=1)
+
+        calibration_images = mock_build.call_args_list[-1][0][2]
+        self.assertEqual([int(image[0, 0, 0]) for image in calibration_images], [0, 2])
+        scored = {int(call[0][0][0, 0, 0]) for call in models[-1].predict.call_args_list}
+        self.assertEqual(scored, {1, 3})
+        self.assertTrue(report['int8_static']['held_out'])
+
+    def test_split_images(self):
+        images = [np.zeros((1, 1, 3), dtype=np.uint8)]
+
+        self.assertEqual(split_images(images), (images, images))
+
+    def test_eye_ratios_left_to_right(self):
+        left, right = [10, 20, 28, 30], [40, 20, 60, 30]
+        ratios = []
+        for boxes in ([left, right], [right, left]):
+            detections = Detections(np.array(boxes, dtype=np.float32), np.ones(2, dtype=np.float32),
+                                    np.zeros(2, dtype=np.int64))
+            ratios.append(_eye_ratios(detections))
+
+        self.assertEqual(ratios[0], ratios[1])
+        self.assertAlmostEqual(ratios[0][0], 1.8)
+
+    @patch('backend.core.model_variants.export_onnx')
+    @patch('backend.core.model_variants.build_variant', side_effect=RuntimeError("quantization failed"))
+    def test_compare_variants_records_build_errors(self, mock_build, mock_export):
+        mock_export.return_value = self.onnx_path
+
+        report = compare_variants('model.pt', lambda d: None, [np.zeros((8, 8, 3), dtype=np.uint8)], runs=1)
+
+        self.assertEqual(report['int8_static'], {'error': 'quantization failed'})
+
+
+if __name__ == '__main__':
+    unittest.main()
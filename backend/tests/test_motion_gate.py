@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+
+from backend.core.motion_gate import MotionGate
+
+
+class TestMotionGate(unittest.TestCase):
+
+    def setUp(self):
+        self.gate = MotionGate(threshold=4.0, max_reuse=3)
+        self.frame = np.full((480, 640, 3), 100, dtype=np.uint8)
+
+    def test_first_frame_is_inferred(self):
+        self.assertTrue(self.gate.should_infer(self.frame))
+        self.assertEqual(self.gate.stats(), {"hits": 0, "misses": 1, "hit_rate": 0.0})
+
+    def test_unchanged_frame_is_skipped(self):
+        self.gate.should_infer(self.frame)
+
+        noisy = self.frame.copy()
+        noisy[::2, ::2] += 2
+
+        self.assertFalse(self.gate.should_infer(noisy))
+        self.assertEqual(self.gate.hits, 1)
+        self.assertLessEqual(self.gate.score(noisy), 4.0)
+
+    def test_changed_frame_is_inferred(self):
+        self.gate.should_infer(self.frame)
+
+        moved = self.frame.copy()
+        moved[:, :320] = 200
+
+        self.assertTrue(self.gate.should_infer(moved))
+        self.assertEqual(self.gate.misses, 2)
+
+    def test_max_reuse_forces_inference(self):
+        self.gate.should_infer(self.frame)
+
+        decisions = [self.gate.should_infer(self.frame) for _ in range(4)]
+
+        self.assertEqual(decisions, [False, False, False, True])
+        self.assertAlmostEqual(self.gate.stats()["hit_rate"], 3 / 5)
+
+    def test_reset(self):
+        self.gate.should_infer(self.frame)
+        self.gate.reset()
+
+        self.assertTrue(self.gate.should_infer(self.frame))
+
+    def test_grayscale_frame(self):
+        gray = np.zeros((480, 640), dtype=np.uint8)
+
+        self.assertTrue(self.gate.should_infer(gray))
+        self.assertFalse(self.gate.should_infer(gray))
+
+
+if __name__ == '__main__':
+    unittest.main()
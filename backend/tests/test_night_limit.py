@@ -1,6 +1,6 @@
 import unittest
 from datetime import datetime, timedelta
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 from backend.features.night_limit import NightLimit
 from backend.core.settings_manager import SettingsManager
 from backend.core.notification_manager import NotificationManager
@@ -120,5 +120,73 @@ class TestNightLimitIntegration(unittest.TestCase):
         mock_sleep.assert_called_once()
 
 
+class TestNightLimitTimetable(unittest.TestCase):
+    def setUp(self):
+        SettingsManager._instance = None
+        NotificationManager._instance = None
+        self.night_limit = NightLimit()
+        self.night_limit.notifier = MagicMock()
+        self.now = datetime(2024, 5, 1, 21, 29, 30)
+
+        datetime_patcher = patch('backend.features.night_limit.datetime')
+        mock_datetime = datetime_patcher.start()
+        mock_datetime.now.side_effect = lambda: self.now
+        self.addCleanup(datetime_patcher.stop)
+
+    def tearDown(self):
+        SettingsManager._instance = None
+        NotificationManager._instance = None
+
+    def start(self, bedtime="22:00"):
+        with patch.object(self.night_limit.settings, 'get', return_value=bedtime):
+            return self.night_limit.start()
+
+    def test_sleeps_until_next_warning(self):
+        self.assertEqual(self.start(), 30)
+
+        self.now = datetime(2024, 5, 1, 21, 30)
+        delay = self.night_limit.check()
+
+        self.night_limit.notifier.send.assert_called_once_with(
+            "Bedtime Reminder", "It's 30 minute(s) until your bedtime. Start wrapping up!"
+        )
+        self.assertEqual(delay, 15 * 60)
+
+    def test_late_wakeup_sends_latest_warning(self):
+        self.start()
+
+        self.now = datetime(2024, 5, 1, 21, 56)
+        self.night_limit.check()
+
+        self.night_limit.notifier.send.assert_called_once_with(
+            "Bedtime Reminder", "It's 5 minute(s) until your bedtime. Start wrapping up!"
+        )
+
+    def test_reconfigure_moves_reminders(self):
+        self.assertEqual(self.start(), 30)
+
+        delay = self.night_limit.reconfigure({"night_limit_time": "23:00"})
+
+        self.assertEqual(self.night_limit.bedtime_str, "23:00")
+        next_event = self.night_limit.timetable[self.night_limit.next_event]
+        self.assertEqual(next_event.time, datetime(2024, 5, 1, 22, 0))
+        self.assertEqual(delay, self.night_limit.time_manager.MAX_SLEEP)
+        self.night_limit.notifier.send.assert_not_called()
+
+    def test_day_of_reminders_with_few_wakeups(self):
+        self.now = datetime(2024, 5, 1, 12, 0)
+        delay = self.start()
+
+        while self.now < datetime(2024, 5, 2, 12, 0):
+            self.now += timedelta(seconds=delay)
+            delay = self.night_limit.check()
+
+        titles = [call.args[0] for call in self.night_limit.notifier.send.call_args_list]
+        self.assertEqual(titles.count("Bedtime Reminder"), 6)
+        self.assertEqual(titles.count("Bedtime!"), 1)
+        self.assertEqual(titles.count("Past Bedtime!"), 6)
+        self.assertLess(self.night_limit.wakeups, 24 * 60 // 10)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import json
+import os
+import tempfile
+import shutil
+from unittest.mock import patch
+
+from backend.core.notification_backends import (
+    FileBackend, MemoryBackend, NotifySendBackend, OsascriptBackend, create_backend, default_backend_name
+)
+
+
+class TestNotificationBackends(unittest.TestCase):
+
+    @patch('subprocess.run')
+    def test_osascript(self, mock_run):
+        OsascriptBackend().deliver("Title", "Message")
+
+        args = mock_run.call_args[0][0]
+        self.assertEqual(args[:2], ["osascript", "-e"])
+        self.assertIn('with title "Title"', args[2])
+
+    @patch('subprocess.run')
+    def test_notify_send(self, mock_run):
+        NotifySendBackend().deliver("Title", "Message")
+
+        mock_run.assert_called_once_with(["notify-send", "Title", "Message"])
+
+    def test_memory(self):
+        backend = MemoryBackend()
+
+        backend.deliver("Title", "Message")
+
+        self.assertEqual(backend.delivered, [("Title", "Message")])
+
+    def test_file(self):
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        path = os.path.join(test_dir, 'notifications.jsonl')
+        backend = FileBackend(path)
+
+        backend.deliver("Title 1", "Message 1")
+        backend.deliver("Title 2", "Message 2")
+
+        with open(path, 'r') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([line["title"] for line in lines], ["Title 1", "Title 2"])
+
+    def test_default_backend_follows_platform(self):
+        for platform, name in (("darwin", "osascript"), ("linux", "notify-send"), ("win32", "desktop-notifier")):
+            with self.subTest(platform=platform), patch('backend.core.notification_backends.sys.platform', platform):
+                self.assertEqual(default_backend_name(), name)
+
+    def test_create_backend(self):
+        self.assertIsInstance(create_backend("memory"), MemoryBackend)
+        with self.assertRaises(ValueError):
+            create_backend("carrier-pigeon")
+
+
+if __name__ == '__main__':
+    unittest.main()
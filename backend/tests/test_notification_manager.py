@@ -1,7 +1,9 @@
 import unittest
 import time
+import threading
 from unittest.mock import patch
 from backend.core.notification_manager import NotificationManager
+from backend.core.notification_backends import MemoryBackend
 
 
 class TestNotificationManager(unittest.TestCase):
@@ -9,17 +11,29 @@ class TestNotificationManager(unittest.TestCase):
     def setUp(self):
         NotificationManager._instance = None
 
+    @patch('backend.core.notification_backends.sys.platform', 'linux')
+    @patch('subprocess.run')
+    def test_linux_defaults_to_notify_send(self, mock_run):
+        manager = NotificationManager()
+
+        manager.send("Test Title", "Test Message")
+        manager.flush()
+
+        self.assertEqual(mock_run.call_args[0][0], ["notify-send", "Test Title", "Test Message"])
+
     def test_singleton_pattern(self):
         manager1 = NotificationManager()
         manager2 = NotificationManager()
 
         self.assertIs(manager1, manager2)
 
+    @patch('backend.core.notification_backends.sys.platform', 'darwin')
     @patch('subprocess.run')
     def test_send_notification(self, mock_run):
         manager = NotificationManager()
 
         result = manager.send("Test Title", "Test Message")
+        manager.flush()
 
         self.assertTrue(result)
         mock_run.assert_called_once()
@@ -40,6 +54,7 @@ class TestNotificationManager(unittest.TestCase):
         result2 = manager.send("Title", "Message")
         self.assertFalse(result2)
 
+        manager.flush()
         mock_run.assert_called_once()
 
     @patch('subprocess.run')
@@ -54,8 +69,10 @@ class TestNotificationManager(unittest.TestCase):
         result2 = manager.send("Title", "Message")
         self.assertTrue(result2)
 
+        manager.flush()
         self.assertEqual(mock_run.call_count, 2)
 
+    @patch('backend.core.notification_backends.sys.platform', 'darwin')
     @patch('subprocess.run')
     def test_different_notifications_no_cooldown(self, mock_run):
         manager = NotificationManager()
@@ -67,7 +84,126 @@ class TestNotificationManager(unittest.TestCase):
         self.assertTrue(result1)
         self.assertTrue(result2)
         self.assertTrue(result3)
-        self.assertEqual(mock_run.call_count, 3)
+        manager.flush()
+
+        # a burst is coalesced into a single delivery
+        self.assertEqual(mock_run.call_count, 1)
+        script = mock_run.call_args[0][0][2]
+        self.assertIn("Title 1: Message 1", script)
+        self.assertIn("Title 2: Message 2", script)
+        self.assertIn("Title 1: Message 2", script)
+
+
+class SlowBackend(MemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def deliver(self, title, message):
+        self.release.wait(2)
+        super().deliver(title, message)
+
+
+class FailingBackend:
+    def deliver(self, title, message):
+        raise OSError("no notification daemon")
+
+
+class TestNotificationQueue(unittest.TestCase):
+
+    def setUp(self):
+        NotificationManager._instance = None
+        self.manager = NotificationManager()
+
+    def test_send_does_not_wait_for_delivery(self):
+        backend = SlowBackend()
+        self.manager.backend = backend
+
+        start = time.monotonic()
+        self.assertTrue(self.manager.send("Title", "Message"))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(backend.delivered, [])
+
+        backend.release.set()
+        self.manager.flush()
+        self.assertEqual(backend.delivered, [("Title", "Message")])
+
+    def test_delivered_in_order(self):
+        backend = MemoryBackend()
+        self.manager.backend = backend
+        self.manager.COALESCE_WINDOW = 0
+
+        for index in range(3):
+            self.manager.send(f"Title {index}", f"Message {index}")
+            self.manager.flush()
+
+        self.assertEqual(backend.delivered, [(f"Title {i}", f"Message {i}") for i in range(3)])
+
+    def test_burst_coalesced(self):
+        backend = MemoryBackend()
+        self.manager.backend = backend
+
+        self.manager.send("Distance Alert", "You are too close! Move back a bit.")
+        self.manager.send("Eye Strain Alert", "Relax your eyes.")
+        self.manager.flush()
+
+        self.assertEqual(len(backend.delivered), 1)
+        title, message = backend.delivered[0]
+        self.assertEqual(title, "2 alerts")
+        self.assertIn("Distance Alert: You are too close! Move back a bit.", message)
+        self.assertIn("Eye Strain Alert: Relax your eyes.", message)
+
+    def test_duplicates_rejected_within_cooldown(self):
+        self.manager.backend = MemoryBackend()
+
+        self.assertTrue(self.manager.send("Title", "Message"))
+        self.assertFalse(self.manager.send("Title", "Message"))
+
+        self.assertEqual(self.manager.stats()["rejected_duplicates"], 1)
+
+    def test_rate_limited_per_title(self):
+        self.manager.backend = MemoryBackend()
+
+        results = [self.manager.send("Screen Time Alert", f"{minutes} minutes left") for minutes in (30, 15, 5, 1)]
+
+        self.assertEqual(results, [True, True, True, False])
+        self.assertTrue(self.manager.send("Bedtime Reminder", "1 minute left"))
+        self.assertEqual(self.manager.stats()["rejected_rate_limited"], 1)
+
+    def test_stats(self):
+        backend = SlowBackend()
+        self.manager.backend = backend
+
+        self.manager.send("Title", "Message 1")
+        self.manager.send("Title", "Message 2")
+        self.manager.send("Title", "Message 3")
+        backend.release.set()
+        self.manager.flush()
+
+        stats = self.manager.stats()
+        self.assertEqual(stats["delivered"], 1)
+        self.assertEqual(stats["coalesced"], 2)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["cooldown_entries"], 3)
+        self.assertGreater(stats["latency_ms_max"], 0)
+
+    def test_failed_delivery_counted(self):
+        self.manager.backend = FailingBackend()
+
+        self.manager.send("Title", "Message")
+        self.manager.flush()
+
+        self.assertEqual(self.manager.stats()["failed"], 1)
+
+    def test_close_delivers_pending(self):
+        backend = MemoryBackend()
+        self.manager.backend = backend
+
+        self.manager.send("Title", "Message")
+        self.manager.close()
+
+        self.assertEqual(backend.delivered, [("Title", "Message")])
+        self.assertFalse(self.manager._worker.is_alive())
 
 
 class TestNotificationManagerThreadSafety(unittest.TestCase):
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from backend.core.presence_channel import PresenceChannel
+
+
+class TestPresenceChannel(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, 'presence.bin')
+        self.publisher = PresenceChannel(self.path)
+        self.reader = PresenceChannel(self.path)
+
+    def tearDown(self):
+        self.publisher.close()
+        self.reader.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_nothing_published(self):
+        self.assertIsNone(self.reader.read())
+        self.assertEqual(self.reader.absent_total(), 0.0)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_seen_face_is_present(self):
+        self.assertTrue(self.publisher.publish(True, now=1000.0))
+
+        presence = self.reader.read(now=1001.0)
+        self.assertTrue(presence.present)
+        self.assertEqual(presence.present_since, 1000.0)
+
+    def test_short_look_away_still_present(self):
+        self.publisher.publish(True, now=1000.0)
+
+        self.assertTrue(self.publisher.publish(False, now=1010.0))
+        self.assertFalse(self.publisher.publish(False, now=1000.0 + PresenceChannel.ABSENT_AFTER))
+        self.assertFalse(self.reader.read(now=1025.0).present)
+
+    def test_absent_time_accumulates(self):
+        self.publisher.publish(True, now=1000.0)
+        self.publisher.publish(False, now=1030.0)
+        self.publisher.publish(False, now=1060.0)
+        self.publisher.publish(True, now=1090.0)
+
+        self.assertEqual(self.reader.absent_total(), 60.0)
+        presence = self.reader.read(now=1090.0)
+        self.assertTrue(presence.present)
+        self.assertEqual(presence.present_since, 1090.0)
+
+    def test_stale_publisher(self):
+        self.publisher.publish(True, now=1000.0)
+
+        self.assertIsNone(self.reader.read(now=1000.0 + PresenceChannel.STALE_SECONDS + 1))
+
+    def test_gap_while_stopped_not_counted(self):
+        self.publisher.publish(False, now=1000.0)
+        self.publisher.publish(False, now=5000.0)
+
+        self.assertEqual(self.reader.absent_total(), 0.0)
+
+    def test_torn_record_rejected(self):
+        self.publisher.publish(True, now=1000.0)
+        PresenceChannel.SEQUENCE.pack_into(self.publisher._map, 0, 3)
+
+        self.assertIsNone(self.reader.read(now=1001.0))
+        self.publisher.publish(True, now=1002.0)
+        self.assertTrue(self.reader.read(now=1002.0).present)
+
+
+if __name__ == '__main__':
+    unittest.main()
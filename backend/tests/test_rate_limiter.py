@@ -0,0 +1,56 @@
+import unittest
+
+from backend.core.rate_limiter import TokenBucket, TtlCache
+
+
+class TestTtlCache(unittest.TestCase):
+
+    def test_key_forgotten_after_ttl(self):
+        cache = TtlCache(ttl=5)
+
+        self.assertTrue(cache.add_if_absent("key", now=0))
+        self.assertFalse(cache.add_if_absent("key", now=4.9))
+        self.assertTrue(cache.add_if_absent("key", now=5.0))
+
+    def test_expired_keys_evicted(self):
+        cache = TtlCache(ttl=5)
+
+        for index in range(100):
+            cache.add_if_absent(f"message {index}", now=index)
+
+        self.assertEqual(len(cache), 5)
+        self.assertNotIn("message 0", cache)
+        self.assertIn("message 99", cache)
+
+    def test_size_bounded(self):
+        cache = TtlCache(ttl=60, max_size=10)
+
+        for index in range(100):
+            cache.add_if_absent(f"message {index}", now=0)
+
+        self.assertEqual(len(cache), 10)
+        self.assertIn("message 99", cache)
+        self.assertNotIn("message 89", cache)
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(capacity=3, rate=1 / 60, now=0)
+
+        self.assertEqual([bucket.consume(now=0) for _ in range(4)], [True, True, True, False])
+        self.assertFalse(bucket.consume(now=30))
+        self.assertTrue(bucket.consume(now=60))
+        self.assertFalse(bucket.consume(now=61))
+
+    def test_refill_capped_at_capacity(self):
+        bucket = TokenBucket(capacity=2, rate=1, now=0)
+
+        bucket.consume(now=0)
+        bucket.consume(now=1000)
+
+        self.assertAlmostEqual(bucket.tokens, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import cv2
+import numpy as np
+
+from backend.core.roi_tracker import RoiTracker, mirror_boxes, mirror_keypoints, offset_boxes, offset_keypoints
+
+
+class TestRoiTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = RoiTracker()
+        self.frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    def test_full_frame_without_track(self):
+        image, offset = self.tracker.crop(self.frame)
+
+        self.assertIs(image, self.frame)
+        self.assertEqual(offset, (0, 0))
+        self.assertEqual(self.tracker.predict_kwargs(), {})
+
+    def test_crop_after_detection(self):
+        boxes = np.array([[300, 200, 360, 260]], dtype=np.float32)
+        self.tracker.update(boxes, np.array([0.9]), self.frame.shape)
+
+        image, offset = self.tracker.crop(self.frame)
+        x1, y1, x2, y2 = self.tracker.roi
+
+        self.assertEqual(offset, (x1, y1))
+        self.assertEqual(image.shape[:2], (y2 - y1, x2 - x1))
+        self.assertLessEqual(x1, 300)
+        self.assertGreaterEqual(x2, 360)
+        self.assertEqual(self.tracker.predict_kwargs(), {"imgsz": RoiTracker.CROP_IMGSZ})
+
+    def test_roi_clipped_to_frame(self):
+        boxes = np.array([[0, 0, 50, 40]], dtype=np.float32)
+        self.tracker.update(boxes, np.array([0.9]), self.frame.shape)
+
+        x1, y1, x2, y2 = self.tracker.roi
+        self.assertEqual((x1, y1), (0, 0))
+        self.assertLessEqual(x2, 640)
+        self.assertGreaterEqual(x2 - x1, 50)
+
+    def test_roi_covers_all_boxes(self):
+        boxes = np.array([[240, 285, 280, 300], [320, 285, 360, 300]], dtype=np.float32)
+        self.tracker.update(boxes, np.array([0.8, 0.7]), self.frame.shape)
+
+        x1, y1, x2, y2 = self.tracker.roi
+        self.assertLessEqual(x1, 240)
+        self.assertGreaterEqual(x2, 360)
+
+    def test_low_confidence_loses_track(self):
+        boxes = np.array([[300, 200, 360, 260]], dtype=np.float32)
+        self.tracker.update(boxes, np.array([0.1]), self.frame.shape)
+
+        self.assertFalse(self.tracker.is_tracking)
+
+    def test_scheduled_full_frame_redetect(self):
+        boxes = np.array([[300, 200, 360, 260]], dtype=np.float32)
+        self.tracker.update(boxes, np.array([0.9]), self.frame.shape)
+
+        for _ in range(RoiTracker.REDETECT_INTERVAL):
+            image, _ = self.tracker.crop(self.frame)
+            self.assertIsNot(image, self.frame)
+
+        image, offset = self.tracker.crop(self.frame)
+        self.assertIs(image, self.frame)
+        self.assertEqual(offset, (0, 0))
+
+    def test_disabled_tracker_never_crops(self):
+        tracker = RoiTracker(enabled=False)
+        tracker.update(np.array([[300, 200, 360, 260]], dtype=np.float32), np.array([0.9]), self.frame.shape)
+
+        image, _ = tracker.crop(self.frame)
+        self.assertIs(image, self.frame)
+
+    def test_offsets_map_back_to_full_frame(self):
+        boxes = np.array([[10, 20, 30, 40]], dtype=np.float32)
+        keypoints = np.array([[[5, 6, 0.9], [7, 8, 0.8]]], dtype=np.float32)
+
+        np.testing.assert_array_equal(offset_boxes(boxes, (100, 50)), [[110, 70, 130, 90]])
+        np.testing.assert_array_equal(offset_keypoints(keypoints, (100, 50)),
+                                      np.array([[[105, 56, 0.9], [107, 58, 0.8]]], dtype=np.float32))
+
+    def test_mirrors_match_flipped_pixels(self):
+        frame = np.zeros((48, 64), dtype=np.uint8)
+        frame[10:20, 5:15] = 255
+        boxes = np.array([[5, 10, 15, 20]], dtype=np.float32)
+        keypoints = np.array([[[5.5, 10.5, 0.9]]], dtype=np.float32)
+
+        # the box and the keypoint land on the same pixels cv2.flip moves them to
+        flipped = cv2.flip(frame, 1)
+        x1, y1, x2, y2 = mirror_boxes(boxes, 64)[0].astype(int)
+        self.assertEqual(int(flipped[y1:y2, x1:x2].min()), 255)
+        self.assertEqual(int(flipped.sum()), 255 * 100)
+        x, y, confidence = mirror_keypoints(keypoints, 64)[0, 0]
+        self.assertEqual(flipped[int(y), int(x)], 255)
+        self.assertAlmostEqual(float(confidence), 0.9, places=5)
+        np.testing.assert_array_equal(boxes, [[5, 10, 15, 20]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import unittest
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+from backend.core.scheduler import Scheduler
+from backend.core.settings_manager import SettingsManager
+from backend.core.notification_manager import NotificationManager
+
+
+class FakeFeature:
+    instances = []
+
+    def __init__(self, interval=0.01, fail=False):
+        self.interval = interval
+        self.fail = fail
+        self.checks = 0
+        self.changes = []
+        self.stopped = False
+        FakeFeature.instances.append(self)
+
+    def start(self):
+        return 0
+
+    def check(self):
+        self.checks += 1
+        if self.fail:
+            raise RuntimeError("broken")
+        return self.interval
+
+    def reconfigure(self, changes):
+        self.changes.append(changes)
+        return self.interval
+
+    def stop(self):
+        self.stopped = True
+
+
+class TestScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        SettingsManager._instance = None
+        NotificationManager._instance = None
+        FakeFeature.instances = []
+
+        self.enabled = {"fast": True, "slow": True}
+        self.values = {"slow_interval": 1}
+
+        self.scheduler = Scheduler(
+            {"fast": FakeFeature, "slow": lambda: FakeFeature(interval=60)},
+            {"slow": ["slow_interval"]},
+        )
+        self.scheduler.settings = MagicMock()
+        self.scheduler.settings.is_feature_enabled.side_effect = lambda name: self.enabled[name]
+        self.scheduler.settings.get.side_effect = lambda key, default=None: self.values.get(key, default)
+        self.scheduler.notifier = MagicMock()
+
+    def tearDown(self):
+        SettingsManager._instance = None
+        NotificationManager._instance = None
+
+    async def test_features_run_in_one_loop(self):
+        await self.scheduler.sync_with_settings()
+        await asyncio.sleep(0.1)
+
+        fast, slow = FakeFeature.instances
+        self.assertGreater(fast.checks, 3)
+        self.assertEqual(slow.checks, 1)
+        self.assertGreater(self.scheduler.wakeups["fast"], self.scheduler.wakeups["slow"])
+
+        await self.scheduler.stop_all()
+        self.assertTrue(fast.stopped)
+        self.assertTrue(slow.stopped)
+
+    async def test_stop_one_feature(self):
+        await self.scheduler.sync_with_settings()
+        await asyncio.sleep(0.02)
+
+        self.enabled["fast"] = False
+        await self.scheduler.sync_with_settings()
+
+        self.assertFalse(self.scheduler.is_running("fast"))
+        self.assertTrue(self.scheduler.is_running("slow"))
+        self.assertTrue(FakeFeature.instances[0].stopped)
+
+        await self.scheduler.stop_all()
+
+    async def test_config_change_reconfigures_in_place(self):
+        await self.scheduler.sync_with_settings()
+        await asyncio.sleep(0.02)
+        slow = FakeFeature.instances[1]
+
+        self.scheduler.apply_changes({"slow_interval": 2})
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(slow.changes, [{"slow_interval": 2}])
+        self.assertFalse(slow.stopped)
+        self.assertEqual(len(FakeFeature.instances), 2)
+        self.assertEqual(FakeFeature.instances[0].changes, [])
+
+        await self.scheduler.stop_all()
+
+    async def test_enable_change_syncs(self):
+        self.assertFalse(self.scheduler.settings_changed.is_set())
+
+        self.scheduler.apply_changes({"fast_enable": False})
+
+        self.assertTrue(self.scheduler.settings_changed.is_set())
+
+    async def test_failing_feature_does_not_stop_others(self):
+        self.scheduler.features["fast"] = lambda: FakeFeature(fail=True)
+
+        await self.scheduler.sync_with_settings()
+        await asyncio.sleep(0.05)
+
+        self.assertFalse(self.scheduler.is_running("fast"))
+        self.assertTrue(self.scheduler.is_running("slow"))
+        self.scheduler.notifier.send.assert_called_once()
+
+        await self.scheduler.stop_all()
+
+    async def test_stop_waits_for_check_in_progress(self):
+        events = []
+        checking = threading.Event()
+
+        class SlowCheck(FakeFeature):
+            def check(self):
+                checking.set()
+                time.sleep(0.1)
+                events.append("check done")
+                return 60
+
+            def stop(self):
+                events.append("stop")
+
+        self.enabled["slow"] = False
+        self.scheduler.features["fast"] = SlowCheck
+        await self.scheduler.sync_with_settings()
+        await asyncio.to_thread(checking.wait, 1)
+
+        await self.scheduler.stop("fast")
+
+        self.assertEqual(events, ["check done", "stop"])
+
+    async def test_feature_started_during_cancel_is_stopped(self):
+        starting = threading.Event()
+
+        class SlowStart(FakeFeature):
+            def start(self):
+                starting.set()
+                time.sleep(0.1)
+                return 60
+
+        self.enabled["slow"] = False
+        self.scheduler.features["fast"] = SlowStart
+        await self.scheduler.sync_with_settings()
+        await asyncio.to_thread(starting.wait, 1)
+
+        await self.scheduler.stop("fast")
+
+        self.assertTrue(FakeFeature.instances[0].stopped)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
+import io
 import unittest
 import os
 import json
 import tempfile
-from backend.core.settings_manager import SettingsManager
+from unittest.mock import patch
+from backend.core.settings_manager import SettingsManager, main
 
 
 class TestSettingsManager(unittest.TestCase):
@@ -110,6 +112,195 @@ class TestSettingsManager(unittest.TestCase):
 
         self.assertEqual(saved_settings['test_key'], 'test_value')
 
+    def test_reload_if_changed(self):
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'night_limit_time': '22:00'})
+
+        self.assertFalse(manager.reload_if_changed())
+
+        with open(self.settings_file, 'w') as f:
+            json.dump({'night_limit_time': '23:30'}, f)
+        os.utime(self.settings_file, (0, manager._last_modification_time + 1))
+
+        self.assertTrue(manager.reload_if_changed())
+        self.assertEqual(manager.get('night_limit_time'), '23:30')
+
+    def test_update_batches_changes(self):
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'night_limit_time': '22:00'})
+
+        self.assertTrue(manager.update({'night_limit_time': '23:00', 'daily_limit_time': 5}))
+
+        with open(self.settings_file, 'r') as f:
+            self.assertEqual(json.load(f), {'night_limit_time': '23:00', 'daily_limit_time': 5})
+
+    def test_unchanged_update_skips_write(self):
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'night_limit_time': '22:00'})
+
+        with patch.object(manager, '_write') as mock_write:
+            self.assertFalse(manager.update({'night_limit_time': '22:00'}))
+            self.assertFalse(manager.save({'night_limit_time': '22:00'}))
+
+        mock_write.assert_not_called()
+
+    def test_update_keeps_keys_written_by_other_processes(self):
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'night_limit_time': '22:00'})
+
+        # the settings window saves while this process still holds the old settings
+        with open(self.settings_file, 'w') as f:
+            json.dump({'night_limit_time': '22:00', 'daily_limit_time': 6}, f)
+
+        manager.set('distance_check_area', 1011)
+
+        with open(self.settings_file, 'r') as f:
+            saved_settings = json.load(f)
+        self.assertEqual(saved_settings['daily_limit_time'], 6)
+        self.assertEqual(saved_settings['distance_check_area'], 1011)
+
+    def test_writes_are_atomic(self):
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'night_limit_time': '22:00'})
+
+        with patch('json.dump', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                manager.set('night_limit_time', '23:00')
+
+        with open(self.settings_file, 'r') as f:
+            self.assertEqual(json.load(f), {'night_limit_time': '22:00'})
+        self.assertEqual([name for name in os.listdir(self.test_dir) if name.endswith('.tmp')], [])
+
+    def test_concurrent_updates_from_processes(self):
+        import subprocess
+        import sys
+
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({})
+
+        script = (
+            "import sys\n"
+            "from backend.core.settings_manager import SettingsManager\n"
+            "manager = SettingsManager()\n"
+            "manager.settings_file = sys.argv[1]\n"
+            "for i in range(20):\n"
+            "    manager.set(f'{sys.argv[2]}_{i}', i)\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        processes = [
+            subprocess.Popen([sys.executable, "-c", script, self.settings_file, name], cwd=root)
+            for name in ("first", "second")
+        ]
+        for process in processes:
+            self.assertEqual(process.wait(), 0)
+
+        with open(self.settings_file, 'r') as f:
+            saved_settings = json.load(f)
+        self.assertEqual(len(saved_settings), 40)
+
+    def test_main_merges_changes_from_stdin_under_lock(self):
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'distance_check_area': 1011})
+
+        with patch('sys.stdin', io.StringIO(json.dumps({'daily_limit_time': 6}))), \
+                patch.object(manager, '_file_lock', wraps=manager._file_lock) as mock_lock:
+            main()
+
+        mock_lock.assert_called_once()
+        with open(self.settings_file, 'r') as f:
+            self.assertEqual(json.load(f), {'distance_check_area': 1011, 'daily_limit_time': 6})
+
+    def test_subscribers_get_changed_keys(self):
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'night_limit_time': '22:00', 'daily_limit_time': 4})
+
+        changes = []
+        token = manager.subscribe(['night_limit_time'], changes.append)
+
+        manager.set('daily_limit_time', 5)
+        manager.set('night_limit_time', '23:00')
+        manager.set('night_limit_time', '23:00')
+        manager.unsubscribe(token)
+        manager.set('night_limit_time', '21:00')
+
+        self.assertEqual(changes, [{'night_limit_time': '23:00'}])
+
+    def test_subscribers_get_external_changes(self):
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'night_limit_time': '22:00'})
+
+        changes = []
+        token = manager.subscribe(['night_limit_time'], changes.append)
+        self.addCleanup(manager.unsubscribe, token)
+
+        with open(self.settings_file, 'w') as f:
+            json.dump({'night_limit_time': '23:30'}, f)
+        os.utime(self.settings_file, (0, manager._last_modification_time + 1))
+        manager.reload_if_changed()
+
+        self.assertEqual(changes, [{'night_limit_time': '23:30'}])
+
+    def test_failing_subscriber_does_not_stop_others(self):
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'night_limit_time': '22:00'})
+
+        changes = []
+
+        def broken(_):
+            raise RuntimeError("broken")
+
+        tokens = [manager.subscribe(['night_limit_time'], broken), manager.subscribe(['night_limit_time'], changes.append)]
+        for token in tokens:
+            self.addCleanup(manager.unsubscribe, token)
+
+        manager.set('night_limit_time', '23:00')
+
+        self.assertEqual(changes, [{'night_limit_time': '23:00'}])
+
+    def test_watch_picks_up_changes(self):
+        import threading
+
+        manager = SettingsManager()
+        manager.path = self.test_dir
+        manager.settings_file = self.settings_file
+        manager.save({'night_limit_time': '22:00'})
+
+        changed = threading.Event()
+        token = manager.subscribe(['night_limit_time'], lambda changes: changed.set())
+        self.addCleanup(manager.unsubscribe, token)
+        manager.watch()
+        self.addCleanup(manager.stop_watching)
+
+        # another process replaces the file
+        temp_file = self.settings_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump({'night_limit_time': '23:30'}, f)
+        os.utime(temp_file, (0, manager._last_modification_time + 1))
+        os.replace(temp_file, self.settings_file)
+
+        self.assertTrue(changed.wait(3))
+        self.assertEqual(manager.get('night_limit_time'), '23:30')
+
     def test_is_feature_enabled(self):
         manager = SettingsManager()
         manager.path = self.test_dir
@@ -0,0 +1,164 @@
+import unittest
+from collections import deque
+
+import numpy as np
+
+from backend.core.streaming_stats import Ewma, Kalman1D, MedianFilter, RollingWindow, SignalSmoother, robust_baseline
+
+
+class TestRollingWindow(unittest.TestCase):
+    def test_matches_numpy_over_the_last_samples(self):
+        values = np.random.default_rng(0).normal(1000, 50, 1003)
+        window = RollingWindow(5)
+
+        for value in values:
+            window.append(value)
+
+        last = values[-5:]
+        self.assertTrue(window.full)
+        self.assertAlmostEqual(window.mean, last.mean(), places=6)
+        self.assertAlmostEqual(window.variance, last.var(), places=3)
+        self.assertAlmostEqual(window.median(), float(np.median(last)))
+        np.testing.assert_allclose(window.ordered(), last)
+
+    def test_partly_filled(self):
+        window = RollingWindow(5)
+        window.append(1.0)
+        window.append(3.0)
+
+        self.assertEqual(len(window), 2)
+        self.assertEqual(window.mean, 2.0)
+        self.assertEqual(window.variance, 1.0)
+        np.testing.assert_array_equal(window.ordered(), [1.0, 3.0])
+
+    def test_clear(self):
+        window = RollingWindow(3)
+        window.append(4.0)
+        window.clear()
+
+        self.assertEqual(len(window), 0)
+        self.assertEqual(window.mean, 0.0)
+        self.assertEqual(window.median(), 0.0)
+
+
+class TestEwma(unittest.TestCase):
+    def test_starts_at_first_sample(self):
+        ewma = Ewma(0.5)
+
+        self.assertEqual(ewma.update(10), 10)
+        self.assertEqual(ewma.update(20), 15)
+
+        ewma.reset()
+        self.assertIsNone(ewma.value)
+
+    def test_half_life(self):
+        ewma = Ewma.from_half_life(3)
+        ewma.update(0)
+        for _ in range(3):
+            ewma.update(1)
+
+        self.assertAlmostEqual(ewma.value, 0.5)
+
+
+class TestMedianFilter(unittest.TestCase):
+    def test_single_outlier_dropped(self):
+        median = MedianFilter(3)
+        outputs = [median.update(value) for value in (1.0, 1.0, 5.0, 1.0)]
+
+        self.assertEqual(outputs, [1.0, 1.0, 1.0, 1.0])
+
+
+class TestKalman1D(unittest.TestCase):
+    def test_first_measurement_taken_as_is(self):
+        kalman = Kalman1D(0.01, 1.0)
+
+        self.assertEqual(kalman.update(7.0), 7.0)
+        self.assertEqual(kalman.variance, 1.0)
+
+    def test_converges_to_steady_gain(self):
+        kalman = Kalman1D(0.0025 * 0.4, 0.0025)
+        for _ in range(50):
+            kalman.update(1.0)
+
+        # steady state of a random walk with these variances
+        ratio = 0.4
+        predicted = (ratio + np.sqrt(ratio ** 2 + 4 * ratio)) / 2
+        self.assertAlmostEqual(kalman.gain, predicted / (predicted + 1), places=6)
+        self.assertAlmostEqual(kalman.estimate, 1.0)
+
+    def test_noise_reduced(self):
+        rng = np.random.default_rng(1)
+        kalman = Kalman1D(0.0, 1.0)
+        estimates = [kalman.update(value) for value in rng.normal(5.0, 1.0, 400)]
+
+        self.assertAlmostEqual(estimates[-1], 5.0, delta=0.2)
+        self.assertLess(kalman.variance, 0.01)
+
+
+class TestSignalSmoother(unittest.TestCase):
+    def setUp(self):
+        # relative signal around 1.0 with 5% noise and occasional outliers, like missed keypoints or a blink
+        rng = np.random.default_rng(2)
+        self.signal = 1 + 0.05 * rng.standard_normal(5000)
+        outliers = rng.random(5000) < 0.05
+        self.signal[outliers] += rng.choice([-0.4, 0.6], outliers.sum())
+
+    @staticmethod
+    def moving_mean(values, size=5):
+        window = deque(maxlen=size)
+        return np.array([(window.append(value), np.mean(window))[1] for value in values])
+
+    def test_fewer_false_alarms_than_moving_mean(self):
+        smoother = SignalSmoother()
+        smoothed = np.array([smoother.update(value) for value in self.signal])
+        averaged = self.moving_mean(self.signal)
+
+        self.assertLess((smoothed > 1.2).mean(), (averaged > 1.2).mean() / 1.5)
+        self.assertLess(smoothed.std(), averaged.std())
+
+    def test_posture_change_registers_sooner(self):
+        def samples_until_alert(update):
+            for sample in range(1, 10):
+                if update(1.5) > 1.2:
+                    return sample
+
+        smoother = SignalSmoother()
+        window = deque([1.0] * 5, maxlen=5)
+        for _ in range(10):
+            smoother.update(1.0)
+
+        self.assertEqual(samples_until_alert(smoother.update), 2)
+        self.assertEqual(samples_until_alert(lambda value: (window.append(value), np.mean(window))[1]), 3)
+
+    def test_reset(self):
+        smoother = SignalSmoother()
+        smoother.update(2.0)
+        smoother.reset()
+
+        self.assertIsNone(smoother.value)
+        self.assertEqual(len(smoother), 0)
+        self.assertEqual(smoother.update(1.0), 1.0)
+
+
+class TestRobustBaseline(unittest.TestCase):
+    def test_outliers_move_neither_baseline_nor_variance(self):
+        samples = [100.0, 101.0, 99.0, 100.0, 102.0, 98.0, 100.0, 101.0, 99.0, 100.0]
+        blinked = samples[:-2] + [20.0, 400.0]
+
+        baseline, variance = robust_baseline(samples)
+        blinked_baseline, blinked_variance = robust_baseline(blinked)
+
+        self.assertEqual(baseline, 100.0)
+        self.assertEqual(blinked_baseline, 100.0)
+        self.assertLess(blinked_variance, 2.0)
+        self.assertGreater(np.var(blinked), 1000)
+
+    def test_columns_handled_separately(self):
+        baseline, variance = robust_baseline([[1.8, 2.0], [1.9, 2.1], [2.0, 2.2]], trim=0.0)
+
+        np.testing.assert_allclose(baseline, [1.9, 2.1])
+        np.testing.assert_allclose(variance, [0.02 / 3, 0.02 / 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
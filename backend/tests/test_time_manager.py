@@ -1,4 +1,5 @@
 import unittest
+from datetime import datetime, timedelta
 from backend.core.time_manager import TimeManager
 
 
@@ -121,5 +122,48 @@ class TestTimeManagerFormatConsistency(unittest.TestCase):
         self.assertEqual(result2, result3)
 
 
+class TestTimetable(unittest.TestCase):
+
+    def setUp(self):
+        self.time_manager = TimeManager()
+        self.deadline = datetime(2024, 5, 1, 22, 0)
+        self.timetable = self.time_manager.build_timetable(self.deadline)
+
+    def test_timetable_sorted_around_deadline(self):
+        times = [event.time for event in self.timetable]
+
+        self.assertEqual(times, sorted(times))
+        self.assertEqual(len(self.timetable), 2 * len(self.time_manager.WARNING_MINUTES) + 1)
+        self.assertEqual(self.timetable[0].time, self.deadline - timedelta(minutes=120))
+        self.assertEqual(self.timetable[0].kind, "warning")
+        self.assertEqual(self.timetable[-1].kind, "over")
+        self.assertIn((self.deadline, "limit", 0), self.timetable)
+
+    def test_next_event_index(self):
+        index = self.time_manager.next_event_index(self.timetable, datetime(2024, 5, 1, 21, 50))
+
+        self.assertEqual(self.timetable[index].time, datetime(2024, 5, 1, 21, 55))
+        self.assertEqual(self.timetable[index].minutes, 5)
+
+    def test_event_at_now_is_due(self):
+        index = self.time_manager.next_event_index(self.timetable, self.deadline)
+
+        self.assertEqual(self.timetable[index - 1].kind, "limit")
+
+    def test_seconds_until_next_event(self):
+        now = datetime(2024, 5, 1, 21, 54, 30)
+        index = self.time_manager.next_event_index(self.timetable, now)
+
+        self.assertEqual(self.time_manager.seconds_until(self.timetable, index, now), 30)
+
+    def test_sleep_capped(self):
+        now = datetime(2024, 5, 1, 12, 0)
+
+        self.assertEqual(self.time_manager.seconds_until(self.timetable, 0, now), self.time_manager.MAX_SLEEP)
+        self.assertEqual(
+            self.time_manager.seconds_until(self.timetable, len(self.timetable), now), self.time_manager.MAX_SLEEP
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
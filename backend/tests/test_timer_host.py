@@ -0,0 +1,45 @@
+import asyncio
+import os
+import signal
+import unittest
+from unittest.mock import MagicMock, patch
+
+from backend.features.timer_host import run_timer_host
+
+
+class TestTimerHost(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.addCleanup(signal.signal, signal.SIGTERM, signal.getsignal(signal.SIGTERM))
+        scheduler = MagicMock()
+        scheduler.run = lambda: asyncio.Event().wait()  # runs until cancelled
+
+        scheduler_patcher = patch('backend.features.timer_host.Scheduler', return_value=scheduler)
+        metrics_patcher = patch('backend.features.timer_host.Metrics')
+        scheduler_patcher.start()
+        self.metrics = metrics_patcher.start().return_value
+        self.addCleanup(scheduler_patcher.stop)
+        self.addCleanup(metrics_patcher.stop)
+
+    async def terminate(self):
+        host = asyncio.create_task(run_timer_host())
+        await asyncio.sleep(0.01)
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(host, 1)
+
+    async def test_sigterm_stops_host(self):
+        await self.terminate()
+
+        self.metrics.export.assert_called_once()
+
+    async def test_sigterm_stops_host_without_loop_signal_handlers(self):
+        # as on Windows
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, 'add_signal_handler', side_effect=NotImplementedError):
+            await self.terminate()
+
+        self.metrics.export.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from backend.core.usage_journal import UsageJournal
+
+
+class TestUsageJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, 'daily_usage.journal')
+        self.journal = UsageJournal(self.path)
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_append_and_replay(self):
+        self.journal.append(60, 1000.0)
+        self.journal.append(30, 2000.0)
+        self.journal.sync()
+
+        self.assertEqual(self.journal.replay(), 90)
+        self.assertEqual(self.journal.replay(since=1500.0), 30)
+
+    def test_records_are_fixed_size(self):
+        for index in range(5):
+            self.journal.append(60, 1000.0 + index)
+        self.journal.sync()
+
+        self.assertEqual(os.path.getsize(self.path), 5 * UsageJournal.RECORD.size)
+
+    def test_fsync_batched(self):
+        for index in range(UsageJournal.FSYNC_RECORDS * 3):
+            self.journal.append(1, 1000.0 + index)
+
+        self.assertEqual(self.journal.fsyncs, 3)
+
+    def test_partial_record_ignored(self):
+        self.journal.append(60, 1000.0)
+        self.journal.close()
+        with open(self.path, 'ab') as f:
+            f.write(b'\x01\x02\x03')
+
+        journal = UsageJournal(self.path)
+        self.assertEqual(journal.replay(), 60)
+
+        journal.append(30, 2000.0)
+        journal.close()
+        self.assertEqual(journal.replay(), 90)
+
+    def test_truncate(self):
+        for index in range(UsageJournal.COMPACT_RECORDS):
+            self.journal.append(1, 1000.0 + index)
+        self.assertTrue(self.journal.needs_compaction())
+
+        self.journal.truncate()
+
+        self.assertFalse(self.journal.needs_compaction())
+        self.assertEqual(self.journal.replay(), 0)
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import signal
+import unittest
+import numpy as np
+from unittest.mock import patch, MagicMock
+
+from backend.features.vision_host import VisionHost, main
+from backend.core.settings_manager import SettingsManager
+from backend.core.notification_manager import NotificationManager
+
+
+class TestVisionHost(unittest.TestCase):
+
+    def setUp(self):
+        SettingsManager._instance = None
+        NotificationManager._instance = None
+
+        pose_patcher = patch('backend.features.distance_check.load_model')
+        eye_patcher = patch('backend.features.eye_strain_prevention.load_model')
+        self.mock_pose_yolo = pose_patcher.start()
+        self.mock_eye_yolo = eye_patcher.start()
+        self.addCleanup(pose_patcher.stop)
+        self.addCleanup(eye_patcher.stop)
+        self.host = VisionHost()
+
+        self.distance_check = self.host.plugins["distance_check"]
+        self.eye_strain_prevention = self.host.plugins["eye_strain_prevention"]
+        self.host.camera = MagicMock()
+        self.host.camera.open.return_value = True
+        self.host.presence = MagicMock()
+
+    def test_models_loaded_once(self):
+        self.mock_pose_yolo.assert_not_called()
+        self.mock_eye_yolo.assert_not_called()
+
+        self.host.warm_up()
+        self.host.warm_up()
+
+        self.mock_pose_yolo.assert_called_once()
+        self.mock_eye_yolo.assert_called_once()
+
+    def test_warm_up_runs_each_model(self):
+        self.host.warm_up()
+
+        self.distance_check.model.predict.assert_called_once()
+        self.eye_strain_prevention.model.predict.assert_called_once()
+
+    def test_enable_and_disable_without_reloading(self):
+        for plugin in self.host.plugins.values():
+            plugin.ensure_calibrated = MagicMock(return_value=True)
+            plugin.prepare = MagicMock(return_value=True)
+
+        self.assertTrue(self.host.enable("distance_check"))
+        self.assertTrue(self.host.enable("eye_strain_prevention"))
+        self.assertEqual(self.host.enabled, {"distance_check", "eye_strain_prevention"})
+
+        self.host.disable("distance_check")
+        self.assertEqual(self.host.enabled, {"eye_strain_prevention"})
+        self.host.camera.release.assert_not_called()
+
+        self.host.disable("eye_strain_prevention")
+        self.host.camera.release.assert_called_once()
+
+        self.assertTrue(self.host.enable("distance_check"))
+        self.mock_pose_yolo.assert_not_called()
+
+    def test_enable_fails_without_calibration(self):
+        self.distance_check.ensure_calibrated = MagicMock(return_value=False)
+
+        self.assertFalse(self.host.enable("distance_check"))
+        self.assertEqual(self.host.enabled, set())
+
+    def test_sync_with_settings(self):
+        for plugin in self.host.plugins.values():
+            plugin.ensure_calibrated = MagicMock(return_value=True)
+            plugin.prepare = MagicMock(return_value=True)
+
+        enabled_features = {"distance_check"}
+        with patch.object(self.host.settings, 'is_feature_enabled', side_effect=lambda name: name in enabled_features):
+            self.host.sync_with_settings()
+            self.assertEqual(self.host.enabled, {"distance_check"})
+
+            enabled_features = {"eye_strain_prevention"}
+            self.host.sync_with_settings()
+            self.assertEqual(self.host.enabled, {"eye_strain_prevention"})
+
+    def test_changes_applied_in_place(self):
+        for plugin in self.host.plugins.values():
+            plugin.ensure_calibrated = MagicMock(return_value=True)
+            plugin.prepare = MagicMock(return_value=True)
+        self.host.enable("distance_check")
+        self.host.sync_with_settings = MagicMock()
+
+        self.host.on_settings_changed({"distance_check_area": 1500, "motion_gate_threshold": 0})
+        self.assertTrue(self.host.settings_changed.is_set())
+        self.host.apply_changes()
+
+        self.assertEqual(self.distance_check.healthy_area, 1500)
+        self.assertEqual(self.distance_check.motion_gate.threshold, 0)
+        self.assertEqual(self.distance_check.prepare.call_count, 1)
+        self.host.sync_with_settings.assert_not_called()
+        self.mock_pose_yolo.assert_not_called()
+
+        self.host.on_settings_changed({"eye_strain_prevention_enable": True})
+        self.host.apply_changes()
+        self.host.sync_with_settings.assert_called_once()
+
+    def test_process_frame_publishes_presence(self):
+        self.distance_check.process_frame = MagicMock()
+        self.eye_strain_prevention.process_frame = MagicMock()
+        self.host.enabled = {"distance_check", "eye_strain_prevention"}
+        self.distance_check.face_visible = False
+        self.eye_strain_prevention.face_visible = True
+
+        self.host.process_frame(np.zeros((480, 640, 3), dtype=np.uint8))
+
+        self.host.presence.publish.assert_called_once_with(True)
+
+    def test_process_frame_runs_enabled_plugins_only(self):
+        self.distance_check.process_frame = MagicMock()
+        self.eye_strain_prevention.process_frame = MagicMock()
+        self.host.enabled = {"eye_strain_prevention"}
+
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.host.process_frame(frame)
+
+        self.distance_check.process_frame.assert_not_called()
+        self.eye_strain_prevention.process_frame.assert_called_once_with(frame)
+
+    def test_sigterm_runs_cleanup(self):
+        self.addCleanup(signal.signal, signal.SIGTERM, signal.getsignal(signal.SIGTERM))
+        self.host.settings = MagicMock()
+        self.host.settings.is_feature_enabled.return_value = False
+        self.host.metrics = MagicMock()
+        self.host.warm_up = MagicMock()
+        self.host.settings_changed = MagicMock()
+        self.host.settings_changed.wait.side_effect = lambda timeout: os.kill(os.getpid(), signal.SIGTERM)
+
+        with patch('backend.features.vision_host.VisionHost', return_value=self.host):
+            main()
+
+        self.host.presence.close.assert_called_once()
+        self.host.metrics.export.assert_called_once()
+        self.host.camera.release.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
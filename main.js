@@ -1,32 +1,18 @@
 const { app, BrowserWindow, ipcMain } = require('electron');
-const { spawn } = require('child_process');
+const { spawn, execFile } = require('child_process');
 const path = require('path');
 const fs = require('fs');
 
 const featureProcesses = new Map();
 let settingsWatcher = null;
-let lastSettingsSnapshot = null;
 const SETTINGS_PATH = path.join(__dirname, 'backend', 'assets', 'settings.json');
+// a python feature holding the settings lock longer than this makes the save fall back to a direct write
+const SETTINGS_SAVE_TIMEOUT_MS = 5000;
 
-const FEATURE_MAP = {
-    'eye_strain_prevention_enable': 'eye_strain_prevention',
-    'distance_check_enable': 'distance_check',
-    'night_limit_enable': 'night_limit',
-    'daily_limit_enable': 'daily_limit',
-    'break_reminders_enable': 'break_reminders',
-    'blue_light_filter_enable': 'blue_light_filter'
-};
-
-const FEATURE_CONFIG_KEYS = {
-    night_limit: ['night_limit_time'],
-    daily_limit: ['daily_limit_time'],
-    blue_light_filter: [
-        'blue_light_filter_day',
-        'blue_light_filter_evening',
-        'blue_light_filter_night'
-    ],
-    distance_check: ['distance_check_area'],
-    eye_strain_prevention: ['eye_strain_prevention_ratios']
+// features run inside shared python host processes that follow settings changes themselves
+const FEATURE_HOSTS = {
+    vision_host: ['distance_check', 'eye_strain_prevention'],
+    timer_host: ['night_limit', 'daily_limit', 'break_reminders', 'blue_light_filter']
 };
 
 function loadSettings() {
@@ -41,11 +27,37 @@ function loadSettings() {
     return {};
 }
 
-function hasFeatureConfigChanged(featureName, oldSettings, newSettings) {
-    const keys = FEATURE_CONFIG_KEYS[featureName];
-    if (!keys) return false;
+function writeSettingsDirectly(settings) {
+    // without python no feature writes settings, keep their keys anyway and replace the file atomically
+    const current = loadSettings();
+    const merged = { ...current, ...settings };
+    if (JSON.stringify(merged) === JSON.stringify(current)) {
+        return;
+    }
 
-    return keys.some(key => oldSettings?.[key] !== newSettings?.[key]);
+    const tempPath = `${SETTINGS_PATH}.${process.pid}.tmp`;
+    fs.writeFileSync(tempPath, JSON.stringify(merged, null, 4));
+    fs.renameSync(tempPath, SETTINGS_PATH);
+}
+
+function saveSettings(settings) {
+    // the backend merges the changes under the lock the python features hold while they write settings.json
+    const pythonPath = process.platform === 'win32' ? 'python' : 'python3';
+
+    return new Promise((resolve) => {
+        const child = execFile(pythonPath, ['-m', 'backend.core.settings_manager'],
+            { cwd: __dirname, timeout: SETTINGS_SAVE_TIMEOUT_MS },
+            (error) => {
+                if (error) {
+                    console.warn('Could not save settings under the settings lock, writing them without it:', error.message);
+                    writeSettingsDirectly(settings);
+                }
+                console.log('Settings saved to', SETTINGS_PATH);
+                resolve();
+            });
+        child.stdin.on('error', () => {});  // a python that failed to start is reported by the callback
+        child.stdin.end(JSON.stringify(settings));
+    });
 }
 
 function startFeature(featureName) {
@@ -99,10 +111,6 @@ function stopFeature(featureName) {
         console.log(`Stopping feature: ${featureName}`);
         process.kill('SIGTERM');
         featureProcesses.delete(featureName);
-        if (featureName == "blue_light_filter") {
-            const execSync = require('child_process').execSync;
-            const output = execSync('nightlight off', { encoding: 'utf-8' });
-        }
     }
 }
 
@@ -111,29 +119,18 @@ function syncFeaturesWithSettings() {
 
     console.log('Syncing features with settings...');
 
-    Object.entries(FEATURE_MAP).forEach(([settingKey, featureName]) => {
-        const isEnabled = settings[settingKey] === true;
-        const isRunning = featureProcesses.has(featureName);
+    Object.entries(FEATURE_HOSTS).forEach(([hostName, features]) => {
+        const isEnabled = features.some(featureName => settings[`${featureName}_enable`] === true);
+        const isRunning = featureProcesses.has(hostName);
 
         if (isEnabled && !isRunning) {
-            console.log(`Enabling feature: ${featureName}`);
-            startFeature(featureName);
+            console.log(`Starting ${hostName}`);
+            startFeature(hostName);
         } else if (!isEnabled && isRunning) {
-            console.log(`Disabling feature: ${featureName}`);
-            stopFeature(featureName);
-        }
-
-        else if (isEnabled && isRunning &&
-            hasFeatureConfigChanged(featureName, lastSettingsSnapshot, settings)) {
-            console.log(`Reloading feature due to config change: ${featureName}`);
-            stopFeature(featureName);
-
-            setTimeout(() => {
-                startFeature(featureName);
-            } , 300);
+            console.log(`Stopping ${hostName}`);
+            stopFeature(hostName);
         }
     });
-    lastSettingsSnapshot = settings;
 }
 
 function watchSettingsFile() {
@@ -182,11 +179,6 @@ function stopAllProcesses() {
     featureProcesses.forEach((process, name) => {
         console.log(`Stopping ${name}...`);
         process.kill('SIGTERM');
-
-        if (name == "blue_light_filter") {
-            const execSync = require('child_process').execSync;
-            const output = execSync('nightlight off', { encoding: 'utf-8' });
-        }
     });
 
     featureProcesses.clear();
@@ -223,8 +215,10 @@ const createWindow = () => {
 };
 
 app.whenReady().then(() => {
+    // saves run here, off the renderer thread
+    ipcMain.handle('save-settings', (event, settings) => saveSettings(settings));
+
     createWindow();
-    lastSettingsSnapshot = loadSettings();
     watchSettingsFile();
 
     setTimeout(() => {
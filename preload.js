@@ -19,10 +19,7 @@ contextBridge.exposeInMainWorld('fileAPI', {
 });
 
 contextBridge.exposeInMainWorld("settingsAPI", {
-    saveSettings: (settings) => {
-        fs.writeFileSync(settingsPath, JSON.stringify(settings, null, 4));
-        console.log("Settings saved to", settingsPath);
-    },
+    saveSettings: (settings) => ipcRenderer.invoke('save-settings', settings),
     loadSettings: () => {
         if (fs.existsSync(settingsPath)) {
             return JSON.parse(fs.readFileSync(settingsPath, "utf-8"));
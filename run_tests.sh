@@ -161,19 +161,25 @@ main() {
         lint)
             run_linting
             ;;
+        imports)
+            print_info "Checking feature import times against backend/benchmarks/import_budget.json"
+            python -m backend.benchmarks.import_time
+            exit $?
+            ;;
         all)
             run_python_tests
             run_js_tests
             run_linting
             ;;
         *)
-            echo "Usage: $0 {all|python|js|lint|coverage}"
+            echo "Usage: $0 {all|python|js|lint|imports|coverage}"
             echo ""
             echo "Options:"
             echo "  all       - Run all tests (default)"
             echo "  python    - Run only Python tests"
             echo "  js        - Run only JavaScript tests"
             echo "  lint      - Run code linting"
+            echo "  imports   - Check feature import times against the recorded budget"
             exit 1
             ;;
     esac
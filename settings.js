@@ -20,7 +20,7 @@ saveButton.addEventListener("click", async (e) => {
         blue_light_filter_evening: Number(document.getElementById("blueLightFilterEvening").value),
         blue_light_filter_night: Number(document.getElementById("blueLightFilterNight").value)
     };
-    window.settingsAPI.saveSettings(settings);
+    await window.settingsAPI.saveSettings(settings);
     loadSettings();
 });
 